@@ -0,0 +1,56 @@
+"""
+Orbital mechanics for the Halferth system, shared by the scripts in html_dump.
+
+Importing halferth only pulls in numpy. The rendering backends
+(`halferth.scene3d` for vpython, `halferth.plot2d` for matplotlib) are
+imported the first time they are accessed.
+"""
+
+import importlib
+
+from . import constants
+from .calendar import HalferthDate, earth_to_halferth, halferth_to_earth
+from .constants import (
+    ECC_HALFERTH_SOLAR,
+    H_DAY_SECONDS,
+    H_YEAR_DAYS,
+    H_YEAR_SECONDS,
+    HALFERTH_AXIAL_TILT,
+    HALFERTH_RADIUS_PHYSICAL,
+    P_daughter_days,
+    P_mother_days,
+    a_daughter_physical,
+    a_mother_physical,
+    e_daughter,
+    e_mother,
+    planet_rotation_rate,
+)
+from .ephemeris import ChebyshevEphemeris
+from .events import OrbitalEvent, find_events
+from .kepler import (
+    get_initial_M_from_phi,
+    get_position_from_eccentric_anomaly,
+    get_radius_from_eccentric_anomaly,
+    get_true_anomaly_from_eccentric_anomaly,
+    solve_kepler,
+)
+from .orbits import (
+    DAUGHTER_ORBIT,
+    MOTHER_ORBIT,
+    SOLAR_ORBIT,
+    SYSTEM_ORBITS,
+    WORLD_SPACE_FIXED_NORTH_POLE,
+    KeplerOrbit,
+    moon_offset,
+    planet_position,
+)
+from .sky import altitude_azimuth, rise_set_transit, sky_grid
+from .systems import MoonSystem, load_system
+
+_LAZY_BACKENDS = ("scene3d", "plot2d")
+
+
+def __getattr__(name):
+    if name in _LAZY_BACKENDS:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,159 @@
+"""
+Textures for the 3D view, resolved offline first.
+
+A texture is looked up in the local asset cache, then among the files the
+repository already ships, and only then downloaded, once. Whatever is
+found is stored in the cache under the SHA-256 of its contents, so a
+corrupted or replaced file is noticed and fetched again instead of being
+shown. When nothing is available resolve_texture() returns None and the
+caller falls back to a plain colour.
+
+Set HALFERTH_OFFLINE=1 to never touch the network, and HALFERTH_ASSET_CACHE
+to keep the cache somewhere other than html_dump/asset_cache.
+"""
+
+import hashlib
+import json
+import os
+import urllib.request
+from pathlib import Path
+
+HTML_DUMP_DIR = Path(__file__).resolve().parent.parent
+REPO_DIR = HTML_DUMP_DIR.parent
+ASSET_CACHE_DIR = Path(os.environ.get("HALFERTH_ASSET_CACHE", HTML_DUMP_DIR / "asset_cache"))
+
+# Shipped copies of the textures, searched in order
+ASSET_SEARCH_DIRS = (
+    HTML_DUMP_DIR / "JS_SIM" / "halferth-simulator" / "public" / "textures",
+    REPO_DIR / "sim" / "textures",
+    REPO_DIR / "images",
+)
+
+# name -> (file names the texture is shipped under, URL to download it from)
+TEXTURES = {
+    "halferth": (("halferth.png", "halferth_true.png"), "http://i.imgur.com/OsdMZof.png"),
+    "mother": (("mother.png",), None),
+    "daughter": (("daughter.png",), None),
+}
+
+DOWNLOAD_TIMEOUT_S = 5.0
+_INDEX_NAME = "index.json"
+
+
+# =============================================================================
+# CONTENT-HASHED CACHE
+# =============================================================================
+# The cache is a directory of files named <sha256><suffix> plus index.json,
+# which maps texture names to those files. Identical contents share a file.
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _read_index(cache_dir):
+    try:
+        return json.loads((cache_dir / _INDEX_NAME).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _store(cache_dir, name, data, suffix):
+    """Writes `data` into the cache under its hash and indexes it as `name`. Returns the path."""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    path = cache_dir / f"{_digest(data)}{suffix}"
+    # Rewritten even if present: an existing file may be the corrupt one
+    partial = path.with_name(path.name + ".part")
+    partial.write_bytes(data)
+    os.replace(partial, path)
+    index = _read_index(cache_dir)
+    index[name] = path.name
+    partial = cache_dir / (_INDEX_NAME + ".part")
+    partial.write_text(json.dumps(index, indent=1, sort_keys=True))
+    os.replace(partial, cache_dir / _INDEX_NAME)
+    return path
+
+
+def _cached(cache_dir, name):
+    """The cached file for `name` if it exists and still matches its hash, else None."""
+    file_name = _read_index(cache_dir).get(name)
+    if not file_name:
+        return None
+    path = cache_dir / file_name
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return None
+    return path if _digest(data) == path.stem else None
+
+
+def _shipped(file_names):
+    for directory in ASSET_SEARCH_DIRS:
+        for file_name in file_names:
+            path = directory / file_name
+            if path.is_file():
+                return path
+    return None
+
+
+def _download(url):
+    try:
+        with urllib.request.urlopen(url, timeout=DOWNLOAD_TIMEOUT_S) as response:
+            return response.read()
+    except (OSError, ValueError) as e:
+        print(f"Could not download {url}: {e}")
+        return None
+
+
+def _offline():
+    return os.environ.get("HALFERTH_OFFLINE", "").lower() not in ("", "0", "false", "no")
+
+
+# =============================================================================
+# RESOLUTION
+# =============================================================================
+
+
+def resolve_texture(name, cache_dir=None, allow_download=None):
+    """
+    Path of the texture `name` (see TEXTURES) in the asset cache, filling
+    the cache from a shipped copy or, if allowed, a download. Downloads are
+    allowed unless HALFERTH_OFFLINE is set. Returns None if the texture
+    cannot be found.
+    """
+    if name not in TEXTURES:
+        raise ValueError(f"Unknown texture {name!r}, expected one of {tuple(TEXTURES)}")
+    cache_dir = Path(cache_dir) if cache_dir is not None else ASSET_CACHE_DIR
+    if allow_download is None:
+        allow_download = not _offline()
+    file_names, url = TEXTURES[name]
+
+    path = _cached(cache_dir, name)
+    if path is not None:
+        return path
+
+    shipped = _shipped(file_names)
+    if shipped is not None:
+        return _store(cache_dir, name, shipped.read_bytes(), shipped.suffix)
+
+    if url and allow_download:
+        data = _download(url)
+        if data:
+            return _store(cache_dir, name, data, Path(url).suffix or ".png")
+    return None
+
+
+def texture_file(name, **options):
+    """
+    resolve_texture() as the file name vpython expects: relative to the
+    working directory when the cache is under it, which is where vpython
+    serves local files from. None if the texture cannot be found.
+    """
+    path = resolve_texture(name, **options)
+    if path is None:
+        return None
+    try:
+        relative = os.path.relpath(path)
+    except ValueError: # Different drive on Windows
+        return path.as_posix()
+    return path.as_posix() if relative.startswith("..") else Path(relative).as_posix()
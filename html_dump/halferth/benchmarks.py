@@ -0,0 +1,286 @@
+"""
+Benchmarks for the orbit math and the rendering paths of the html_dump
+scripts, with per-machine JSON baselines.
+
+    python -m halferth.benchmarks                 # run and compare with this machine's baseline
+    python -m halferth.benchmarks --save          # run and store a new baseline
+    python -m halferth.benchmarks kepler trail    # only some benchmarks
+
+Baselines live in html_dump/benchmarks/<machine tag>.json. Each benchmark
+is timed as the best of several repeats, and a baseline also keeps each
+benchmark's run-to-run spread (interquartile range over median) as its
+noise. A run exits with status 1 when any benchmark is slower than its
+baseline by more than --threshold (a fraction, default 0.25) or twice the
+baseline's noise, whichever is larger; the noise allowance is capped at
+NOISE_CAP times --threshold, so a noisy baseline cannot hide a real
+slowdown. The current run's own spread never widens the allowance.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import NamedTuple
+
+import numpy as np
+
+from .clock import SimulationClock
+from .constants import H_DAY_SECONDS, H_YEAR_SECONDS, TRAIL_HISTORY_DAYS, TRAIL_MIN_TURN_DEGREES
+from .ephemeris import ChebyshevEphemeris
+from .frame import SystemFrame
+from .kepler import solve_kepler
+from .scheduler import FrameScheduler
+from .sync import SceneSync
+from .trails import CurveTrail
+
+BASELINE_DIR = Path(__file__).resolve().parent.parent / "benchmarks"
+DEFAULT_THRESHOLD = 0.25
+NOISE_CAP = 2.0 # Largest noise allowance, as a multiple of the threshold
+
+# Same step as halferth_system(WORKING).py: one year in 60 s at 100 frames/s
+FRAME_DT = H_YEAR_SECONDS / (100 * 60)
+
+
+def machine_tag():
+    """Identifies the machine and interpreter a baseline was measured on."""
+    name = "-".join([platform.node() or "unknown", platform.system(), platform.machine(),
+                     f"py{sys.version_info.major}{sys.version_info.minor}"])
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+
+
+class Timing(NamedTuple):
+    """Best seconds per operation over the repeats, and their interquartile range over their median."""
+    seconds: float
+    noise: float
+
+
+def measure(run, operations, repeat=5):
+    """
+    Calls run() `repeat` times, where one call performs `operations`
+    operations, and returns the Timing. The minimum is the run least
+    disturbed by the rest of the machine, so it is what gets compared. The
+    spread uses quartiles rather than max - min so that one run interrupted
+    by the machine does not set it.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) / operations)
+    low, median, high = np.percentile(timings, [25, 50, 75])
+    return Timing(min(timings), (high - low) / median if median > 0 else 0.0)
+
+
+# =============================================================================
+# BENCHMARKS
+# =============================================================================
+# Each returns {name: Timing}.
+
+def bench_kepler_scalar(samples=2000):
+    """Scalar solve_kepler calls across the full anomaly range, for each eccentricity in the system."""
+    anomalies = [float(M) for M in np.linspace(-math.pi, math.pi, samples)]
+    results = {}
+    for e in (0.0167, 0.3, 0.35):
+        def run():
+            for M in anomalies:
+                solve_kepler(M, e)
+        results[f"kepler_scalar_e{e}"] = measure(run, samples)
+    return results
+
+
+class _NullCurve:
+    """Stands in for a vpython curve, so trail updates skip the renderer."""
+
+    def __init__(self):
+        self.npoints = 0
+
+    def append(self, pos):
+        self.npoints += 1
+
+    def shift(self):
+        self.npoints -= 1
+
+    def modify(self, index, pos):
+        pass
+
+    def clear(self):
+        self.npoints = 0
+
+
+class _Vector:
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x, y, z):
+        self.x = x
+        self.y = y
+        self.z = z
+
+
+class _Body:
+    """Stands in for a vpython object: attributes only, rotate() does nothing."""
+
+    def __init__(self):
+        self.pos = None
+        self.axis = None
+
+    def rotate(self, angle, axis):
+        pass
+
+
+def bench_system_frame(frames=6000):
+    """
+    The frame loop of halferth_system(WORKING).py with trails shown: the
+    scheduler's step count, the clock, and SystemFrame.update() (ephemeris,
+    planet spin, moons, trail appends and the SceneSync flush), the same
+    code the script runs. vpython objects are replaced by stand-ins, so
+    only the Python side of a frame is measured.
+    """
+    ephemeris = ChebyshevEphemeris()
+    objects = SimpleNamespace(planet=_Body(), equator=_Body(), post=_Body(), mother=_Body(), daughter=_Body())
+
+    def run():
+        scheduler = FrameScheduler(100, 100, sleep=lambda seconds: None)
+        clock = SimulationClock(FRAME_DT)
+        sync = SceneSync(tolerance=1e-3)
+        system_frame = SystemFrame(objects, ephemeris, sync, _Vector)
+        trails = tuple(CurveTrail(_NullCurve(), TRAIL_HISTORY_DAYS, FRAME_DT, H_DAY_SECONDS, TRAIL_MIN_TURN_DEGREES)
+                       for _ in range(2))
+        for _ in range(frames):
+            steps = scheduler.next_frame(playing=True)
+            system_frame.update(clock.tick(steps), trails)
+
+    return {"system_frame": measure(run, frames)}
+
+
+def bench_trail_growth(years=10):
+    """Trail appends per frame over a long run, where an unbounded trail would keep growing."""
+    ephemeris = ChebyshevEphemeris()
+    frames = int(years * H_YEAR_SECONDS / FRAME_DT)
+    t = np.arange(1, frames + 1) * FRAME_DT
+    x, y = ephemeris.positions(t)["mother"]
+    points = [_Vector(0.0, float(a), float(b)) for a, b in zip(x, y)]
+    times = t.tolist()
+
+    def run():
+        trail = CurveTrail(_NullCurve(), TRAIL_HISTORY_DAYS, FRAME_DT, H_DAY_SECONDS, TRAIL_MIN_TURN_DEGREES)
+        for ti, pos in zip(times, points):
+            trail.append(ti, pos)
+
+    return {f"trail_growth_{years}y": measure(run, frames, repeat=3)}
+
+
+def bench_moon_graph(num_frames=350, encode_frames=50):
+    """2D orbit graph: batch frame positions, then a parallel GIF encode."""
+    try:
+        from .plot2d import moon_frame_positions, render_moon_orbit_animation
+    except ImportError as error:
+        print(f"Skipping 2D graph benchmarks: {error}")
+        return {}
+    results = {"moon_graph_positions": measure(lambda: moon_frame_positions(num_frames, 70), num_frames)}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "moons.gif")
+        results["moon_graph_gif_encode"] = measure(
+            lambda: render_moon_orbit_animation(path, encode_frames, 70), encode_frames, repeat=3)
+    return results
+
+
+BENCHMARKS = (bench_kepler_scalar, bench_system_frame, bench_trail_growth, bench_moon_graph)
+
+
+# =============================================================================
+# BASELINES
+# =============================================================================
+
+def baseline_path(tag=None, directory=BASELINE_DIR):
+    return Path(directory) / f"{tag or machine_tag()}.json"
+
+
+def save_baseline(results, noise, path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "machine": machine_tag(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "saved": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seconds_per_op": results,
+        "noise": noise,
+    }
+    path.write_text(json.dumps(document, indent=2, sort_keys=True) + "\n")
+
+
+def allowance(threshold, baseline_noise=0.0):
+    """
+    Slowdown allowed for a benchmark: `threshold`, or twice its noise in
+    the baseline if larger, but never more than NOISE_CAP * threshold.
+    """
+    return max(threshold, min(2 * baseline_noise, NOISE_CAP * threshold))
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, baseline_noise=None):
+    """
+    Returns [(name, current, baseline, ratio, allowed)] for every benchmark
+    in both `results` and `baseline`, where `allowed` is its allowance().
+    It regressed when ratio > 1 + allowed.
+    """
+    baseline_noise = baseline_noise or {}
+    comparisons = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous:
+            allowed = allowance(threshold, baseline_noise.get(name, 0.0))
+            comparisons.append((name, current, previous, current / previous, allowed))
+    return comparisons
+
+
+def run_benchmarks(selected=()):
+    """Returns ({name: seconds per op}, {name: noise})."""
+    results = {}
+    noise = {}
+    for benchmark in BENCHMARKS:
+        if selected and not any(s in benchmark.__name__ for s in selected):
+            continue
+        for name, timing in benchmark().items():
+            results[name] = timing.seconds
+            noise[name] = timing.noise
+            print(f"{name:<28} {timing.seconds * 1e6:12.3f} us/op  (noise {timing.noise:.0%})")
+    return results, noise
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Halferth orbit math and rendering paths.")
+    parser.add_argument("only", nargs="*", help="only run benchmarks whose name contains one of these (kepler_scalar, system_frame, trail_growth, moon_graph)")
+    parser.add_argument("--save", action="store_true", help="store the results as this machine's baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"allowed slowdown as a fraction of the baseline (default {DEFAULT_THRESHOLD})")
+    parser.add_argument("--baseline-dir", default=BASELINE_DIR, help="directory of baseline JSON files")
+    args = parser.parse_args()
+
+    results, noise = run_benchmarks(args.only)
+    path = baseline_path(directory=args.baseline_dir)
+    if args.save:
+        save_baseline(results, noise, path)
+        print(f"Saved baseline {path}")
+        sys.exit(0)
+    if not path.exists():
+        print(f"No baseline for this machine at {path}; run with --save to create one")
+        sys.exit(0)
+
+    document = json.loads(path.read_text())
+    regressions = 0
+    for name, current, previous, ratio, allowed in compare(results, document["seconds_per_op"], args.threshold,
+                                                           document.get("noise")):
+        if ratio > 1 + allowed:
+            regressions += 1
+            print(f"REGRESSION {name}: {current * 1e6:.3f} us/op vs baseline {previous * 1e6:.3f} "
+                  f"({ratio:.2f}x, allowed +{allowed:.0%})")
+        else:
+            print(f"ok {name}: {ratio:.2f}x baseline (allowed +{allowed:.0%})")
+    if regressions:
+        sys.exit(1)
+    print(f"No regressions against {path.name}")
@@ -0,0 +1,99 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from .constants import H_DAY_SECONDS, H_YEAR_DAYS
+
+# =============================================================================
+# EARTH <-> HALFERTH CALENDAR
+# =============================================================================
+# The same calendar as date.html: every Halferthian year starts at 00:00 UTC
+# on Earth's March 20 and counts 21-hour days from there, in twelve civic
+# half-seasons ("periods") of 35 days. Conversions work on whole
+# datetime64[ms] arrays (the resolution of a JS Date) with integer timedelta
+# arithmetic, so day boundaries are exact and no per-date loop is needed.
+
+HALFERTH_CALENDAR = (
+    # (season, civic half-season)
+    ("Nightfall", "Low Nightfall"),
+    ("Nightfall", "High Nightfall"),
+    ("Long Night", "Low Long Night"),
+    ("Long Night", "High Long Night"),
+    ("Nightspring", "Low Nightspring"),
+    ("Nightspring", "High Nightspring"),
+    ("Dayspring", "Low Dayspring"),
+    ("Dayspring", "High Dayspring"),
+    ("Long Day", "Low Long Day"),
+    ("Long Day", "High Long Day"),
+    ("Dayfall", "Low Dayfall"),
+    ("Dayfall", "High Dayfall"),
+)
+PERIOD_DAYS = H_YEAR_DAYS // len(HALFERTH_CALENDAR)
+
+# Notes date.html shows on particular days of the year
+DAY_NOTES = {
+    1: "Nightfall 1 is Polar Sunset",
+    211: "Dayspring 1 (Day 211) is Polar Sunrise",
+    420: "End of Halferthian Year on Day 420",
+}
+
+YEAR_START_MONTH = 3
+YEAR_START_DAY = 20
+
+_H_DAY = np.timedelta64(H_DAY_SECONDS * 1000, "ms")
+_HOUR = np.timedelta64(3600 * 1000, "ms")
+
+
+class HalferthDate(NamedTuple):
+    """
+    Arrays of Halferthian dates. `year` is the Earth year whose March 20
+    starts the Halferthian year, `period` (1-12) indexes HALFERTH_CALENDAR,
+    `day` (1-35) is the day in the period and `hour` the Earth hours
+    (0 to 21) into that day.
+    """
+    year: np.ndarray
+    period: np.ndarray
+    day: np.ndarray
+    hour: np.ndarray
+
+    @property
+    def day_of_year(self):
+        return (self.period - 1) * PERIOD_DAYS + self.day
+
+
+def year_start(year):
+    """datetime64[ms] of 00:00 UTC, March 20 of each Earth year in `year`."""
+    months = (np.asarray(year, dtype=np.int64) - 1970) * 12 + (YEAR_START_MONTH - 1)
+    return (months.astype("datetime64[M]").astype("datetime64[D]")
+            + np.timedelta64(YEAR_START_DAY - 1, "D")).astype("datetime64[ms]")
+
+
+def earth_to_halferth(timestamps):
+    """
+    Converts Earth timestamps (anything numpy can turn into datetime64, read
+    as UTC) to a HalferthDate of arrays with the same shape.
+    """
+    timestamps = np.asarray(timestamps, dtype="datetime64[ms]")
+    year = timestamps.astype("datetime64[Y]").astype(np.int64) + 1970
+    year = np.where(timestamps < year_start(year), year - 1, year)
+    elapsed = timestamps - year_start(year)
+    day_index = elapsed // _H_DAY % H_YEAR_DAYS
+    hour = (elapsed % _H_DAY) / _HOUR
+    return HalferthDate(year, day_index // PERIOD_DAYS + 1, day_index % PERIOD_DAYS + 1, hour)
+
+
+def halferth_to_earth(year, period, day, hour=0.0):
+    """
+    Converts Halferthian dates back to datetime64[ms] Earth timestamps.
+    Arguments broadcast against each other; `hour` may be fractional.
+    """
+    day_index = (np.asarray(period, dtype=np.int64) - 1) * PERIOD_DAYS + np.asarray(day, dtype=np.int64) - 1
+    offset_ms = np.rint(np.asarray(hour, dtype=float) * 3600 * 1000).astype(np.int64)
+    return year_start(year) + day_index * _H_DAY + offset_ms.astype("timedelta64[ms]")
+
+
+def period_names(period):
+    """(season, civic half-season) name arrays for period numbers 1-12."""
+    index = np.asarray(period) - 1
+    seasons, civic = (np.array(names) for names in zip(*HALFERTH_CALENDAR))
+    return seasons[index], civic[index]
@@ -0,0 +1,63 @@
+import math
+
+from .constants import H_DAY_SECONDS, H_YEAR_SECONDS, planet_rotation_rate
+
+# =============================================================================
+# SIMULATION CLOCK
+# =============================================================================
+# The animation clock counts whole frames since the last seek and derives
+# the time as origin + frames * dt, instead of adding dt to a running total,
+# so rounding error does not build up however long the animation runs.
+# Nothing downstream needs the frames in between: orbit positions and the
+# planet's spin are functions of absolute time, each reduced by its own
+# period, so seeking to any date is as cheap as drawing the next frame.
+
+SIDEREAL_DAY_SECONDS = 2 * math.pi / planet_rotation_rate
+
+
+def spin_angle(t_s):
+    """Halferth's rotation since t=0 at time t_s, reduced to [0, 2*pi)."""
+    return (t_s % SIDEREAL_DAY_SECONDS) * planet_rotation_rate
+
+
+def simulation_time(year, day=0.0, hour=0.0):
+    """Seconds since the start for `year` whole years, `day` days and `hour` hours in."""
+    return year * H_YEAR_SECONDS + day * H_DAY_SECONDS + hour * 3600.0
+
+
+class SimulationClock:
+    """Frame clock with constant step `dt_s` that can jump to any time."""
+
+    def __init__(self, dt_s, start_s=0.0):
+        self.dt_s = dt_s
+        self._origin_s = float(start_s)
+        self._frames = 0
+
+    @property
+    def time_s(self):
+        return self._origin_s + self._frames * self.dt_s
+
+    @property
+    def year(self):
+        """Whole simulated years since the start."""
+        return int(self.time_s // H_YEAR_SECONDS)
+
+    @property
+    def day_of_year(self):
+        """Days (fractional) since the start of the current simulated year."""
+        return self.time_s % H_YEAR_SECONDS / H_DAY_SECONDS
+
+    def tick(self, frames=1):
+        """Advances by `frames` steps and returns the new time."""
+        self._frames += frames
+        return self.time_s
+
+    def seek(self, t_s):
+        """Jumps to absolute time t_s; the next tick() continues from there."""
+        self._origin_s = float(t_s)
+        self._frames = 0
+        return self.time_s
+
+    def seek_date(self, year, day=0.0, hour=0.0):
+        """Jumps to `day` days and `hour` hours into simulated year `year` (both from 0)."""
+        return self.seek(simulation_time(year, day, hour))
@@ -0,0 +1,68 @@
+import math
+
+# =============================================================================
+# PLANET "HALFERTH" AND ITS SOLAR ORBIT
+# =============================================================================
+H_DAY_SECONDS = 21 * 3600
+H_YEAR_DAYS = 420
+H_YEAR_SECONDS = H_YEAR_DAYS * H_DAY_SECONDS
+planet_rotation_rate = 2 * math.pi / H_DAY_SECONDS
+
+ECC_HALFERTH_SOLAR = 0.0167
+HALFERTH_AXIAL_TILT = 12.5
+# Halferth sits at 1 AU from a sun-like star (Lunar Framework, Hill sphere check)
+a_halferth_solar_physical = 1.495978707e11
+# Earth-mass planet, so Earth's mean radius; observers stand on this sphere
+HALFERTH_RADIUS_PHYSICAL = 6.371e6
+HALFERTH_MASS = 5.972e24
+SUN_MASS = 1.989e30
+SUN_RADIUS_PHYSICAL = 6.957e8
+G = 6.674e-11
+solar_start_phi = 3 * math.pi / 2
+
+# =============================================================================
+# MOON "MOTHER"
+# =============================================================================
+a_mother_physical = 6.56e5 * 1000
+e_mother = 0.35
+P_mother_days = 70
+MOTHER_MASS = 7.35e22 # Luna analog
+MOTHER_RADIUS_PHYSICAL = 1.7374e6
+
+# =============================================================================
+# MOON "DAUGHTER"
+# =============================================================================
+a_daughter_physical = 4.13e5 * 1000
+e_daughter = 0.3
+P_daughter_days = 35
+DAUGHTER_MASS = 1e20
+DAUGHTER_RADIUS_PHYSICAL = 2.0e5 # 1e20 kg at a rocky 3000 kg/m^3
+
+# Both moons start at the "Set" position of the 70-day convergence cycle
+moon_start_phi = -math.pi / 2
+SIMULATION_CYCLE_DAYS = 70
+
+# =============================================================================
+# DISPLAY SCALING (3D system view)
+# =============================================================================
+SOLAR_ORBIT_DISPLAY_RADIUS = 25.0
+SUN_DISPLAY_RADIUS = SOLAR_ORBIT_DISPLAY_RADIUS / 7
+PLANET_DISPLAY_RADIUS = SUN_DISPLAY_RADIUS / 3.0
+
+MOTHER_ORBIT_DISPLAY_AVG_RADIUS = PLANET_DISPLAY_RADIUS * 7
+DAUGHTER_ORBIT_DISPLAY_AVG_RADIUS = MOTHER_ORBIT_DISPLAY_AVG_RADIUS * (a_daughter_physical / a_mother_physical)
+MOTHER_DISPLAY_RADIUS = PLANET_DISPLAY_RADIUS * 0.5
+DAUGHTER_DISPLAY_RADIUS = PLANET_DISPLAY_RADIUS * 0.3
+
+GUIDE_LINE_RADIUS = SOLAR_ORBIT_DISPLAY_RADIUS / 600
+TRAIL_DISPLAY_RADIUS = GUIDE_LINE_RADIUS
+TRAIL_OPACITY = 0.3
+# Trails keep two Mother orbits of history, thinned to a vertex per degree of turn
+TRAIL_HISTORY_DAYS = 140
+TRAIL_MIN_TURN_DEGREES = 1.0
+
+ORBIT_PATH_THICKNESS = GUIDE_LINE_RADIUS
+
+POST_DISPLAY_RADIUS = GUIDE_LINE_RADIUS
+POST_DISPLAY_LENGTH = PLANET_DISPLAY_RADIUS * 1.5
+EQUATOR_DISPLAY_THICKNESS = PLANET_DISPLAY_RADIUS * 0.1
@@ -0,0 +1,314 @@
+"""
+Solar eclipses, lunar eclipses and moon-moon occultations as seen from
+Halferth.
+
+    python -m halferth.eclipses --years 10000
+
+An event is counted when it is visible from somewhere on Halferth's
+surface, and classified by the best view anywhere: a solar eclipse is
+total or annular where the moon's shadow axis meets the planet, partial
+otherwise; a lunar eclipse is total, partial (umbral) or penumbral; an
+occultation is total when the nearer moon can cover the farther one
+completely, annular when it can pass wholly inside its disc, and partial
+otherwise.
+"""
+
+import argparse
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from .constants import (
+    DAUGHTER_RADIUS_PHYSICAL,
+    H_DAY_SECONDS,
+    H_YEAR_SECONDS,
+    HALFERTH_RADIUS_PHYSICAL,
+    MOTHER_RADIUS_PHYSICAL,
+    SUN_RADIUS_PHYSICAL,
+)
+from .orbits import DAUGHTER_ORBIT, MOTHER_ORBIT, SOLAR_ORBIT
+from .sky import body_vector
+
+SOLAR = "solar"
+LUNAR = "lunar"
+OCCULTATION = "occultation"
+ALL_ECLIPSE_KINDS = (SOLAR, LUNAR, OCCULTATION)
+
+TOTAL = "total"
+ANNULAR = "annular"
+PARTIAL = "partial"
+PENUMBRAL = "penumbral"
+
+_RADII = {"sun": SUN_RADIUS_PHYSICAL, "mother": MOTHER_RADIUS_PHYSICAL, "daughter": DAUGHTER_RADIUS_PHYSICAL}
+_ORBITS = {"sun": SOLAR_ORBIT, "mother": MOTHER_ORBIT, "daughter": DAUGHTER_ORBIT}
+
+
+class EclipseEvent(NamedTuple):
+    """
+    One eclipse or occultation. `t_s` is the time of greatest eclipse in
+    seconds since the simulation start, `duration_s` runs from first to last
+    contact anywhere on Halferth, and `separation_deg` is the least
+    centre-to-centre separation seen from Halferth's centre. `body` is the
+    eclipsed moon for lunar eclipses, the eclipsing moon for solar ones, and
+    "near-far" for occultations.
+    """
+    t_s: float
+    kind: str
+    body: str
+    type: str
+    duration_s: float
+    separation_deg: float
+
+    @property
+    def h_days(self):
+        return self.t_s / H_DAY_SECONDS
+
+
+# =============================================================================
+# GEOMETRY
+# =============================================================================
+# Each search is a function g(t) = separation - contact limit, in radians,
+# computed from the planet-centred body vectors. g < 0 exactly while the
+# event is visible from some point on the surface; the difference in
+# parallax between the two bodies (up to ~0.9 degrees for the moons) is
+# what widens the limit beyond the sum of the angular radii.
+
+def _sample(bodies, t):
+    """{body: (unit vector, distance)} of each planet-centred body vector at time(s) t."""
+    sample = {}
+    for body in bodies:
+        d = body_vector(body, t)
+        distance = np.sqrt(np.einsum("...i,...i", d, d))
+        sample[body] = (d / distance[..., None], distance)
+    return sample
+
+
+def _angle(u, v):
+    """Angle between unit vectors, from their chord so it stays accurate at small separations."""
+    chord = u - v
+    return 2 * np.arcsin(np.minimum(0.5 * np.sqrt(np.einsum("...i,...i", chord, chord)), 1.0))
+
+
+def _semi_diameter(radius, distance):
+    return np.arcsin(np.minimum(radius / distance, 1.0))
+
+
+def _parallax(distance):
+    return np.arcsin(np.minimum(HALFERTH_RADIUS_PHYSICAL / distance, 1.0))
+
+
+def _solar(moon, sample, classify=False):
+    """
+    Moon against the sun: g, or with classify=True (g, separation, type)
+    where type is only meaningful where g < 0.
+    """
+    (m, d_m), (s, d_s) = sample[moon], sample["sun"]
+    separation = _angle(m, s)
+    sun_radius = _semi_diameter(SUN_RADIUS_PHYSICAL, d_s)
+    moon_parallax = _parallax(d_m)
+    g = separation - (sun_radius + _semi_diameter(_RADII[moon], d_m) + moon_parallax)
+    if not classify:
+        return g
+    # Where the shadow axis meets the surface the moon is one planet radius closer
+    covers = _semi_diameter(_RADII[moon], d_m - HALFERTH_RADIUS_PHYSICAL) >= sun_radius
+    kind = np.where(separation < moon_parallax, np.where(covers, TOTAL, ANNULAR), PARTIAL)
+    return g, separation, kind
+
+
+def _lunar(moon, sample, classify=False):
+    """Moon in Halferth's shadow: the umbra and penumbra at the moon's distance, seen from the centre."""
+    (m, d_m), (s, d_s) = sample[moon], sample["sun"]
+    separation = _angle(m, -s)
+    moon_radius = _semi_diameter(_RADII[moon], d_m)
+    sun_radius = _semi_diameter(SUN_RADIUS_PHYSICAL, d_s)
+    shadow = _parallax(d_m) + _parallax(d_s)
+    umbra = shadow - sun_radius
+    g = separation - (shadow + sun_radius + moon_radius)
+    if not classify:
+        return g
+    kind = np.where(separation < umbra - moon_radius, TOTAL,
+                    np.where(separation < umbra + moon_radius, PARTIAL, PENUMBRAL))
+    return g, separation, kind
+
+
+def _occultation(sample, classify=False):
+    """Mother and Daughter passing in front of each other, whichever is nearer; also returns "near-far"."""
+    (m, d_m), (d, d_d) = sample["mother"], sample["daughter"]
+    separation = _angle(m, d)
+    radius_m = _semi_diameter(MOTHER_RADIUS_PHYSICAL, d_m)
+    radius_d = _semi_diameter(DAUGHTER_RADIUS_PHYSICAL, d_d)
+    parallax_gap = np.abs(_parallax(d_m) - _parallax(d_d))
+    g = separation - (radius_m + radius_d + parallax_gap)
+    if not classify:
+        return g
+    mother_nearer = d_m < d_d
+    near_radius = np.where(mother_nearer, MOTHER_RADIUS_PHYSICAL, DAUGHTER_RADIUS_PHYSICAL)
+    far_radius = np.where(mother_nearer, DAUGHTER_RADIUS_PHYSICAL, MOTHER_RADIUS_PHYSICAL)
+    near_d = np.minimum(d_m, d_d) - HALFERTH_RADIUS_PHYSICAL
+    far_d = np.maximum(d_m, d_d) - HALFERTH_RADIUS_PHYSICAL
+    covers = _semi_diameter(near_radius, near_d) >= _semi_diameter(far_radius, far_d)
+    kind = np.where(separation < parallax_gap, np.where(covers, TOTAL, ANNULAR), PARTIAL)
+    return g, separation, kind, np.where(mother_nearer, "mother-daughter", "daughter-mother")
+
+
+def _max_angular_speed(orbit):
+    """Fastest angular motion about the focus, at periapsis (rad/s)."""
+    return orbit.n * (1 + orbit.e) ** 2 / (1 - orbit.e ** 2) ** 1.5
+
+
+# =============================================================================
+# COARSE-TO-FINE SEARCH
+# =============================================================================
+# 1. Sample every body once per coarse step, in chunks, and evaluate all
+#    searches on the same samples.
+# 2. Every local minimum of g whose sampled value is within reach of zero
+#    (the pair's fastest relative motion times the step) is a candidate.
+# 3. Golden-section search on the two steps around each candidate finds
+#    greatest eclipse; candidates with g > 0 there were near misses.
+# 4. First and last contact are bracketed by stepping out from greatest
+#    eclipse until g > 0, then bisected.
+# Steps 3 and 4 run on all candidates of a search at once.
+
+_GOLDEN = (np.sqrt(5) - 1) / 2
+
+
+class _Search:
+    def __init__(self, kind, bodies, measure, label, max_rate):
+        self.kind = kind
+        self.bodies = bodies
+        self.measure = measure
+        self.label = label
+        self.max_rate = max_rate
+
+    def g(self, t):
+        return self.measure(_sample(self.bodies, t))
+
+
+def _searches(kinds):
+    searches = []
+    sun_rate = _max_angular_speed(SOLAR_ORBIT)
+    for moon in ("mother", "daughter"):
+        rate = _max_angular_speed(_ORBITS[moon]) + sun_rate
+        if SOLAR in kinds:
+            searches.append(_Search(SOLAR, ("sun", moon), lambda v, classify=False, moon=moon: _solar(moon, v, classify),
+                                    lambda measured, i, moon=moon: moon, rate))
+        if LUNAR in kinds:
+            searches.append(_Search(LUNAR, ("sun", moon), lambda v, classify=False, moon=moon: _lunar(moon, v, classify),
+                                    lambda measured, i, moon=moon: moon, rate))
+    if OCCULTATION in kinds:
+        rate = _max_angular_speed(MOTHER_ORBIT) + _max_angular_speed(DAUGHTER_ORBIT)
+        searches.append(_Search(OCCULTATION, ("mother", "daughter"), _occultation,
+                                lambda measured, i: str(measured[3][i]), rate))
+    return searches
+
+
+def _golden_minimum(g, lo, hi, tolerance_s):
+    """Vectorized golden-section search for the minimum of g on each [lo, hi]."""
+    c = hi - _GOLDEN * (hi - lo)
+    d = lo + _GOLDEN * (hi - lo)
+    g_c = g(c)
+    g_d = g(d)
+    iterations = int(np.ceil(np.log(max(np.max(hi - lo, initial=0.0) / tolerance_s, 1.0)) / -np.log(_GOLDEN)))
+    for _ in range(iterations):
+        left = g_c < g_d
+        hi = np.where(left, d, hi)
+        lo = np.where(left, lo, c)
+        x = np.where(left, hi - _GOLDEN * (hi - lo), lo + _GOLDEN * (hi - lo))
+        g_x = g(x)
+        c, d = np.where(left, x, d), np.where(left, c, x)
+        g_c, g_d = np.where(left, g_x, g_d), np.where(left, g_c, g_x)
+    return 0.5 * (lo + hi)
+
+
+def _contact(g, t_max, direction, step_s, tolerance_s, max_steps=64):
+    """Time of first (direction -1) or last (+1) contact around each greatest eclipse t_max."""
+    reach = np.full(t_max.shape, step_s)
+    outside = g(t_max + direction * reach) > 0
+    while not np.all(outside) and np.max(reach) < max_steps * step_s:
+        reach = np.where(outside, reach, 2 * reach)
+        outside = g(t_max + direction * reach) > 0
+    inside = t_max
+    beyond = t_max + direction * reach
+    for _ in range(int(np.ceil(np.log2(max(np.max(reach, initial=0.0) / tolerance_s, 1.0))))):
+        mid = 0.5 * (inside + beyond)
+        out = g(mid) > 0
+        beyond = np.where(out, mid, beyond)
+        inside = np.where(out, inside, mid)
+    return 0.5 * (inside + beyond)
+
+
+def find_eclipses(t_start, t_end, kinds=ALL_ECLIPSE_KINDS, step_s=H_DAY_SECONDS,
+                  chunk_samples=1 << 20, tolerance_s=1.0):
+    """
+    Finds solar eclipses, lunar eclipses and occultations visible from
+    Halferth with greatest eclipse in [t_start, t_end). Returns
+    EclipseEvents sorted by time.
+    """
+    kinds = set(kinds)
+    unknown = kinds - set(ALL_ECLIPSE_KINDS)
+    if unknown:
+        raise ValueError(f"Unknown eclipse kinds: {sorted(unknown)}")
+    searches = _searches(kinds)
+    bodies = sorted({body for search in searches for body in search.bodies})
+
+    candidates = {id(search): [] for search in searches}
+    n_total = int(np.ceil((t_end - t_start) / step_s))
+    for first in range(0, n_total, chunk_samples):
+        # One sample of overlap on each side, so minima at the seams are seen
+        k = np.arange(first - 1, min(first + chunk_samples, n_total) + 1)
+        t = t_start + k * step_s
+        sample = _sample(bodies, t)
+        for search in searches:
+            g = search.measure(sample)
+            minimum = (g[1:-1] <= g[:-2]) & (g[1:-1] < g[2:]) & (g[1:-1] < search.max_rate * step_s)
+            candidates[id(search)].append(t[1:-1][minimum])
+
+    events = []
+    for search in searches:
+        t_coarse = np.concatenate(candidates[id(search)])
+        if not t_coarse.size:
+            continue
+        t_max = _golden_minimum(search.g, t_coarse - step_s, t_coarse + step_s, tolerance_s)
+        measured = search.measure(_sample(search.bodies, t_max), classify=True)
+        hit = (measured[0] < 0) & (t_max >= t_start) & (t_max < t_end)
+        index = np.flatnonzero(hit)
+        if not index.size:
+            continue
+        t_max = t_max[index]
+        first_contact = _contact(search.g, t_max, -1, step_s, tolerance_s)
+        last_contact = _contact(search.g, t_max, 1, step_s, tolerance_s)
+        separation = np.degrees(measured[1][index])
+        types = measured[2][index]
+        for j, i in enumerate(index):
+            events.append(EclipseEvent(float(t_max[j]), search.kind, search.label(measured, i), str(types[j]),
+                                       float(last_contact[j] - first_contact[j]), float(separation[j])))
+
+    events.sort()
+    return events
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find eclipses and occultations seen from Halferth.")
+    parser.add_argument("--start-year", type=float, default=0.0, help="first simulated year (default 0)")
+    parser.add_argument("--years", type=float, default=100.0, help="span in Halferth years (default 100)")
+    parser.add_argument("--kinds", nargs="+", choices=ALL_ECLIPSE_KINDS, default=list(ALL_ECLIPSE_KINDS))
+    parser.add_argument("--list", action="store_true", help="print every event, not just the summary")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    t_start = args.start_year * H_YEAR_SECONDS
+    events = find_eclipses(t_start, t_start + args.years * H_YEAR_SECONDS, args.kinds)
+    elapsed = time.perf_counter() - started
+
+    if args.list:
+        for event in events:
+            year, day = divmod(event.t_s / H_DAY_SECONDS, H_YEAR_SECONDS / H_DAY_SECONDS)
+            print(f"year {int(year):5d} day {day:6.2f}  {event.kind:11s} {event.type:9s} {event.body:16s} "
+                  f"{event.duration_s / 3600:6.2f} h  sep {event.separation_deg:.3f} deg")
+    counts = {}
+    for event in events:
+        counts[event.kind, event.body, event.type] = counts.get((event.kind, event.body, event.type), 0) + 1
+    for (kind, body, kind_type), count in sorted(counts.items()):
+        print(f"{kind:11s} {body:16s} {kind_type:9s} {count:8d}")
+    print(f"{len(events)} events in {args.years:g} years, found in {elapsed:.1f} s")
@@ -0,0 +1,139 @@
+import numpy as np
+from numpy.polynomial import chebyshev
+
+from .orbits import SYSTEM_ORBITS
+
+# =============================================================================
+# PIECEWISE CHEBYSHEV EPHEMERIS
+# =============================================================================
+# A Keplerian orbit repeats exactly every period, so one period per body is
+# split into equal segments and (x, y) is fitted on each segment with a
+# Chebyshev series. Evaluating a position is then a modulo, a table lookup
+# and `degree` multiply-adds per coordinate, with no Kepler solve and no trig.
+
+
+class ChebyshevEphemeris:
+    """
+    Piecewise Chebyshev fit of the orbital-plane position (x, y) of each
+    orbit over one period.
+
+    `tolerance` is the largest allowed position error as a fraction of each
+    orbit's semi-major axis; segments are doubled until every body meets it.
+    """
+
+    def __init__(self, orbits=SYSTEM_ORBITS, tolerance=1e-9, degree=8,
+                 initial_segments=8, max_segments=1 << 16):
+        self.tolerance = tolerance
+        self.degree = degree
+        self.orbits = {orbit.name: orbit for orbit in orbits}
+        self._coeffs = {}
+        self._horner = {}
+        self._segment_s = {}
+        self.segments = {}
+        self.fit_errors = {}
+
+        for name, orbit in self.orbits.items():
+            segments = initial_segments
+            while True:
+                coeffs = self._fit(orbit, segments)
+                error = self._check_error(orbit, coeffs, segments)
+                if error <= tolerance * orbit.a or segments >= max_segments:
+                    break
+                segments *= 2
+            self._coeffs[name] = coeffs
+            # Plain-float power-series copy for the per-frame scalar path, where
+            # numpy's call overhead would cost more than the arithmetic itself
+            self._horner[name] = [
+                list(zip(chebyshev.cheb2poly(coeffs[:, k, 0])[::-1].tolist(),
+                         chebyshev.cheb2poly(coeffs[:, k, 1])[::-1].tolist()))
+                for k in range(segments)
+            ]
+            self._segment_s[name] = orbit.period_s / segments
+            self.segments[name] = segments
+            self.fit_errors[name] = error
+
+    def _nodes(self):
+        k = np.arange(self.degree + 1)
+        return np.cos(np.pi * (k + 0.5) / (self.degree + 1))
+
+    def _fit(self, orbit, segments):
+        """Returns coefficients of shape (degree + 1, segments, 2)."""
+        n = self.degree + 1
+        u = self._nodes()
+        segment_s = orbit.period_s / segments
+        starts = np.arange(segments) * segment_s
+        t = starts[:, None] + (u[None, :] + 1) * 0.5 * segment_s
+        x, y = orbit.position(t)
+        values = np.stack([x, y], axis=-1)  # (segments, n, 2)
+
+        # Discrete Chebyshev transform on the Chebyshev-Gauss nodes
+        j = np.arange(n)
+        basis = np.cos(np.pi * j[:, None] * (np.arange(n)[None, :] + 0.5) / n)
+        coeffs = (2.0 / n) * np.einsum('jk,skd->jsd', basis, values)
+        coeffs[0] *= 0.5
+        return coeffs
+
+    def _evaluate(self, coeffs, segment_s, period_s, t):
+        t = np.asarray(t, dtype=float)
+        segments = coeffs.shape[1]
+        s = np.mod(t, period_s) / segment_s
+        index = np.minimum(s.astype(np.intp), segments - 1)
+        u = 2 * (s - index) - 1
+        two_u = 2 * u
+        result = []
+        for d in range(coeffs.shape[2]):
+            c = coeffs[:, :, d]
+            b1 = np.take(c[-1], index)
+            b2 = np.zeros_like(b1)
+            for j in range(c.shape[0] - 2, 0, -1):
+                b2 = np.take(c[j], index) - b2
+                b2 += two_u * b1
+                b1, b2 = b2, b1
+            result.append(u * b1 - b2 + np.take(c[0], index))
+        return result[0], result[1]
+
+    def _check_error(self, orbit, coeffs, segments):
+        # Check half-way between the fit nodes, where the error peaks
+        segment_s = orbit.period_s / segments
+        frac = (np.arange(4 * (self.degree + 1)) + 0.5) / (4 * (self.degree + 1))
+        t = (np.arange(segments)[:, None] + frac[None, :]) * segment_s
+        return self._max_deviation(orbit, coeffs, segment_s, t)
+
+    def _max_deviation(self, orbit, coeffs, segment_s, t):
+        x_fit, y_fit = self._evaluate(coeffs, segment_s, orbit.period_s, t)
+        x, y = orbit.position(t)
+        return float(np.max(np.hypot(x_fit - x, y_fit - y)))
+
+    def position(self, name, t):
+        """Returns (x, y) of orbit `name` at time(s) t, like KeplerOrbit.position."""
+        if isinstance(t, (int, float)) or np.ndim(t) == 0:
+            return self._position_scalar(name, float(t))
+        orbit = self.orbits[name]
+        return self._evaluate(self._coeffs[name], self._segment_s[name], orbit.period_s, t)
+
+    def _position_scalar(self, name, t):
+        s = t % self.orbits[name].period_s / self._segment_s[name]
+        index = min(int(s), self.segments[name] - 1)
+        u = 2 * (s - index) - 1
+        x = y = 0.0
+        for cx, cy in self._horner[name][index]:
+            x = x * u + cx
+            y = y * u + cy
+        return x, y
+
+    def positions(self, t):
+        """Returns {name: (x, y)} for every fitted orbit at time(s) t."""
+        return {name: self.position(name, t) for name in self.orbits}
+
+    def fit_error(self, samples=100000, seed=0):
+        """
+        Measures the fit against the exact solve_kepler path at `samples`
+        random times per orbit. Returns {name: (max error, max error / a)}.
+        """
+        rng = np.random.default_rng(seed)
+        report = {}
+        for name, orbit in self.orbits.items():
+            t = rng.uniform(0.0, orbit.period_s, samples)
+            error = self._max_deviation(orbit, self._coeffs[name], self._segment_s[name], t)
+            report[name] = (error, error / orbit.a)
+        return report
@@ -0,0 +1,158 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from .constants import H_DAY_SECONDS
+from .orbits import DAUGHTER_ORBIT, MOTHER_ORBIT, SOLAR_ORBIT
+
+# =============================================================================
+# ORBITAL EVENT SEARCH
+# =============================================================================
+# Apsides follow directly from the mean anomaly (M = 0 at periapsis, pi at
+# apoapsis), so they are computed in closed form. Events without a closed
+# form, such as Mother-Daughter conjunctions, are found by sampling a
+# function over the span in vectorized chunks, then refining every bracketed
+# sign change at once with vectorized bisection.
+
+PERIAPSIS = "periapsis"
+APOAPSIS = "apoapsis"
+PERIHELION = "perihelion"
+APHELION = "aphelion"
+CONJUNCTION = "conjunction"
+CONVERGENCE = "convergence"
+
+ALL_EVENT_KINDS = (PERIAPSIS, APOAPSIS, PERIHELION, APHELION, CONJUNCTION, CONVERGENCE)
+
+
+class OrbitalEvent(NamedTuple):
+    """
+    One event. `t_s` is seconds since the simulation start. `value` depends
+    on the kind: the distance for apsides, the distance between the moons
+    for conjunctions, and Daughter's phase offset in radians for
+    convergences.
+    """
+    t_s: float
+    kind: str
+    body: str
+    value: float
+
+    @property
+    def h_days(self):
+        return self.t_s / H_DAY_SECONDS
+
+
+def _wrap(angle):
+    """Wraps angles to [-pi, pi)."""
+    return np.mod(angle + np.pi, 2 * np.pi) - np.pi
+
+
+def find_roots(f, t_start, t_end, step_s, chunk_samples=1 << 20, tolerance_s=1e-3, max_jump=np.pi / 2):
+    """
+    Finds the times in [t_start, t_end) where the vectorized function f
+    changes sign. f is sampled every `step_s` seconds, so roots closer
+    together than a step can be missed. Sign changes where |f| jumps by
+    more than `max_jump` (such as a wrapped angle passing +-pi) are
+    discontinuities, not roots, and are skipped.
+    """
+    roots = []
+    n_total = int(np.ceil((t_end - t_start) / step_s))
+    iterations = max(int(np.ceil(np.log2(step_s / tolerance_s))), 1)
+    for first in range(0, n_total, chunk_samples):
+        # Overlap chunks by one sample so brackets across the seam are kept
+        n = min(chunk_samples, n_total - first) + 1
+        t = t_start + (first + np.arange(n)) * step_s
+        t[-1] = min(t[-1], t_end)
+        values = f(t)
+        # A root on a sample is only reported as that sample, never also
+        # bisected from the interval that ends there
+        exact = values[:-1] == 0
+        bracket = ~exact & (values[1:] != 0) & (np.signbit(values[:-1]) != np.signbit(values[1:])) & \
+                  (np.abs(values[1:] - values[:-1]) < max_jump)
+        lo = t[:-1][bracket]
+        hi = t[1:][bracket]
+        f_lo = values[:-1][bracket]
+        for _ in range(iterations):
+            mid = 0.5 * (lo + hi)
+            f_mid = f(mid)
+            same = np.signbit(f_mid) == np.signbit(f_lo)
+            lo = np.where(same, mid, lo)
+            f_lo = np.where(same, f_mid, f_lo)
+            hi = np.where(same, hi, mid)
+        roots.append(np.sort(np.concatenate([t[:-1][exact], 0.5 * (lo + hi)])))
+    return np.concatenate(roots) if roots else np.empty(0)
+
+
+def apsis_times(orbit, t_start, t_end, apoapsis=False):
+    """Times in [t_start, t_end) at which `orbit` passes periapsis (or apoapsis)."""
+    target = np.pi if apoapsis else 0.0
+    k_first = np.ceil((orbit.mean_anomaly(t_start) - target) / (2 * np.pi))
+    k_last = np.ceil((orbit.mean_anomaly(t_end) - target) / (2 * np.pi))
+    k = np.arange(k_first, k_last)
+    return (target + 2 * np.pi * k - orbit.M_initial) / orbit.n
+
+
+def _apsis_events(orbit, t_start, t_end, periapsis_kind, apoapsis_kind, kinds):
+    events = []
+    for kind, apoapsis, distance in ((periapsis_kind, False, orbit.a * (1 - orbit.e)),
+                                     (apoapsis_kind, True, orbit.a * (1 + orbit.e))):
+        if kind in kinds:
+            events.extend(OrbitalEvent(float(t), kind, orbit.name, distance)
+                          for t in apsis_times(orbit, t_start, t_end, apoapsis))
+    return events
+
+
+def conjunction_times(first, second, t_start, t_end, step_s=H_DAY_SECONDS / 4, chunk_samples=1 << 20):
+    """
+    Times at which two orbits sharing a plane and periapsis direction have
+    the same true anomaly, i.e. line up as seen from Halferth.
+    """
+    def separation(t):
+        return _wrap(second.radius_and_true_anomaly(t)[1] - first.radius_and_true_anomaly(t)[1])
+    return find_roots(separation, t_start, t_end, step_s, chunk_samples)
+
+
+def convergence_times(first, second, t_start, t_end, tolerance=1e-3):
+    """
+    Times at which both orbits are back at their starting phase: every
+    return of `first` to its start where `second` is within `tolerance`
+    radians of its own. Returns (times, phase offsets of `second`).
+    """
+    k_first = np.ceil(first.n * t_start / (2 * np.pi))
+    k_last = np.ceil(first.n * t_end / (2 * np.pi))
+    t = 2 * np.pi * np.arange(k_first, k_last) / first.n
+    offset = np.abs(_wrap(second.n * t))
+    keep = offset <= tolerance
+    return t[keep], offset[keep]
+
+
+def find_events(t_start, t_end, kinds=ALL_EVENT_KINDS, step_s=H_DAY_SECONDS / 4,
+                chunk_samples=1 << 20, convergence_tolerance=1e-3):
+    """
+    Finds periapsis/apoapsis of both moons, solar perihelion/aphelion,
+    Mother-Daughter conjunctions and returns to the convergence
+    configuration in [t_start, t_end). Returns OrbitalEvents sorted by time.
+    """
+    kinds = set(kinds)
+    unknown = kinds - set(ALL_EVENT_KINDS)
+    if unknown:
+        raise ValueError(f"Unknown event kinds: {sorted(unknown)}")
+
+    events = []
+    for orbit in (MOTHER_ORBIT, DAUGHTER_ORBIT):
+        events += _apsis_events(orbit, t_start, t_end, PERIAPSIS, APOAPSIS, kinds)
+    events += _apsis_events(SOLAR_ORBIT, t_start, t_end, PERIHELION, APHELION, kinds)
+
+    if CONJUNCTION in kinds:
+        t = conjunction_times(MOTHER_ORBIT, DAUGHTER_ORBIT, t_start, t_end, step_s, chunk_samples)
+        r_m = MOTHER_ORBIT.radius_and_true_anomaly(t)[0]
+        r_d = DAUGHTER_ORBIT.radius_and_true_anomaly(t)[0]
+        events.extend(OrbitalEvent(float(ti), CONJUNCTION, "mother-daughter", float(d))
+                      for ti, d in zip(t, np.abs(r_m - r_d)))
+
+    if CONVERGENCE in kinds:
+        t, offset = convergence_times(MOTHER_ORBIT, DAUGHTER_ORBIT, t_start, t_end, convergence_tolerance)
+        events.extend(OrbitalEvent(float(ti), CONVERGENCE, "mother-daughter", float(o))
+                      for ti, o in zip(t, offset))
+
+    events.sort()
+    return events
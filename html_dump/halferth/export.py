@@ -0,0 +1,146 @@
+"""
+Binary ephemeris export for the Three.js sim in sim_dev.
+
+sim_dev/public/ephemeris/halferth.bin is generated, not committed: the
+float32 samples differ in their last bits between platforms' maths
+libraries. `npm run dev` and `npm run build` in sim_dev regenerate it with
+
+    cd html_dump && python -m halferth.export ../sim_dev/public/ephemeris/halferth.bin
+
+and the sim computes the orbits per frame when it is missing.
+
+File layout (all little-endian):
+
+    offset 0   4 bytes   magic b"HEPH"
+    offset 4   uint32    format version
+    offset 8   uint32    data offset (multiple of 16)
+    offset 12  uint32    length of the JSON header in bytes
+    offset 16  ...       UTF-8 JSON header, space padded up to the data offset
+    data       float32   positions, shape (n_samples, n_bodies, 2)
+
+Each position is a body's orbital-plane (x / a, y / a), the same coordinates
+KeplerOrbit.position returns divided by the semi-major axis. Every viewer
+maps them into its own scene frame and scale, so the Python scripts and the
+browser sim draw the same orbits from the same samples. The data block can
+be wrapped as-is in a JS Float32Array or read through numpy.memmap.
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+
+from .constants import H_DAY_SECONDS, H_YEAR_SECONDS
+from .orbits import SYSTEM_ORBITS
+
+EPHEMERIS_MAGIC = b"HEPH"
+EPHEMERIS_FORMAT_VERSION = 1
+_PREAMBLE = np.dtype([("magic", "S4"), ("version", "<u4"), ("data_offset", "<u4"), ("header_length", "<u4")])
+
+
+def _is_periodic(orbits, duration_s):
+    """True when `duration_s` is a whole number of periods of every orbit."""
+    return all(abs(duration_s / orbit.period_s - round(duration_s / orbit.period_s)) < 1e-9
+               for orbit in orbits)
+
+
+def sample_ephemeris(orbits, start_s, n_samples, step_s):
+    """Returns (header, data): n_samples of every orbit from start_s, laid out as in the file."""
+    t = start_s + np.arange(n_samples) * step_s
+    data = np.empty((n_samples, len(orbits), 2), dtype="<f4")
+    for i, orbit in enumerate(orbits):
+        x, y = orbit.position(t)
+        data[:, i, 0] = x / orbit.a
+        data[:, i, 1] = y / orbit.a
+
+    header = {
+        "version": EPHEMERIS_FORMAT_VERSION,
+        "dtype": "<f4",
+        "layout": ["sample", "body", "xy"],
+        "units": "orbital-plane x/a, y/a",
+        "start_s": start_s,
+        "step_s": step_s,
+        "n_samples": n_samples,
+        "periodic": _is_periodic(orbits, n_samples * step_s),
+        "h_day_seconds": H_DAY_SECONDS,
+        "bodies": [
+            {"name": orbit.name, "a": orbit.a, "e": orbit.e,
+             "period_s": orbit.period_s, "start_phi": orbit.start_phi}
+            for orbit in orbits
+        ],
+    }
+    return header, data
+
+
+def pack_ephemeris(header, data):
+    """Encodes a header and its float32 data in the file layout, as bytes."""
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_offset = -(-(_PREAMBLE.itemsize + len(header_bytes)) // 16) * 16
+    preamble = np.array([(EPHEMERIS_MAGIC, EPHEMERIS_FORMAT_VERSION, data_offset, len(header_bytes))],
+                        dtype=_PREAMBLE)
+    return b"".join([preamble.tobytes(), header_bytes.ljust(data_offset - _PREAMBLE.itemsize, b" "),
+                     np.ascontiguousarray(data, dtype="<f4").tobytes()])
+
+
+def export_ephemeris(path, orbits=SYSTEM_ORBITS, start_s=0.0, duration_s=H_YEAR_SECONDS,
+                     step_s=H_DAY_SECONDS / 20):
+    """
+    Samples every orbit from `start_s` for `duration_s` every `step_s` seconds
+    and writes the result to `path`. Returns the header dict.
+
+    The default span is one Halferth year, which holds exactly 6 Mother and
+    12 Daughter orbits, so readers can wrap the samples to loop forever.
+    """
+    header, data = sample_ephemeris(orbits, start_s, int(round(duration_s / step_s)), step_s)
+    with open(path, "wb") as f:
+        f.write(pack_ephemeris(header, data))
+    return header
+
+
+def _check_preamble(preamble, source):
+    if preamble.size == 0 or preamble["magic"][0] != EPHEMERIS_MAGIC:
+        raise ValueError(f"{source} is not a Halferth ephemeris")
+    version = int(preamble["version"][0])
+    if version != EPHEMERIS_FORMAT_VERSION:
+        raise ValueError(f"{source} has ephemeris format version {version}, "
+                         f"expected {EPHEMERIS_FORMAT_VERSION}")
+    return int(preamble["data_offset"][0]), int(preamble["header_length"][0])
+
+
+def unpack_ephemeris(buffer):
+    """Decodes bytes made by pack_ephemeris. Returns (header, positions)."""
+    preamble = np.frombuffer(buffer, dtype=_PREAMBLE, count=1) if len(buffer) >= _PREAMBLE.itemsize \
+        else np.empty(0, dtype=_PREAMBLE)
+    data_offset, header_length = _check_preamble(preamble, "buffer")
+    header = json.loads(bytes(buffer[_PREAMBLE.itemsize:_PREAMBLE.itemsize + header_length]).decode("utf-8"))
+    positions = np.frombuffer(buffer, dtype=header["dtype"], offset=data_offset).reshape(
+        header["n_samples"], len(header["bodies"]), 2)
+    return header, positions
+
+
+def load_ephemeris(path):
+    """
+    Opens an exported ephemeris. Returns (header, positions) where positions
+    is a read-only numpy.memmap of shape (n_samples, n_bodies, 2).
+    """
+    data_offset, header_length = _check_preamble(np.fromfile(path, dtype=_PREAMBLE, count=1), path)
+    with open(path, "rb") as f:
+        f.seek(_PREAMBLE.itemsize)
+        header = json.loads(f.read(header_length).decode("utf-8"))
+    positions = np.memmap(path, dtype=header["dtype"], mode="r", offset=data_offset,
+                          shape=(header["n_samples"], len(header["bodies"]), 2))
+    return header, positions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a binary Halferth ephemeris for the web sim.")
+    parser.add_argument("path", help="output file, e.g. sim_dev/public/ephemeris/halferth.bin")
+    parser.add_argument("--years", type=float, default=1.0, help="span in Halferth years (default 1)")
+    parser.add_argument("--samples-per-day", type=int, default=20, help="samples per Halferth day (default 20)")
+    args = parser.parse_args()
+
+    Path(args.path).parent.mkdir(parents=True, exist_ok=True)
+    header = export_ephemeris(args.path, duration_s=args.years * H_YEAR_SECONDS,
+                              step_s=H_DAY_SECONDS / args.samples_per_day)
+    print(f"Wrote {header['n_samples']} samples of {len(header['bodies'])} bodies to {args.path}")
@@ -0,0 +1,127 @@
+import math
+
+import numpy as np
+
+from .clock import spin_angle
+from .constants import (
+    DAUGHTER_ORBIT_DISPLAY_AVG_RADIUS,
+    H_DAY_SECONDS,
+    MOTHER_ORBIT_DISPLAY_AVG_RADIUS,
+    PLANET_DISPLAY_RADIUS,
+    POST_DISPLAY_LENGTH,
+    SOLAR_ORBIT_DISPLAY_RADIUS,
+    TRAIL_HISTORY_DAYS,
+    a_daughter_physical,
+    a_mother_physical,
+)
+from .orbits import SOLAR_ORBIT, WORLD_SPACE_FIXED_NORTH_POLE, angle_of_tilt_definition, moon_plane_to_world, solar_plane_to_world
+from .profiling import FrameProfiler
+
+# =============================================================================
+# SYSTEM VIEW FRAME UPDATE
+# =============================================================================
+# The per-frame scene update of halferth_system(WORKING).py, kept here so
+# that the script and halferth.benchmarks run the same code. It only uses
+# attribute names and the vector constructor it is given, never vpython
+# itself: the script passes vpython objects and vector, the benchmark
+# plain stand-ins, so a benchmark measures everything the script does
+# except the browser.
+
+
+class SystemFrame:
+    """
+    Moves the planet, equator, post and moons of `objects` (anything with
+    those attributes, see halferth.scene3d.create_scene_objects) to time
+    t_s through `sync` (a halferth.sync.SceneSync), one update() per frame.
+    """
+
+    def __init__(self, objects, ephemeris, sync, vector, profiler=None):
+        self.planet = objects.planet
+        self.equator = objects.equator
+        self.post = objects.post
+        self.mother = objects.mother
+        self.daughter = objects.daughter
+        self.ephemeris = ephemeris
+        self.sync = sync
+        self.vector = vector
+        self.profiler = profiler if profiler is not None else FrameProfiler((), enabled=False)
+        self.solar_scale = SOLAR_ORBIT_DISPLAY_RADIUS / SOLAR_ORBIT.a
+        self.mother_scale = MOTHER_ORBIT_DISPLAY_AVG_RADIUS / a_mother_physical
+        self.daughter_scale = DAUGHTER_ORBIT_DISPLAY_AVG_RADIUS / a_daughter_physical
+        self._cos_tilt = math.cos(float(angle_of_tilt_definition))
+        self._sin_tilt = math.sin(float(angle_of_tilt_definition))
+        self.spin_shown = 0.0 # Rotation already applied to the planet
+
+        # The pole never moves: rotating the planet about its own axis leaves
+        # the axis as it is, so the axes of the planet, equator and post are
+        # set once here instead of being re-sent every frame.
+        north = [float(c) for c in WORLD_SPACE_FIXED_NORTH_POLE]
+        self.pole = vector(*north)
+        self.equator.axis = vector(*north)
+        self.post.axis = vector(*(-c * POST_DISPLAY_LENGTH for c in north))
+        self._post_offset = [-c * PLANET_DISPLAY_RADIUS for c in north]
+
+    def _moon(self, x, y, scale, px, pz):
+        """World display position of a moon at orbital-plane (x, y) about a planet at (px, 0, pz)."""
+        u = x * scale
+        v = y * scale
+        # (0, u, v) rotated by the tilt about +z
+        return self.vector(px - u * self._sin_tilt, u * self._cos_tilt, pz + v)
+
+    def update(self, t_s, trails=None):
+        """
+        Stages the scene at t_s, appends to `trails` ((mother, daughter)
+        CurveTrails) if given, and flushes the sync, which also sends
+        anything the caller staged earlier in the frame. Returns the moon
+        positions (mother, daughter).
+        """
+        profiler = self.profiler
+        ephemeris = self.ephemeris
+        x_solar, y_solar = ephemeris.position("solar", t_s)
+        x_m, y_m = ephemeris.position("mother", t_s)
+        x_d, y_d = ephemeris.position("daughter", t_s)
+        profiler.mark("ephemeris")
+
+        px = -x_solar * self.solar_scale
+        pz = y_solar * self.solar_scale
+        planet_pos = self.vector(px, 0.0, pz)
+        self.sync.set(self.planet, "pos", planet_pos)
+        spin = spin_angle(t_s)
+        self.planet.rotate(angle=spin - self.spin_shown, axis=self.pole)
+        self.spin_shown = spin
+        self.sync.set(self.equator, "pos", planet_pos)
+        ox, oy, oz = self._post_offset
+        self.sync.set(self.post, "pos", self.vector(px + ox, oy, pz + oz))
+        profiler.mark("planet")
+
+        mother_pos = self._moon(x_m, y_m, self.mother_scale, px, pz)
+        daughter_pos = self._moon(x_d, y_d, self.daughter_scale, px, pz)
+        self.sync.set(self.mother, "pos", mother_pos)
+        self.sync.set(self.daughter, "pos", daughter_pos)
+        profiler.mark("moons")
+
+        if trails is not None:
+            mother_trail, daughter_trail = trails
+            mother_trail.append(t_s, mother_pos)
+            daughter_trail.append(t_s, daughter_pos)
+        profiler.mark("trails")
+
+        self.sync.flush()
+        profiler.mark("push")
+        return mother_pos, daughter_pos
+
+    def trail_window(self, t_end_s, dt_s):
+        """
+        Display positions of both moons over the trail history ending at
+        t_end_s, a point every dt_s, solved as one batch. Returns (times,
+        mother_positions, daughter_positions) with positions as vectors.
+        """
+        count = int(TRAIL_HISTORY_DAYS * H_DAY_SECONDS / dt_s)
+        times = t_end_s - np.arange(count, -1, -1) * dt_s
+        planet_pos = solar_plane_to_world(*self.ephemeris.position("solar", times)) * self.solar_scale
+        mother_xy = np.array(self.ephemeris.position("mother", times)) * self.mother_scale
+        daughter_xy = np.array(self.ephemeris.position("daughter", times)) * self.daughter_scale
+        mother_pos = planet_pos + moon_plane_to_world(*mother_xy)
+        daughter_pos = planet_pos + moon_plane_to_world(*daughter_xy)
+        return (times, [self.vector(*p) for p in mother_pos.tolist()],
+                [self.vector(*p) for p in daughter_pos.tolist()])
@@ -0,0 +1,145 @@
+import math
+import warnings
+
+import numpy as np
+
+# =============================================================================
+# KEPLER'S EQUATION (array versions)
+# =============================================================================
+# Every function here accepts scalars or ndarrays of any shape and broadcasts
+# its arguments against each other, so a whole table of times for a whole set
+# of bodies can be solved in one call instead of one Python loop per value.
+
+TWO_PI = 2 * np.pi
+_SCALARS = (float, int)
+
+# Above this eccentricity Newton's method is started from E = pi: near
+# periapsis the usual start E = M + e sin M lands where the slope
+# 1 - e cos E is almost zero, and the first step throws E far away.
+_HIGH_ECCENTRICITY = 0.8
+
+
+def solve_kepler(M, e, tolerance=1e-6, max_iterations=100):
+    """
+    Solves Kepler's equation M = E - e*sin(E) for E (eccentric anomaly)
+    using Newton's method, for every element of M and e at once.
+
+    Each element stops iterating as soon as its own correction drops below
+    `tolerance`; only the unconverged elements are carried into the next
+    iteration. Scalar input gives a scalar result. Warns (RuntimeWarning)
+    if some element still misses the equation by more than `tolerance`
+    after `max_iterations`.
+    """
+    # isinstance first: np.ndim() of a Python float builds an array
+    if (isinstance(M, _SCALARS) or np.ndim(M) == 0) and (isinstance(e, _SCALARS) or np.ndim(e) == 0):
+        return _solve_kepler_scalar(float(M), float(e), tolerance, max_iterations)
+
+    M, e = np.broadcast_arrays(np.asarray(M, dtype=float), np.asarray(e, dtype=float))
+    shape = M.shape
+    M = M.ravel()
+    e = e.ravel()
+
+    # Solve on M reduced to [-pi, pi] and add the whole turns back afterwards,
+    # so long runs (large M) converge as quickly as the first orbit does.
+    turns = np.round(M / TWO_PI)
+    M_reduced = M - turns * TWO_PI
+
+    E = np.where(e > _HIGH_ECCENTRICITY, np.copysign(np.pi, M_reduced), M_reduced + e * np.sin(M_reduced))
+    active = np.arange(E.size)
+    stalled = []
+    for _ in range(max_iterations):
+        E_a = E[active]
+        e_a = e[active]
+        f_val = E_a - e_a * np.sin(E_a) - M_reduced[active]
+        f_prime_val = 1 - e_a * np.cos(E_a)
+        usable = np.abs(f_prime_val) >= 1e-10
+        delta_E = np.where(usable, f_val / np.where(usable, f_prime_val, 1.0), 0.0)
+        E[active] = E_a - delta_E
+        stalled.append(active[~usable])
+        active = active[usable & (np.abs(delta_E) >= tolerance)]
+        if active.size == 0:
+            break
+
+    unconverged = np.concatenate([active] + stalled)
+    if unconverged.size:
+        residual = np.abs(E[unconverged] - e[unconverged] * np.sin(E[unconverged]) - M_reduced[unconverged])
+        # NaN input (e.g. a disrupted N-body state) is passed through, not reported
+        missed = residual[residual > tolerance]
+        if missed.size:
+            _warn_unconverged(missed.max(), max_iterations)
+
+    E = (E + turns * TWO_PI).reshape(shape)
+    return E[()] if E.ndim == 0 else E
+
+
+def _solve_kepler_scalar(M, e, tolerance, max_iterations):
+    """
+    solve_kepler for one value, in plain floats: per-frame callers pass
+    scalars, and array setup would cost far more than the few Newton steps.
+    """
+    turns = round(M / TWO_PI)
+    M_reduced = M - turns * TWO_PI
+    E = math.copysign(math.pi, M_reduced) if e > _HIGH_ECCENTRICITY else M_reduced + e * math.sin(M_reduced)
+    for _ in range(max_iterations):
+        f_prime_val = 1 - e * math.cos(E)
+        if abs(f_prime_val) < 1e-10:
+            break
+        delta_E = (E - e * math.sin(E) - M_reduced) / f_prime_val
+        E -= delta_E
+        if abs(delta_E) < tolerance:
+            return E + turns * TWO_PI
+    residual = abs(E - e * math.sin(E) - M_reduced)
+    if residual > tolerance:
+        _warn_unconverged(residual, max_iterations, stacklevel=4)
+    return E + turns * TWO_PI
+
+
+def _warn_unconverged(residual, max_iterations, stacklevel=3):
+    warnings.warn(f"solve_kepler did not converge in {max_iterations} iterations "
+                  f"(residual {residual:.3g} rad)", RuntimeWarning, stacklevel=stacklevel)
+
+
+def get_initial_M_from_phi(phi, e):
+    """
+    Calculates the initial Mean Anomaly (M) required to produce a given
+    True Anomaly (phi) for a certain eccentricity (e).
+    """
+    phi = np.asarray(phi, dtype=float)
+    e = np.asarray(e, dtype=float)
+    tan_E_half = np.sqrt((1 - e) / (1 + e)) * np.tan(phi / 2)
+    E = 2 * np.arctan(tan_E_half)
+    M = E - e * np.sin(E)
+    return M[()] if M.ndim == 0 else M
+
+
+def get_true_anomaly_from_eccentric_anomaly(E, e):
+    """Calculates the True Anomaly (phi) from the eccentric anomaly E."""
+    phi = 2 * np.arctan2(np.sqrt(1 + e) * np.sin(np.divide(E, 2)),
+                         np.sqrt(1 - e) * np.cos(np.divide(E, 2)))
+    return phi
+
+
+def get_radius_from_eccentric_anomaly(E, a, e):
+    """Calculates the orbital radius r from the eccentric anomaly E."""
+    return a * (1 - e * np.cos(E))
+
+
+def get_position_from_eccentric_anomaly(E, a, e):
+    """
+    Calculates Cartesian coordinates (x, y) in the orbital plane, with the
+    focus at the origin and periapsis on +x, from eccentric anomaly E.
+    """
+    phi = get_true_anomaly_from_eccentric_anomaly(E, e)
+    r = get_radius_from_eccentric_anomaly(E, a, e)
+    x = r * np.cos(phi)
+    y = r * np.sin(phi)
+    return x, y
+
+
+def get_velocity_from_eccentric_anomaly(E, a, e, n):
+    """
+    Calculates the velocity (vx, vy) in the orbital plane from eccentric
+    anomaly E, for mean motion n (radians per unit time).
+    """
+    E_dot = n / (1 - e * np.cos(E))
+    return -a * np.sin(E) * E_dot, a * np.sqrt(1 - e**2) * np.cos(E) * E_dot
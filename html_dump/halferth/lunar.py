@@ -0,0 +1,220 @@
+"""
+Moon phases, apparent sizes and tides as seen from Halferth, plus yearly
+lookup tables of them:
+
+    python -m halferth.lunar tables/ --years 0 1 2 --samples-per-day 24
+
+writes tables/lunar_year_0000.json and so on, one column per quantity,
+which the almanac and the web sim can interpolate instead of recomputing.
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from .constants import (
+    DAUGHTER_MASS,
+    DAUGHTER_RADIUS_PHYSICAL,
+    G,
+    H_DAY_SECONDS,
+    H_YEAR_SECONDS,
+    HALFERTH_RADIUS_PHYSICAL,
+    MOTHER_MASS,
+    MOTHER_RADIUS_PHYSICAL,
+    SUN_MASS,
+)
+from .orbits import DAUGHTER_ORBIT, MOTHER_ORBIT, angle_of_tilt_definition, rotate_about_z
+from .sky import body_vector
+
+# =============================================================================
+# PHASE, ILLUMINATION AND APPARENT SIZE
+# =============================================================================
+# Everything is derived from the planet-centred vectors of the sun and the
+# moon (sky.body_vector), so any array of times is one vectorized orbit
+# solve per body. Quantities are for an observer at Halferth's centre;
+# topocentric corrections are in halferth.sky.
+
+MOONS = ("mother", "daughter")
+_MOON_ORBITS = {"mother": MOTHER_ORBIT, "daughter": DAUGHTER_ORBIT}
+_MOON_RADII = {"mother": MOTHER_RADIUS_PHYSICAL, "daughter": DAUGHTER_RADIUS_PHYSICAL}
+_GM = {"sun": G * SUN_MASS, "mother": G * MOTHER_MASS, "daughter": G * DAUGHTER_MASS}
+
+# Both moons orbit in the plane (0, x, y) tilted about +z, so their orbit
+# normal is the tilted +x axis; the moons go round it anticlockwise
+_MOON_ORBIT_NORMAL = np.array(rotate_about_z(1.0, 0.0, 0.0, angle_of_tilt_definition))
+
+
+class MoonConditions(NamedTuple):
+    """
+    One moon at an array of times. `phase` is the moon's elongation from
+    the sun in its orbit plane as a fraction of a turn: 0 at new, 0.5 at
+    full, growing steadily back to 1. `phase_angle_deg` is the 3D
+    sun-moon-Halferth angle (0 at full), which sets illuminated_fraction.
+    """
+    phase: np.ndarray
+    illuminated_fraction: np.ndarray
+    phase_angle_deg: np.ndarray
+    distance_m: np.ndarray
+    angular_diameter_deg: np.ndarray
+
+
+def _unit(d):
+    return d / np.linalg.norm(d, axis=-1, keepdims=True)
+
+
+def _angular_diameter_deg(radius, distance):
+    return np.degrees(2 * np.arcsin(np.minimum(radius / distance, 1.0)))
+
+
+def moon_conditions(body, t):
+    """Phase, illumination, distance and angular size of `body` ("mother" or "daughter") at time(s) t."""
+    if body not in _MOON_ORBITS:
+        raise ValueError(f"Unknown moon {body!r}, expected one of {MOONS}")
+    moon = body_vector(body, t)
+    sun = body_vector("sun", t)
+    moon_dir = _unit(moon)
+    sun_dir = _unit(sun)
+
+    # Phase angle at the moon, between the directions to the sun and to Halferth
+    cos_phase_angle = np.clip(np.sum(_unit(sun - moon) * -moon_dir, axis=-1), -1.0, 1.0)
+    phase_angle = np.arccos(cos_phase_angle)
+    # The phase is the moon's elongation from the sun measured in the moon's
+    # orbit plane, which grows steadily as the moon goes round; the 3D
+    # angle alone cannot tell waxing from waning
+    sun_in_plane = sun_dir - np.multiply.outer(sun_dir @ _MOON_ORBIT_NORMAL, _MOON_ORBIT_NORMAL)
+    elongation = np.arctan2(np.cross(sun_in_plane, moon_dir) @ _MOON_ORBIT_NORMAL,
+                            np.sum(sun_in_plane * moon_dir, axis=-1))
+    distance = np.linalg.norm(moon, axis=-1)
+    return MoonConditions(
+        phase=np.mod(elongation / (2 * np.pi), 1.0),
+        illuminated_fraction=(1 + cos_phase_angle) / 2,
+        phase_angle_deg=np.degrees(phase_angle),
+        distance_m=distance,
+        angular_diameter_deg=_angular_diameter_deg(_MOON_RADII[body], distance),
+    )
+
+
+def angular_size_range(body):
+    """Angular diameter of `body` in degrees at (perigee, apogee), from Halferth's centre."""
+    orbit = _MOON_ORBITS[body]
+    return (float(_angular_diameter_deg(_MOON_RADII[body], orbit.a * (1 - orbit.e))),
+            float(_angular_diameter_deg(_MOON_RADII[body], orbit.a * (1 + orbit.e))))
+
+
+# =============================================================================
+# TIDES
+# =============================================================================
+# A body of mass M at planet-centred position d pulls a surface point r
+# (relative to Halferth's centre) with tidal acceleration
+#     GM / |d|^3 * (3 (d.r) d/|d|^2 - r),
+# a linear map of r. Summing the three maps gives the combined tidal field,
+# and its largest eigenvalue times the planet radius is the strongest
+# combined tidal acceleration anywhere on the surface. For one body alone
+# that reduces to the familiar 2 GM R / |d|^3.
+
+
+class TidalAccelerations(NamedTuple):
+    """Peak surface tidal accelerations (m/s^2) from each body and from all three together."""
+    sun: np.ndarray
+    mother: np.ndarray
+    daughter: np.ndarray
+    combined: np.ndarray
+
+
+def tidal_accelerations(t, radius=HALFERTH_RADIUS_PHYSICAL):
+    """Peak tidal accelerations on Halferth's surface at time(s) t."""
+    t = np.asarray(t, dtype=float)
+    field = np.zeros(t.shape + (3, 3))
+    peaks = {}
+    for body in ("sun", "mother", "daughter"):
+        d = body_vector(body, t)
+        distance = np.linalg.norm(d, axis=-1)
+        strength = _GM[body] / distance ** 3
+        d_hat = d / distance[..., None]
+        field += strength[..., None, None] * (3 * d_hat[..., :, None] * d_hat[..., None, :] - np.eye(3))
+        peaks[body] = 2 * strength * radius
+    eigenvalues = np.linalg.eigvalsh(field)
+    combined = radius * np.max(np.abs(eigenvalues), axis=-1)
+    return TidalAccelerations(sun=peaks["sun"], mother=peaks["mother"], daughter=peaks["daughter"],
+                              combined=combined)
+
+
+# =============================================================================
+# YEARLY TABLES
+# =============================================================================
+# One simulated year sampled at a fixed step, stored as named columns. Phase
+# columns are cyclic and interpolated through their wrap by table_value().
+
+TABLE_COLUMNS = (
+    "t_s",
+    *(f"{moon}_{field}" for moon in MOONS
+      for field in ("phase", "illuminated_fraction", "distance_m", "angular_diameter_deg")),
+    "tide_sun", "tide_mother", "tide_daughter", "tide_combined",
+)
+
+
+def yearly_table(year, samples_per_day=24):
+    """Columns (see TABLE_COLUMNS) for simulated year `year` (from 0), as {name: array}."""
+    step_s = H_DAY_SECONDS / samples_per_day
+    t = year * H_YEAR_SECONDS + np.arange(int(round(H_YEAR_SECONDS / step_s))) * step_s
+    table = {"t_s": t}
+    for moon in MOONS:
+        conditions = moon_conditions(moon, t)
+        for field in ("phase", "illuminated_fraction", "distance_m", "angular_diameter_deg"):
+            table[f"{moon}_{field}"] = getattr(conditions, field)
+    tides = tidal_accelerations(t)
+    for body in ("sun", "mother", "daughter", "combined"):
+        table[f"tide_{body}"] = getattr(tides, body)
+    return table
+
+
+def write_yearly_table(path, year, samples_per_day=24):
+    """Writes yearly_table(year) to `path` as JSON; returns the header."""
+    table = yearly_table(year, samples_per_day)
+    header = {
+        "year": year,
+        "start_s": float(table["t_s"][0]),
+        "step_s": H_DAY_SECONDS / samples_per_day,
+        "n_samples": len(table["t_s"]),
+        "h_day_seconds": H_DAY_SECONDS,
+        "columns": list(TABLE_COLUMNS),
+    }
+    columns = {name: [float(f"{value:.9g}") for value in table[name]] for name in TABLE_COLUMNS}
+    Path(path).write_text(json.dumps({"header": header, "columns": columns}))
+    return header
+
+
+def load_yearly_table(path):
+    """Reads a table written by write_yearly_table. Returns (header, {name: array})."""
+    data = json.loads(Path(path).read_text())
+    return data["header"], {name: np.asarray(values) for name, values in data["columns"].items()}
+
+
+def table_value(table, column, t):
+    """Linearly interpolates `column` of a yearly table at time(s) t within its year."""
+    values = table[column]
+    if column.endswith("_phase"):
+        unwrapped = np.unwrap(2 * np.pi * values) / (2 * np.pi)
+        return np.mod(np.interp(t, table["t_s"], unwrapped), 1.0)
+    return np.interp(t, table["t_s"], values)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write yearly tables of moon phases, sizes and tides.")
+    parser.add_argument("directory", help="output directory")
+    parser.add_argument("--years", type=int, nargs="+", default=[0], help="simulated years, from 0 (default 0)")
+    parser.add_argument("--samples-per-day", type=int, default=24, help="samples per Halferth day (default 24)")
+    args = parser.parse_args()
+
+    directory = Path(args.directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for year in args.years:
+        path = directory / f"lunar_year_{year:04d}.json"
+        header = write_yearly_table(path, year, args.samples_per_day)
+        print(f"Wrote {header['n_samples']} samples of year {year} to {path}")
+    for moon in MOONS:
+        perigee, apogee = angular_size_range(moon)
+        print(f"{moon}: {perigee:.3f} deg at perigee, {apogee:.3f} deg at apogee")
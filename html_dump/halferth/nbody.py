@@ -0,0 +1,344 @@
+"""
+Symplectic N-body integration of the sun, Halferth and both moons, to check
+how well the independent two-body ellipses used everywhere else hold up.
+
+    python -m halferth.nbody --years 1000                # drift report for 1000 Halferth years
+    python -m halferth.nbody --years 100 --masses lore   # with the lore masses instead
+"""
+
+import argparse
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from .constants import (
+    DAUGHTER_MASS,
+    G,
+    H_DAY_SECONDS,
+    H_YEAR_SECONDS,
+    HALFERTH_MASS,
+    HALFERTH_RADIUS_PHYSICAL,
+    MOTHER_MASS,
+    P_daughter_days,
+    SUN_MASS,
+)
+from .kepler import solve_kepler
+from .orbits import (
+    DAUGHTER_ORBIT,
+    MOTHER_ORBIT,
+    SOLAR_ORBIT,
+    moon_offset,
+    moon_plane_to_world,
+    planet_position,
+    solar_plane_to_world,
+)
+
+# =============================================================================
+# HIERARCHICAL WISDOM-HOLMAN INTEGRATOR
+# =============================================================================
+# Bodies are held in Jacobi coordinates ordered from the inside out:
+# Daughter relative to Halferth, Mother relative to the Halferth-Daughter
+# barycentre, and the sun relative to the barycentre of the planet and both
+# moons. Each coordinate follows an exact Kepler ellipse about the mass
+# inside it (the "drift"), and the small remainder of the forces is applied
+# as velocity kicks, in a kick-drift-kick leapfrog. With the two-body parts
+# solved exactly, steps can be a sizeable fraction of Daughter's orbit and
+# the error stays bounded over long runs instead of accumulating.
+#
+# The three Kepler drifts and all pair forces are computed together as
+# arrays, and every state array may carry leading batch dimensions to
+# integrate an ensemble of systems at the cost of one.
+
+BODY_NAMES = ("halferth", "daughter", "mother", "sun")
+
+
+def kepler_gm():
+    """
+    Gravitational parameters (G*m, m^3/s^2) that reproduce the periods of
+    SOLAR_ORBIT, MOTHER_ORBIT and DAUGHTER_ORBIT exactly. Without
+    interactions, the integrator then follows the same ellipses as
+    solve_kepler, so any drift comes from the bodies perturbing each other.
+    """
+    def mu(orbit):
+        return orbit.n**2 * orbit.a**3
+    gm_daughter = G * DAUGHTER_MASS
+    gm_halferth = mu(DAUGHTER_ORBIT) - gm_daughter
+    gm_mother = mu(MOTHER_ORBIT) - gm_halferth - gm_daughter
+    gm_sun = mu(SOLAR_ORBIT) - gm_halferth - gm_daughter - gm_mother
+    return {"halferth": gm_halferth, "daughter": gm_daughter, "mother": gm_mother, "sun": gm_sun}
+
+
+def lore_gm():
+    """Gravitational parameters from the lore masses (an Earth-mass planet, a Luna-mass Mother)."""
+    return {"halferth": G * HALFERTH_MASS, "daughter": G * DAUGHTER_MASS,
+            "mother": G * MOTHER_MASS, "sun": G * SUN_MASS}
+
+
+def jacobi_matrix(gm):
+    """
+    Matrix taking Cartesian positions (rows in BODY_NAMES order) to the
+    barycentre followed by the Jacobi coordinates.
+    """
+    m = np.array([gm[name] for name in BODY_NAMES])
+    interior = np.cumsum(m)
+    J = np.zeros((len(m), len(m)))
+    J[0] = m / interior[-1]
+    for k in range(1, len(m)):
+        J[k, :k] = -m[:k] / interior[k - 1]
+        J[k, k] = 1.0
+    return J
+
+
+def kepler_drift(r, v, mu, dt, tolerance=1e-14, max_iterations=20):
+    """
+    Advances bound two-body states (r, v) of shape (..., 3) by dt along their
+    Kepler ellipses with gravitational parameters mu, using Danby's f and g
+    functions on the change in eccentric anomaly. dt should be well under an
+    orbital period.
+
+    The change x in eccentric anomaly is E1 - E0, with E1 from solve_kepler:
+    Newton's method on x directly, started at x = n dt, diverges from near
+    periapsis once e is above about 0.99.
+    """
+    r0 = np.sqrt(np.sum(r * r, axis=-1))
+    v2 = np.sum(v * v, axis=-1)
+    rv = np.sum(r * v, axis=-1)
+    a = 1 / (2 / r0 - v2 / mu)
+    n = np.sqrt(mu / a**3)
+    ec = 1 - r0 / a
+    es = rv / (n * a * a)
+    dM = n * dt
+
+    # ec = e cos E0 and es = e sin E0; NaN states (disrupted ensemble
+    # members) pass through solve_kepler as NaN
+    e = np.hypot(ec, es)
+    E0 = np.arctan2(es, ec)
+    x = solve_kepler(E0 - es + dM, e, tolerance, max_iterations) - E0
+    s = np.sin(x)
+    c = np.cos(x)
+    r_new = a * (1 - ec * c + es * s)
+    f = 1 - a / r0 * (1 - c)
+    g = dt - (x - s) / n
+    f_dot = -n * a * a * s / (r_new * r0)
+    g_dot = 1 - a / r_new * (1 - c)
+    return (f[..., None] * r + g[..., None] * v,
+            f_dot[..., None] * r + g_dot[..., None] * v)
+
+
+class NBodyRun(NamedTuple):
+    """
+    Output of a run, sampled every output step. Positions are in the world
+    frame of halferth.orbits: `planet` is Halferth relative to the sun, and
+    `mother`/`daughter` are relative to Halferth, so each compares directly
+    with planet_position() and moon_offset(). Shapes are (time, ..., 3).
+    `disrupted_s` has the batch shape: the output time at which a system was
+    found broken up (NaN while intact); its positions are NaN from then on.
+    """
+    t_s: np.ndarray
+    planet: np.ndarray
+    mother: np.ndarray
+    daughter: np.ndarray
+    disrupted_s: np.ndarray
+
+
+class HierarchicalWisdomHolman:
+    """
+    Kick-drift-kick Wisdom-Holman integrator for the Halferth system. The
+    moons may be test particles (gm 0); Halferth and the sun need mass.
+    """
+
+    def __init__(self, gm=None, step_s=P_daughter_days * H_DAY_SECONDS / 64):
+        self.gm = kepler_gm() if gm is None else dict(gm)
+        if any(self.gm[name] < 0 for name in BODY_NAMES) or self.gm["halferth"] <= 0 or self.gm["sun"] <= 0:
+            raise ValueError(f"Gravitational parameters must be >= 0, and > 0 for Halferth and the sun: {self.gm}")
+        self.step_s = step_s
+        m = np.array([self.gm[name] for name in BODY_NAMES])
+        interior = np.cumsum(m)
+        self.J = jacobi_matrix(self.gm)
+        self.J_inv = np.linalg.inv(self.J)
+        # The Kepler mu of each Jacobi coordinate
+        self.mu = interior[1:]
+        # Pull of each body j on every other body i (gm_j, zero diagonal); the
+        # identity keeps the diagonal distances non-zero so no body pulls on
+        # itself. Working in accelerations rather than forces never divides
+        # by a body's mass, so test-particle moons (gm down to 0) are fine.
+        self._pull_gm = np.broadcast_to(m, (len(m), len(m))) * (1 - np.eye(len(m)))
+        self._eye = np.eye(len(m))
+
+    def initial_state(self, t=0.0):
+        """
+        Jacobi positions and velocities, shape (3, 3), that put every body on
+        its orbit from halferth.orbits at time t. Velocities come from each
+        orbit's own elements scaled to this integrator's mu, so `a`, `e` and
+        the phase match even when the masses do not reproduce the periods.
+        """
+        def state(orbit, to_world, mu, sign=1.0):
+            scale = np.sqrt(mu / (orbit.n**2 * orbit.a**3))
+            return (sign * to_world(*orbit.position(t)),
+                    sign * scale * to_world(*orbit.velocity(t)))
+        r_d, v_d = state(DAUGHTER_ORBIT, moon_plane_to_world, self.mu[0])
+        r_m, v_m = state(MOTHER_ORBIT, moon_plane_to_world, self.mu[1])
+        # The sun's Jacobi coordinate points from the planet system to the sun
+        r_s, v_s = state(SOLAR_ORBIT, solar_plane_to_world, self.mu[2], sign=-1.0)
+        return np.stack([r_d, r_m, r_s]), np.stack([v_d, v_m, v_s])
+
+    def to_cartesian(self, r_jacobi):
+        """Barycentric Cartesian positions, shape (..., 4, 3), from Jacobi positions."""
+        zeros = np.zeros(r_jacobi.shape[:-2] + (1, 3))
+        return np.einsum("ij,...jk->...ik", self.J_inv, np.concatenate([zeros, r_jacobi], axis=-2))
+
+    def _kick(self, r, v, dt):
+        x = self.to_cartesian(r)
+        d = x[..., None, :, :] - x[..., :, None, :]
+        r2 = np.sum(d * d, axis=-1) + self._eye
+        acceleration = np.sum((self._pull_gm / (r2 * np.sqrt(r2)))[..., None] * d, axis=-2)
+        # Jacobi coordinates are linear in the positions, so their
+        # accelerations are the same combination of the bodies'; the drift
+        # already applies -mu r / |r|^3, so the kick gets the remainder
+        jacobi_acceleration = np.einsum("ij,...jk->...ik", self.J[1:], acceleration)
+        r3 = np.sum(r * r, axis=-1) ** 1.5
+        jacobi_acceleration += (self.mu / r3)[..., None] * r
+        return v + dt * jacobi_acceleration
+
+    def step(self, r, v, steps=1):
+        """Advances Jacobi (r, v) by `steps` steps, merging the half kicks between them."""
+        h = self.step_s
+        v = self._kick(r, v, h / 2)
+        for k in range(steps):
+            r, v = kepler_drift(r, v, self.mu, h)
+            v = self._kick(r, v, h if k < steps - 1 else h / 2)
+        return r, v
+
+    def run(self, duration_s, output_every_s=H_DAY_SECONDS, state=None):
+        """
+        Integrates from `state` (default: initial_state()) for duration_s,
+        recording every output_every_s (rounded to whole steps). Stops early
+        once every system in the batch has broken up.
+        """
+        r, v = self.initial_state() if state is None else state
+        steps_per_output = max(int(round(output_every_s / self.step_s)), 1)
+        outputs = int(np.floor(duration_s / (steps_per_output * self.step_s) + 1e-9))
+        disrupted_s = np.full(r.shape[:-2], np.nan)
+        samples = [self._observe(r)]
+        for k in range(1, outputs + 1):
+            r, v = self.step(r, v, steps_per_output)
+            broken = self.disrupted(r, v) & np.isnan(disrupted_s)
+            if np.any(broken):
+                disrupted_s[broken] = k * steps_per_output * self.step_s
+                r = np.where(broken[..., None, None], np.nan, r)
+                v = np.where(broken[..., None, None], np.nan, v)
+            samples.append(self._observe(r))
+            if not np.any(np.isnan(disrupted_s)):
+                break
+        t = np.arange(len(samples)) * steps_per_output * self.step_s
+        planet, mother, daughter = (np.array(body) for body in zip(*samples))
+        return NBodyRun(t, planet, mother, daughter, disrupted_s)
+
+    def disrupted(self, r, v):
+        """
+        True where a system has broken up: a moon is unbound, or its
+        osculating periapsis dips below Halferth's surface (a fixed step
+        cannot follow such an orbit anyway), or the state is no longer finite.
+        """
+        r_moons = r[..., :2, :]
+        v_moons = v[..., :2, :]
+        mu = self.mu[:2]
+        distance = np.sqrt(np.sum(r_moons * r_moons, axis=-1))
+        energy = np.sum(v_moons * v_moons, axis=-1) / 2 - mu / distance
+        h = np.cross(r_moons, v_moons)
+        eccentricity = np.sqrt(np.sum((np.cross(v_moons, h) / mu[:, None] - r_moons / distance[..., None]) ** 2, axis=-1))
+        periapsis = -mu / (2 * energy) * (1 - eccentricity)
+        with np.errstate(invalid="ignore"):
+            broken = ~((energy < 0) & (periapsis > HALFERTH_RADIUS_PHYSICAL))
+        return np.any(broken, axis=-1) | ~np.all(np.isfinite(r), axis=(-2, -1))
+
+    def _observe(self, r):
+        x = self.to_cartesian(r)
+        halferth, daughter, mother, sun = (x[..., i, :] for i in range(4))
+        return halferth - sun, mother - halferth, daughter - halferth
+
+
+# =============================================================================
+# DRIFT AGAINST THE TWO-BODY PATH
+# =============================================================================
+
+def _moon_plane_angle(offset):
+    """Angle of a planet-centred offset within the (un-precessed) moon plane."""
+    u = moon_plane_to_world(1.0, 0.0)
+    w = moon_plane_to_world(0.0, 1.0)
+    return np.arctan2(offset @ w, offset @ u)
+
+
+def _last_finite(values):
+    """Values at the last finite time sample of each system, along axis 0."""
+    finite = np.isfinite(values)
+    last = finite.shape[0] - 1 - np.argmax(finite[::-1], axis=0)
+    return np.take_along_axis(values, last[None], axis=0)[0]
+
+
+def drift_report(run):
+    """
+    Compares a run with the solve_kepler path at the same times. Returns
+    {name: {...}} with the largest position error (m), the largest radial
+    error as a fraction of the Kepler distance, and the final and largest
+    angular drift (radians) along the orbit. "convergence" holds the drift
+    of the Mother-Daughter phase difference that sets the 70-day cycle.
+    Systems that broke up only count up to their disruption; "disrupted_s"
+    is the earliest disruption time in the run (NaN if none).
+    """
+    t = run.t_s
+    batch = (1,) * (run.planet.ndim - 2)
+    def expand(a):
+        return a.reshape(a.shape[:1] + batch + a.shape[1:])
+
+    report = {}
+    angles = {}
+    for name, simulated, reference, angle in (
+            ("solar", run.planet, expand(planet_position(t)),
+             lambda p: np.arctan2(p[..., 2], -p[..., 0])),
+            ("mother", run.mother, expand(moon_offset(MOTHER_ORBIT, t)), _moon_plane_angle),
+            ("daughter", run.daughter, expand(moon_offset(DAUGHTER_ORBIT, t)), _moon_plane_angle)):
+        error = np.linalg.norm(simulated - reference, axis=-1)
+        radius = np.linalg.norm(reference, axis=-1)
+        radial = (np.linalg.norm(simulated, axis=-1) - radius) / radius
+        # Unwrap along time so whole extra or missing turns are counted
+        drift = np.unwrap(angle(simulated), axis=0) - np.unwrap(angle(reference), axis=0)
+        angles[name] = drift
+        report[name] = {
+            "max_position_error_m": float(np.nanmax(error)),
+            "max_radial_error": float(np.nanmax(np.abs(radial))),
+            "final_angle_drift_rad": float(np.nanmax(np.abs(_last_finite(drift)))),
+            "max_angle_drift_rad": float(np.nanmax(np.abs(drift))),
+        }
+    phase = angles["daughter"] - angles["mother"]
+    report["convergence"] = {
+        "final_phase_drift_rad": float(np.nanmax(np.abs(_last_finite(phase)))),
+        "max_phase_drift_rad": float(np.nanmax(np.abs(phase))),
+    }
+    report["disrupted_s"] = float(np.nanmin(run.disrupted_s)) if np.any(np.isfinite(run.disrupted_s)) else np.nan
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Integrate the Halferth system and report drift from the Kepler orbits.")
+    parser.add_argument("--years", type=float, default=100.0, help="span in Halferth years (default 100)")
+    parser.add_argument("--steps-per-daughter-orbit", type=int, default=64,
+                        help="integration steps per Daughter orbit (default 64)")
+    parser.add_argument("--output-days", type=float, default=1.0, help="output cadence in Halferth days (default 1)")
+    parser.add_argument("--masses", choices=("kepler", "lore"), default="kepler",
+                        help="'kepler' reproduces the script periods, 'lore' uses the lore masses")
+    args = parser.parse_args()
+
+    integrator = HierarchicalWisdomHolman(kepler_gm() if args.masses == "kepler" else lore_gm(),
+                                          step_s=P_daughter_days * H_DAY_SECONDS / args.steps_per_daughter_orbit)
+    start = time.perf_counter()
+    run = integrator.run(args.years * H_YEAR_SECONDS, args.output_days * H_DAY_SECONDS)
+    elapsed = time.perf_counter() - start
+    print(f"Integrated {args.years:g} Halferth years with {args.masses} masses in {elapsed:.1f} s")
+    report = drift_report(run)
+    disrupted_s = report.pop("disrupted_s")
+    if np.isfinite(disrupted_s):
+        print(f"The moon system broke up after {disrupted_s / H_YEAR_SECONDS:.2f} Halferth years")
+    for name, stats in report.items():
+        print(f"{name:>12}: " + ", ".join(f"{key} {value:.4g}" for key, value in stats.items()))
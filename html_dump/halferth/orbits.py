@@ -0,0 +1,125 @@
+import numpy as np
+
+from .constants import (
+    ECC_HALFERTH_SOLAR,
+    HALFERTH_AXIAL_TILT,
+    H_DAY_SECONDS,
+    H_YEAR_SECONDS,
+    P_daughter_days,
+    P_mother_days,
+    a_daughter_physical,
+    a_halferth_solar_physical,
+    a_mother_physical,
+    e_daughter,
+    e_mother,
+    moon_start_phi,
+    solar_start_phi,
+)
+from .kepler import (
+    get_initial_M_from_phi,
+    get_position_from_eccentric_anomaly,
+    get_radius_from_eccentric_anomaly,
+    get_true_anomaly_from_eccentric_anomaly,
+    get_velocity_from_eccentric_anomaly,
+    solve_kepler,
+)
+
+
+class KeplerOrbit:
+    """
+    A two-body Keplerian ellipse about a fixed focus. Times are seconds since
+    the start of the simulation; positions are in the orbital plane with
+    periapsis on +x, in the same units as `a`.
+    """
+
+    def __init__(self, name, a, e, period_s, start_phi):
+        self.name = name
+        self.a = a
+        self.e = e
+        self.period_s = period_s
+        self.start_phi = start_phi
+        self.n = 2 * np.pi / period_s
+        self.M_initial = get_initial_M_from_phi(start_phi, e)
+
+    def __repr__(self):
+        return (f"KeplerOrbit({self.name!r}, a={self.a!r}, e={self.e!r}, "
+                f"period_s={self.period_s!r}, start_phi={self.start_phi!r})")
+
+    def mean_anomaly(self, t):
+        return self.M_initial + self.n * np.asarray(t, dtype=float)
+
+    def eccentric_anomaly(self, t):
+        # Reduce t by whole periods first, so late times solve as accurately as early ones
+        t = np.mod(np.asarray(t, dtype=float), self.period_s)
+        return solve_kepler(self.M_initial + self.n * t, self.e)
+
+    def radius_and_true_anomaly(self, t):
+        """Returns (r, phi) at time(s) t."""
+        E = self.eccentric_anomaly(t)
+        return (get_radius_from_eccentric_anomaly(E, self.a, self.e),
+                get_true_anomaly_from_eccentric_anomaly(E, self.e))
+
+    def position(self, t):
+        """Returns (x, y) in the orbital plane at time(s) t."""
+        return get_position_from_eccentric_anomaly(self.eccentric_anomaly(t), self.a, self.e)
+
+    def velocity(self, t):
+        """Returns (vx, vy) in the orbital plane at time(s) t, per second."""
+        return get_velocity_from_eccentric_anomaly(self.eccentric_anomaly(t), self.a, self.e, self.n)
+
+
+# =============================================================================
+# THE HALFERTH SYSTEM
+# =============================================================================
+# "solar" is Halferth's orbit about its sun; the moons orbit Halferth.
+SOLAR_ORBIT = KeplerOrbit("solar", a_halferth_solar_physical, ECC_HALFERTH_SOLAR,
+                          H_YEAR_SECONDS, solar_start_phi)
+MOTHER_ORBIT = KeplerOrbit("mother", a_mother_physical, e_mother,
+                           P_mother_days * H_DAY_SECONDS, moon_start_phi)
+DAUGHTER_ORBIT = KeplerOrbit("daughter", a_daughter_physical, e_daughter,
+                             P_daughter_days * H_DAY_SECONDS, moon_start_phi)
+
+SYSTEM_ORBITS = (SOLAR_ORBIT, MOTHER_ORBIT, DAUGHTER_ORBIT)
+
+
+# =============================================================================
+# WORLD FRAME
+# =============================================================================
+# Same axes as the 3D system view: the sun at the origin, the ecliptic in the
+# x-z plane and +y towards ecliptic north. Halferth's orbital plane maps onto
+# the ecliptic as (-x, 0, y); the moons orbit in the plane (0, x, y) tilted
+# with the planet's axis, by the same rotation about +z.
+angle_of_tilt_definition = -np.radians(HALFERTH_AXIAL_TILT)
+
+
+def rotate_about_z(x, y, z, angle):
+    """Right-handed rotation of (x, y, z) about +z, like vpython's rotate()."""
+    c = np.cos(angle)
+    s = np.sin(angle)
+    return x * c - y * s, x * s + y * c, z
+
+
+WORLD_SPACE_FIXED_NORTH_POLE = np.array(rotate_about_z(0.0, 1.0, 0.0, angle_of_tilt_definition))
+
+
+def solar_plane_to_world(x, y):
+    """Maps Halferth's orbital-plane (x, y) to a world position, shape (..., 3)."""
+    x = np.asarray(x, dtype=float)
+    return np.stack([-x, np.zeros_like(x), np.asarray(y, dtype=float)], axis=-1)
+
+
+def moon_plane_to_world(x, y):
+    """Maps a moon's orbital-plane (x, y) to a planet-centred world offset, shape (..., 3)."""
+    x = np.asarray(x, dtype=float)
+    wx, wy, wz = rotate_about_z(np.zeros_like(x), x, np.asarray(y, dtype=float), angle_of_tilt_definition)
+    return np.stack(np.broadcast_arrays(wx, wy, wz), axis=-1)
+
+
+def planet_position(t, orbit=SOLAR_ORBIT):
+    """Halferth's sun-centred world position at time(s) t, shape (..., 3)."""
+    return solar_plane_to_world(*orbit.position(t))
+
+
+def moon_offset(orbit, t):
+    """A moon's Halferth-centred world position at time(s) t, shape (..., 3)."""
+    return moon_plane_to_world(*orbit.position(t))
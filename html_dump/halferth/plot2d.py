@@ -0,0 +1,188 @@
+"""
+Matplotlib backend for the 2D moon-orbit graph. halferth only loads this
+module, and with it matplotlib, on first use.
+"""
+
+import multiprocessing
+import subprocess
+from types import SimpleNamespace
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.lines import Line2D # Needed for custom legend entries
+
+from .constants import H_DAY_SECONDS, a_daughter_physical, a_mother_physical, e_daughter, e_mother
+from .orbits import DAUGHTER_ORBIT, MOTHER_ORBIT
+
+# The 2D graph is drawn in km
+a_mother = a_mother_physical / 1000
+a_daughter = a_daughter_physical / 1000
+
+
+def create_moon_orbit_figure():
+    """
+    Draws the static parts of the moon-orbit graph (Halferth, both orbits,
+    horizon and apogee/perigee markers, legend) and returns them together
+    with the empty artists that the animation moves.
+    """
+    fig, ax = plt.subplots(figsize=(10.5, 10.5)) # Slightly larger figure to accommodate legend
+    ax.plot(0, 0, 'o', color='saddlebrown', markersize=12, label='Halferth (Focus)')
+
+    # Plot static orbits
+    phi_for_orbit_plot = np.linspace(0, 2 * np.pi, 200)
+    r_mother_orbit = a_mother * (1 - e_mother**2) / (1 + e_mother * np.cos(phi_for_orbit_plot))
+    x_mother_orbit = r_mother_orbit * np.cos(phi_for_orbit_plot)
+    y_mother_orbit = r_mother_orbit * np.sin(phi_for_orbit_plot)
+    ax.plot(x_mother_orbit, y_mother_orbit, linestyle=':', color='cornflowerblue', alpha=0.7, label="Mother's Path")
+
+    r_daughter_orbit = a_daughter * (1 - e_daughter**2) / (1 + e_daughter * np.cos(phi_for_orbit_plot))
+    x_daughter_orbit = r_daughter_orbit * np.cos(phi_for_orbit_plot)
+    y_daughter_orbit = r_daughter_orbit * np.sin(phi_for_orbit_plot)
+    ax.plot(x_daughter_orbit, y_daughter_orbit, linestyle=':', color='lightcoral', alpha=0.7, label="Daughter's Path")
+
+    # 1. Draw Horizon and Apogee/Perigee lines
+    ax.axhline(0, color='black', linestyle='-', lw=1, alpha=0.8) # X-axis
+    ax.axvline(0, color='black', linestyle='-', lw=1, alpha=0.8) # Y-axis
+
+    # 2. Add text labels for axes
+    ax.text(0, 850000, 'RISE', ha='center', va='center', fontsize=12, weight='bold')
+    ax.text(0, -850000, 'SET', ha='center', va='center', fontsize=12, weight='bold')
+    ax.text(-920000, 0, 'A', ha='center', va='center', fontsize=14, weight='bold')
+    ax.text(520000, 0, 'P', ha='center', va='center', fontsize=14, weight='bold')
+    ax.text(-90000, 0, '←', ha='center', va='center', fontsize=18) # Unicode arrow
+
+    # Setup plot objects
+    mother_dot, = ax.plot([], [], 'o', color='blue', markersize=10, label='Mother')
+    daughter_dot, = ax.plot([], [], 'o', color='red', markersize=7, label='Daughter')
+    time_text = ax.text(0.02, 0.95, '', transform=ax.transAxes)
+
+    # Set plot properties
+    ax.set_aspect('equal', adjustable='box')
+    ax.set_xlabel('Distance (km)')
+    ax.set_ylabel('Distance (km)')
+    ax.set_title('Animated Orbits of Halferth\'s Moons (70 H-day cycle)')
+    ax.grid(True, linestyle=':', alpha=0.5)
+
+    max_extent = a_mother * (1 + e_mother) * 1.1
+    ax.set_xlim([-max_extent, max_extent])
+    ax.set_ylim([-max_extent, max_extent])
+
+    # Get handles from existing plot elements
+    handles, labels = ax.get_legend_handles_labels()
+
+    # Create "proxy" artists for the new legend entries
+    legend_elements = [
+        Line2D([0], [0], color='black', lw=1, label='Horizon'),
+        Line2D([0], [0], marker='None', linestyle='None', label='A — apogee'),
+        Line2D([0], [0], marker='None', linestyle='None', label='P — perigee'),
+        Line2D([0], [0], marker='None', linestyle='None', label='← — observer perspe')
+    ]
+
+    # Combine the original handles with the new proxy artists
+    ax.legend(handles=handles + legend_elements, loc='upper right')
+
+    return SimpleNamespace(fig=fig, ax=ax, mother_dot=mother_dot,
+                           daughter_dot=daughter_dot, time_text=time_text)
+
+
+# =============================================================================
+# FAST ANIMATION EXPORT
+# =============================================================================
+# Positions for every frame are solved in one batch up front. Each worker
+# process draws the static background once, then blits only the two moons
+# and the day counter onto it per frame; finished frames are streamed to
+# the encoder in order as the pool returns them.
+
+def moon_frame_positions(num_frames, total_duration_h_days, start_h_day=0.0):
+    """
+    Returns (h_days, mother_xy, daughter_xy) for every frame of a span
+    starting at day start_h_day, positions in km with shape (num_frames, 2).
+    """
+    h_days = start_h_day + np.arange(num_frames) / num_frames * total_duration_h_days
+    t = h_days * H_DAY_SECONDS
+    mother_xy = np.stack(MOTHER_ORBIT.position(t), axis=-1) / 1000
+    daughter_xy = np.stack(DAUGHTER_ORBIT.position(t), axis=-1) / 1000
+    return h_days, mother_xy, daughter_xy
+
+
+_worker = None
+
+
+def _init_frame_worker(writer):
+    global _worker
+    plt.switch_backend("agg")
+    figure = create_moon_orbit_figure()
+    animated = (figure.mother_dot, figure.daughter_dot, figure.time_text)
+    for artist in animated:
+        artist.set_animated(True)
+    canvas = figure.fig.canvas
+    canvas.draw()
+    _worker = SimpleNamespace(figure=figure, animated=animated, writer=writer,
+                              background=canvas.copy_from_bbox(figure.fig.bbox), palette=None)
+    if writer == "pillow":
+        from PIL import Image
+        # Every worker derives the same GIF palette from the same reference
+        # frame, so frames share one palette and encode without re-mapping
+        reference = _render_frame((0.0, (0.0, 0.0), (0.0, 0.0)))
+        _worker.palette = Image.fromarray(reference[..., :3]).quantize(
+            colors=256, method=Image.Quantize.FASTOCTREE)
+
+
+def _render_frame(frame):
+    h_day, mother_xy, daughter_xy = frame
+    figure = _worker.figure
+    canvas = figure.fig.canvas
+    canvas.restore_region(_worker.background)
+    figure.mother_dot.set_data([mother_xy[0]], [mother_xy[1]])
+    figure.daughter_dot.set_data([daughter_xy[0]], [daughter_xy[1]])
+    figure.time_text.set_text(f'Halferth Day: {h_day:.1f}')
+    for artist in _worker.animated:
+        figure.ax.draw_artist(artist)
+    rgba = np.asarray(canvas.buffer_rgba())
+    if _worker.palette is not None:
+        from PIL import Image
+        # Quantize here, in parallel, rather than in the single encoding process
+        return Image.fromarray(rgba[..., :3]).quantize(palette=_worker.palette, dither=Image.Dither.NONE)
+    return rgba.copy()
+
+
+def render_moon_orbit_animation(path, num_frames, total_duration_h_days, fps=25,
+                                writer="pillow", processes=None, chunksize=8, start_h_day=0.0):
+    """
+    Renders the moon-orbit animation to `path` in a process pool.
+
+    writer="pillow" writes a GIF; writer="ffmpeg" pipes raw frames to an
+    ffmpeg process, which picks the container (MP4, GIF, ...) from the file
+    extension.
+    """
+    if writer not in ("pillow", "ffmpeg"):
+        raise ValueError(f"Unknown writer {writer!r}, expected 'pillow' or 'ffmpeg'")
+    h_days, mother_xy, daughter_xy = moon_frame_positions(num_frames, total_duration_h_days, start_h_day)
+    frames = zip(h_days, mother_xy, daughter_xy)
+
+    with multiprocessing.Pool(processes, initializer=_init_frame_worker, initargs=(writer,)) as pool:
+        rendered = pool.imap(_render_frame, frames, chunksize=chunksize)
+        if writer == "pillow":
+            first = next(rendered)
+            first.save(path, save_all=True, append_images=rendered,
+                       duration=1000 / fps, loop=0, optimize=False)
+            return
+
+        first = next(rendered)
+        height, width = first.shape[:2]
+        command = [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{width}x{height}", "-r", str(fps),
+            "-i", "-",
+            "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p",
+            path,
+        ]
+        encoder = subprocess.Popen(command, stdin=subprocess.PIPE)
+        try:
+            encoder.stdin.write(first.tobytes())
+            for frame in rendered:
+                encoder.stdin.write(frame.tobytes())
+        finally:
+            encoder.stdin.close()
+            if encoder.wait() != 0:
+                raise RuntimeError(f"ffmpeg exited with status {encoder.returncode}")
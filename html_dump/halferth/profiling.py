@@ -0,0 +1,140 @@
+import csv
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+# =============================================================================
+# PER-FRAME PROFILING
+# =============================================================================
+# The animation loop calls mark(phase) after each of its phases; the time
+# since the previous mark is charged to that phase. Each mark is one
+# perf_counter_ns() call and a list update, and a whole frame lands in a
+# preallocated ring of the last `window` frames with a single row
+# assignment, so profiling barely moves the frame time it measures.
+# Percentiles are only computed when a caption is asked for. With
+# record=True frames are also kept for export, up to the last
+# `record_limit` of them (about 17 minutes at 100 frames/s by default), so
+# a profiler left running does not grow without bound.
+
+
+class FrameProfiler:
+    """
+    Times named phases of every frame. With enabled=False every method
+    returns immediately, so the calls can stay in the loop.
+    """
+
+    def __init__(self, phases, enabled=True, window=600, record=False, record_limit=100_000):
+        self.phases = tuple(phases)
+        self.enabled = enabled
+        self.window = window
+        self.record = record
+        self.record_limit = record_limit
+        self._index = {name: i for i, name in enumerate(self.phases)}
+        # Column 0 is the frame start, then one column per phase (ns)
+        self._ring = np.zeros((window, len(self.phases) + 1), dtype=np.int64)
+        self._history = deque(maxlen=record_limit)
+        self._frames = 0
+        self._row = None
+        self._last = 0
+
+    @property
+    def frame_count(self):
+        return self._frames
+
+    @property
+    def saved_frame_count(self):
+        """Frames write_csv() and write_chrome_trace() would write."""
+        return len(self._history) if self.record else min(self._frames, self.window)
+
+    def start_frame(self):
+        if not self.enabled:
+            return
+        self._last = time.perf_counter_ns()
+        self._row = [self._last] + [0] * len(self.phases)
+
+    def mark(self, phase):
+        if not self.enabled or self._row is None:
+            return
+        now = time.perf_counter_ns()
+        self._row[self._index[phase] + 1] += now - self._last
+        self._last = now
+
+    def end_frame(self):
+        if not self.enabled or self._row is None:
+            return
+        self._ring[self._frames % self.window] = self._row
+        if self.record:
+            self._history.append(self._row)
+        self._frames += 1
+        self._row = None
+
+    def _recent(self):
+        return self._ring[:min(self._frames, self.window)]
+
+    def percentiles(self, q=(50, 99)):
+        """Returns {phase: [ms at each percentile in q]} over the window, plus "frame" for the total."""
+        recent = self._recent()
+        if not len(recent):
+            return {}
+        durations_ms = recent[:, 1:] / 1e6
+        names = self.phases + ("frame",)
+        columns = np.column_stack([durations_ms, durations_ms.sum(axis=1)])
+        values = np.percentile(columns, q, axis=0)
+        return {name: list(values[:, i]) for i, name in enumerate(names)}
+
+    def summary(self):
+        """One-line rolling p50/p99 text for an on-screen caption."""
+        stats = self.percentiles()
+        if not stats:
+            return "profiling: no frames yet"
+        recent = self._recent()
+        span_s = (recent[:, 0].max() - recent[:, 0].min()) / 1e9
+        fps = (len(recent) - 1) / span_s if span_s > 0 else 0.0
+        parts = [f"{name} {p50:.2f}/{p99:.2f}" for name, (p50, p99) in stats.items()]
+        return f"{fps:.0f} fps, ms p50/p99 over {len(recent)} frames: " + " | ".join(parts)
+
+    def _rows(self):
+        """Frames to export, oldest first."""
+        if self.record:
+            return np.array(self._history, dtype=np.int64).reshape(-1, len(self.phases) + 1)
+        if self._frames <= self.window:
+            return self._recent()
+        return np.roll(self._ring, -(self._frames % self.window), axis=0)
+
+    def write_csv(self, path):
+        """
+        One row per frame: start time and each phase in ms. Covers the last
+        `record_limit` frames when record=True, otherwise the frames still in
+        the window.
+        """
+        rows = self._rows()
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["start_ms", *self.phases, "frame"])
+            if not len(rows):
+                return
+            start_ms = (rows[:, 0] - rows[0, 0]) / 1e6
+            durations_ms = rows[:, 1:] / 1e6
+            for start, durations in zip(start_ms, durations_ms):
+                writer.writerow([f"{start:.3f}", *(f"{d:.4f}" for d in durations), f"{durations.sum():.4f}"])
+
+    def write_chrome_trace(self, path):
+        """Writes the frames as Chrome trace events, for chrome://tracing or Perfetto."""
+        rows = self._rows()
+        events = []
+        if len(rows):
+            origin = rows[0, 0]
+            for frame, row in enumerate(rows):
+                start_us = (row[0] - origin) / 1e3
+                events.append({"name": "frame", "ph": "X", "pid": 1, "tid": 1, "ts": start_us,
+                               "dur": row[1:].sum() / 1e3, "args": {"frame": frame}})
+                # Phases run back to back; lay them out in the order of `phases`
+                for name, duration in zip(self.phases, row[1:]):
+                    if duration:
+                        events.append({"name": name, "ph": "X", "pid": 1, "tid": 1,
+                                       "ts": start_us, "dur": duration / 1e3})
+                        start_us += duration / 1e3
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
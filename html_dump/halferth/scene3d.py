@@ -0,0 +1,144 @@
+"""
+VPython backend for the 3D system view. Importing this module starts the
+vpython browser scene, so halferth only loads it on first use.
+"""
+
+import math
+from types import SimpleNamespace
+
+from vpython import color, cross, curve, cylinder, local_light, mag, ring, rotate, scene, sphere, vector
+
+from .assets import texture_file
+from .constants import (
+    DAUGHTER_DISPLAY_RADIUS,
+    EQUATOR_DISPLAY_THICKNESS,
+    GUIDE_LINE_RADIUS,
+    H_YEAR_DAYS,
+    MOTHER_DISPLAY_RADIUS,
+    ORBIT_PATH_THICKNESS,
+    PLANET_DISPLAY_RADIUS,
+    POST_DISPLAY_RADIUS,
+    SOLAR_ORBIT_DISPLAY_RADIUS,
+    SUN_DISPLAY_RADIUS,
+    TRAIL_DISPLAY_RADIUS,
+    TRAIL_OPACITY,
+)
+from .orbits import WORLD_SPACE_FIXED_NORTH_POLE as _NORTH_POLE
+from .orbits import angle_of_tilt_definition
+
+angle_of_tilt_definition = float(angle_of_tilt_definition)
+axis_to_tilt_around_world = vector(0, 0, 1)
+WORLD_SPACE_FIXED_NORTH_POLE = vector(*map(float, _NORTH_POLE))
+PLANET_FALLBACK_COLOR = vector(0.25, 0.45, 0.75) # When no texture can be found
+
+
+# =============================================================================
+# LAZILY BUILT SCENE OBJECTS
+# =============================================================================
+# Every vpython object is a message to the browser, so objects that start
+# hidden (the guide lines and the trails) are only created the first time
+# they are asked for, as attributes of SceneObjects: the first frame shows
+# up without waiting for them, and a session that never shows them never
+# builds them.
+
+
+def _build_guides():
+    axis_len = SOLAR_ORBIT_DISPLAY_RADIUS * 1.0
+    solstice_line = cylinder(pos=vector(-axis_len,0,0), axis=vector(2*axis_len,0,0), radius=GUIDE_LINE_RADIUS, color=color.red)
+    equinox_line = cylinder(pos=vector(0,0,-axis_len), axis=vector(0,0,2*axis_len), radius=GUIDE_LINE_RADIUS, color=color.green)
+    angle1_rad = math.radians(150); pos1 = vector(-axis_len*math.cos(angle1_rad),0,-axis_len*math.sin(angle1_rad)); axis_vec1 = vector(2*axis_len*math.cos(angle1_rad),0,2*axis_len*math.sin(angle1_rad))
+    season_line_1 = cylinder(pos=pos1, axis=axis_vec1, radius=GUIDE_LINE_RADIUS, color=color.green)
+    angle2_rad = math.radians(30); pos2 = vector(-axis_len*math.cos(angle2_rad),0,-axis_len*math.sin(angle2_rad)); axis_vec2 = vector(2*axis_len*math.cos(angle2_rad),0,2*axis_len*math.sin(angle2_rad))
+    season_line_2 = cylinder(pos=pos2, axis=axis_vec2, radius=GUIDE_LINE_RADIUS, color=color.green)
+    return dict(solstice_line=solstice_line, equinox_line=equinox_line,
+                season_line_1=season_line_1, season_line_2=season_line_2)
+
+
+def _build_trails():
+    mother_trail_curve = curve(color=color.cyan, radius=TRAIL_DISPLAY_RADIUS, opacity=TRAIL_OPACITY, visible=False)
+    daughter_trail_curve = curve(color=color.blue, radius=TRAIL_DISPLAY_RADIUS, opacity=TRAIL_OPACITY, visible=False) # Ensure daughter trail uses blue
+    return dict(mother_trail_curve=mother_trail_curve, daughter_trail_curve=daughter_trail_curve)
+
+
+_LAZY_GROUPS = {
+    "solstice_line": _build_guides,
+    "equinox_line": _build_guides,
+    "season_line_1": _build_guides,
+    "season_line_2": _build_guides,
+    "mother_trail_curve": _build_trails,
+    "daughter_trail_curve": _build_trails,
+}
+
+
+class SceneObjects(SimpleNamespace):
+    """
+    The objects of the system view. The guide lines and trail curves are
+    built, a group at a time, on first attribute access.
+    """
+
+    def __getattr__(self, name):
+        build = _LAZY_GROUPS.get(name)
+        if build is None:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        self.__dict__.update(build())
+        return self.__dict__[name]
+
+    def built(self, name):
+        """Whether the lazily built object `name` exists yet."""
+        return name in self.__dict__
+
+    def set_guides_visible(self, visible):
+        """Shows or hides the guide lines, building them only if they are shown."""
+        if not visible and not self.built("solstice_line"):
+            return
+        for name in ("solstice_line", "equinox_line", "season_line_1", "season_line_2"):
+            getattr(self, name).visible = visible
+
+
+def create_scene_objects(show_guides=True):
+    """
+    Builds the sun, orbit ring, planet and moons of the system view; the
+    guide lines are built now only if `show_guides`, the trails on first use.
+    """
+    scene.background = color.black
+    scene.width = 800
+    scene.height = 600
+    scene.title = f"Halferth System Orbital Dynamics\nDay: 0.0 / {H_YEAR_DAYS}\n"
+
+    sun = sphere(pos=vector(0,0,0), radius=SUN_DISPLAY_RADIUS, color=color.yellow, emissive=True)
+    local_light(pos=vector(0,0,0), color=color.white)
+
+    orbit_path_display = ring(pos=vector(0,0,0), axis=vector(0,1,0), radius=SOLAR_ORBIT_DISPLAY_RADIUS, color=color.gray(0.5), thickness=ORBIT_PATH_THICKNESS)
+
+    # Resolved from the local asset cache, never fetched on every launch
+    planet_texture = texture_file("halferth")
+    if planet_texture is not None:
+        planet = sphere(pos=vector(0,0,0), radius=PLANET_DISPLAY_RADIUS, texture=planet_texture)
+    else:
+        print("Planet texture not found, drawing Halferth in a plain colour")
+        planet = sphere(pos=vector(0,0,0), radius=PLANET_DISPLAY_RADIUS, color=PLANET_FALLBACK_COLOR)
+    equator = ring(radius=PLANET_DISPLAY_RADIUS*1.2, thickness=EQUATOR_DISPLAY_THICKNESS, color=color.green)
+    post = cylinder(radius=POST_DISPLAY_RADIUS, color=color.red)
+
+    mother = sphere(radius=MOTHER_DISPLAY_RADIUS, color=color.cyan) # No make_trail
+    daughter = sphere(radius=DAUGHTER_DISPLAY_RADIUS, color=color.blue) # No make_trail
+
+    planet.axis = WORLD_SPACE_FIXED_NORTH_POLE
+    planet.up = vector(0,0,1)
+    if mag(cross(WORLD_SPACE_FIXED_NORTH_POLE, planet.up)) < 1e-6:
+        planet.up = rotate(vector(1,0,0), angle=angle_of_tilt_definition, axis=axis_to_tilt_around_world)
+
+    scene.center = vector(0,0,0); scene.autoscale = True; scene.autoscale = False
+
+    scene_objects = SceneObjects(
+        sun=sun,
+        orbit_path_display=orbit_path_display,
+        planet=planet,
+        equator=equator,
+        post=post,
+        mother=mother,
+        daughter=daughter,
+    )
+    if show_guides:
+        scene_objects.set_guides_visible(True)
+    return scene_objects
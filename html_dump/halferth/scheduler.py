@@ -0,0 +1,70 @@
+import threading
+import time
+
+# =============================================================================
+# IDLE-AWARE FRAME SCHEDULING
+# =============================================================================
+# The animation loop asks the scheduler for each frame instead of calling
+# rate() itself. While the animation plays, frames come at `render_hz` and
+# each one is given the number of physics steps due at `physics_hz`, so
+# the simulation can step faster or slower than it is drawn. While it is
+# paused the scheduler does not hand out empty frames: it waits for a
+# wake() from a UI callback, checking in at intervals that double from one
+# render frame up to `1 / idle_hz`, so an idle window costs a few wake-ups
+# a second instead of a busy loop. Every UI callback that changes what is
+# shown should call wake(), so a seek or a click while paused is drawn
+# straight away.
+
+
+class FrameScheduler:
+    """
+    Paces the animation loop. `sleep(seconds)` is how the scheduler waits;
+    with vpython pass something built on rate(), which also handles the
+    browser's events (time.sleep would freeze the UI).
+    """
+
+    def __init__(self, physics_hz, render_hz, idle_hz=4.0, max_steps_per_frame=None, sleep=time.sleep):
+        if physics_hz <= 0 or render_hz <= 0 or idle_hz <= 0:
+            raise ValueError("physics_hz, render_hz and idle_hz must be positive")
+        self.physics_hz = physics_hz
+        self.render_hz = render_hz
+        self.idle_hz = min(idle_hz, render_hz)
+        self.max_steps_per_frame = max_steps_per_frame
+        self._sleep = sleep
+        self._woken = threading.Event()
+        self._steps_due = 0.0
+        self.idle_waits = 0 # Check-ins while paused, for diagnostics
+
+    @property
+    def steps_per_frame(self):
+        return self.physics_hz / self.render_hz
+
+    def wake(self):
+        """Ends an idle wait; safe to call from any thread."""
+        self._woken.set()
+
+    def next_frame(self, playing):
+        """
+        Waits for the next frame and returns how many physics steps it
+        should advance: 0 while paused (the frame is then only drawn if the
+        caller has something pending, e.g. a seek). While paused this
+        blocks until wake() is called.
+        """
+        if playing:
+            self._woken.clear()
+            self._sleep(1.0 / self.render_hz)
+            self._steps_due += self.steps_per_frame
+            steps = int(self._steps_due)
+            self._steps_due -= steps
+            if self.max_steps_per_frame is not None and steps > self.max_steps_per_frame:
+                steps = self.max_steps_per_frame
+            return steps
+
+        interval = 1.0 / self.render_hz
+        while not self._woken.is_set():
+            self._sleep(interval)
+            self.idle_waits += 1
+            interval = min(2 * interval, 1.0 / self.idle_hz)
+        self._woken.clear()
+        self._steps_due = 0.0
+        return 0
@@ -0,0 +1,401 @@
+"""
+Local ephemeris server for the web sim, on plain asyncio (no dependencies
+beyond numpy).
+
+    python -m halferth.server --port 8765
+
+Time is cut into fixed chunks of `chunk_days` Halferth days, each sampled
+`samples_per_day` times per day. Every response carries positions in the
+binary layout of halferth.export (orbital-plane x/a, y/a as float32), so
+the browser decodes server chunks and exported files the same way.
+
+HTTP (GET, CORS open to any origin):
+
+    /bodies                                  JSON: bodies, chunk and sample spacing
+    /positions?start_s=..&end_s=..&bodies=mother,daughter
+                                             samples in [start_s, end_s), binary
+
+WebSocket (/ws): the client sends JSON text messages
+
+    {"bodies": ["mother", "daughter"]}       choose bodies (default: all)
+    {"t_s": 123456.0, "rate": 1260.0}        playback position and speed (sim s per s)
+
+and receives one binary message per chunk, in playback order, covering
+the current chunk and `prefetch` chunks ahead (behind, for negative rate).
+Each chunk's header has "chunk" and "start_s". Chunks a connection has
+already been sent are not sent again while they are within 64 chunks of
+its playback position. A message that is not valid (not a JSON object,
+unknown bodies, a time or rate that is not a finite number) is answered
+with a text message {"error": "..."} and otherwise ignored.
+
+Chunks are computed in a worker thread, shared between every connection,
+and kept in an LRU cache of `cache_chunks` entries. Requests for a chunk
+that is still being computed wait for that computation instead of
+starting another, so many tabs playing the same span cost one solve.
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from .constants import H_DAY_SECONDS
+from .export import pack_ephemeris, sample_ephemeris
+from .orbits import SYSTEM_ORBITS
+
+_WEBSOCKET_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_MAX_WINDOW_CHUNKS = 64
+_SENT_WINDOW_CHUNKS = 64 # Chunks a WebSocket remembers sending, each side of playback
+
+
+# =============================================================================
+# CHUNK CACHE
+# =============================================================================
+
+class ChunkCache:
+    """
+    LRU cache of sampled chunks, all bodies per chunk. get() is a coroutine;
+    concurrent get()s of the same chunk share one computation.
+    """
+
+    def __init__(self, orbits=SYSTEM_ORBITS, chunk_days=7, samples_per_day=20, max_chunks=256):
+        self.orbits = tuple(orbits)
+        self.names = [orbit.name for orbit in self.orbits]
+        self.samples_per_chunk = int(chunk_days * samples_per_day)
+        self.step_s = H_DAY_SECONDS / samples_per_day
+        self.chunk_s = self.samples_per_chunk * self.step_s
+        self.max_chunks = max_chunks
+        self._chunks = OrderedDict()
+        self._pending = {}
+        self.hits = 0
+        self.misses = 0
+
+    def chunk_index(self, t_s):
+        if not np.isfinite(t_s):
+            raise ValueError(f"Time must be finite, got {t_s}")
+        return int(np.floor(t_s / self.chunk_s))
+
+    def _compute(self, index):
+        return sample_ephemeris(self.orbits, index * self.chunk_s, self.samples_per_chunk, self.step_s)
+
+    def _start(self, index):
+        """
+        The shared future computing chunk `index`, started if need be. The
+        future itself files the result when it completes, so a waiter that
+        is cancelled (e.g. a WebSocket sender superseded by a new position)
+        does not drop a computation other waiters still share.
+        """
+        future = self._pending.get(index)
+        if future is None:
+            self.misses += 1
+            future = asyncio.get_running_loop().run_in_executor(None, self._compute, index)
+            self._pending[index] = future
+            future.add_done_callback(lambda done: self._finish(index, done))
+        return future
+
+    def _finish(self, index, future):
+        self._pending.pop(index, None)
+        if future.cancelled() or future.exception() is not None:
+            return
+        self._chunks[index] = future.result()
+        self._chunks.move_to_end(index)
+        while len(self._chunks) > self.max_chunks:
+            self._chunks.popitem(last=False)
+
+    async def get(self, index):
+        """Returns (header, data) of chunk `index`, computing it if needed."""
+        if index in self._chunks:
+            self._chunks.move_to_end(index)
+            self.hits += 1
+            return self._chunks[index]
+        return await asyncio.shield(self._start(index))
+
+    def prefetch(self, indices):
+        """Starts computing any of `indices` that are neither cached nor pending."""
+        for index in indices:
+            if index not in self._chunks:
+                self._start(index)
+
+    def select(self, header, data, bodies):
+        """Restricts a chunk to `bodies` (names), keeping the file layout."""
+        columns = [self.names.index(body) for body in bodies]
+        header = dict(header, bodies=[header["bodies"][i] for i in columns])
+        return header, data[:, columns]
+
+    def describe(self):
+        return {
+            "bodies": [{"name": orbit.name, "a": orbit.a, "e": orbit.e,
+                        "period_s": orbit.period_s, "start_phi": orbit.start_phi} for orbit in self.orbits],
+            "chunk_s": self.chunk_s,
+            "step_s": self.step_s,
+            "samples_per_chunk": self.samples_per_chunk,
+            "h_day_seconds": H_DAY_SECONDS,
+        }
+
+
+# =============================================================================
+# HTTP AND WEBSOCKET
+# =============================================================================
+# Just enough HTTP/1.1 for GET requests with keep-alive, and RFC 6455
+# WebSocket framing for the /ws endpoint.
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+async def _read_request(reader):
+    """Returns (method, target, headers) or None at end of stream; HttpError(400) if malformed."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+    lines = head.decode("latin-1").split("\r\n")
+    request_line = lines[0].split(" ")
+    if len(request_line) != 3:
+        raise HttpError(400, f"Malformed request line {lines[0][:80]!r}")
+    method, target, _ = request_line
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    return method, target, headers
+
+
+def _response(status, body, content_type):
+    head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Access-Control-Allow-Origin: *\r\n"
+            "\r\n")
+    return head.encode("latin-1") + body
+
+
+def _websocket_frame(opcode, payload):
+    length = len(payload)
+    if length < 126:
+        head = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        head = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        head = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return head + payload
+
+
+async def _read_websocket_frame(reader):
+    """Returns (opcode, payload) of the next (unfragmented) client frame."""
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length, = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        length, = struct.unpack("!Q", await reader.readexactly(8))
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask:
+        payload = (np.frombuffer(payload, dtype=np.uint8) ^ np.resize(np.frombuffer(mask, dtype=np.uint8),
+                                                                       length)).tobytes()
+    return first & 0x0F, payload
+
+
+class EphemerisServer:
+    """Serves ChunkCache chunks over HTTP and WebSocket; see the module docstring."""
+
+    def __init__(self, cache=None, prefetch=4):
+        self.cache = ChunkCache() if cache is None else cache
+        self.prefetch = prefetch
+        self.connections = 0
+        self._server = None
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """Starts listening; returns the bound (host, port). Port 0 picks a free one."""
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def _bodies(self, requested):
+        if not requested:
+            return list(self.cache.names)
+        unknown = [body for body in requested if body not in self.cache.names]
+        if unknown:
+            raise HttpError(400, f"Unknown bodies {unknown}, expected some of {self.cache.names}")
+        return list(requested)
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except HttpError as error:
+                    # The stream can't be trusted past a bad request: answer and close
+                    writer.write(_response(error.status, str(error).encode("utf-8"), "text/plain"))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, target, headers = request
+                url = urlsplit(target)
+                if url.path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                    await self._websocket(reader, writer, headers)
+                    break
+                try:
+                    if method != "GET":
+                        raise HttpError(405, f"{method} not supported")
+                    status, body, content_type = 200, *await self._route(url.path, parse_qs(url.query))
+                except HttpError as error:
+                    status, body, content_type = error.status, str(error).encode("utf-8"), "text/plain"
+                except (KeyError, ValueError, OverflowError) as error:
+                    status, body, content_type = 400, f"Bad request: {error}".encode("utf-8"), "text/plain"
+                writer.write(_response(status, body, content_type))
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def _route(self, path, query):
+        if path == "/bodies":
+            return json.dumps(self.cache.describe()).encode("utf-8"), "application/json"
+        if path == "/positions":
+            start_s = float(query["start_s"][0])
+            end_s = float(query["end_s"][0])
+            bodies = self._bodies(query["bodies"][0].split(",") if "bodies" in query else None)
+            return await self._window(start_s, end_s, bodies), "application/octet-stream"
+        raise HttpError(404, f"No such path {path}")
+
+    async def _window(self, start_s, end_s, bodies):
+        """Samples in [start_s, end_s) for `bodies`, cut from whole chunks and packed."""
+        if not end_s > start_s:
+            raise HttpError(400, "end_s must be greater than start_s")
+        first = self.cache.chunk_index(start_s)
+        last = self.cache.chunk_index(np.nextafter(end_s, -np.inf))
+        if last - first + 1 > _MAX_WINDOW_CHUNKS:
+            raise HttpError(400, f"Window spans more than {_MAX_WINDOW_CHUNKS} chunks")
+        chunks = await asyncio.gather(*(self.cache.get(index) for index in range(first, last + 1)))
+        self.cache.prefetch(range(last + 1, last + 1 + self.prefetch))
+        header, _ = self.cache.select(*chunks[0], bodies)
+        data = np.concatenate([self.cache.select(*chunk, bodies)[1] for chunk in chunks])
+        t = header["start_s"] + np.arange(len(data)) * self.cache.step_s
+        keep = (t >= start_s) & (t < end_s)
+        header = dict(header, start_s=float(t[keep][0]) if keep.any() else start_s,
+                      n_samples=int(keep.sum()), periodic=False)
+        return pack_ephemeris(header, data[keep])
+
+    async def _websocket(self, reader, writer, headers):
+        key = headers.get("sec-websocket-key", "").encode("latin-1")
+        accept = base64.b64encode(hashlib.sha1(key + _WEBSOCKET_GUID).digest()).decode("latin-1")
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\n"
+                      "Upgrade: websocket\r\n"
+                      "Connection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+        bodies = list(self.cache.names)
+        sent = set()
+        sender = None
+        try:
+            while True:
+                opcode, payload = await _read_websocket_frame(reader)
+                if opcode == 0x8: # close
+                    writer.write(_websocket_frame(0x8, payload[:2]))
+                    await writer.drain()
+                    return
+                if opcode == 0x9: # ping
+                    writer.write(_websocket_frame(0xA, payload))
+                    continue
+                if opcode != 0x1:
+                    continue
+                try:
+                    new_bodies, t_s, rate = self._parse_message(payload)
+                except (HttpError, ValueError, TypeError, OverflowError) as error:
+                    writer.write(_websocket_frame(0x1, json.dumps({"error": str(error)}).encode("utf-8")))
+                    await writer.drain()
+                    continue
+                if new_bodies is not None:
+                    bodies = new_bodies
+                    sent.clear()
+                if t_s is not None:
+                    current = self.cache.chunk_index(t_s)
+                    ahead = -1 if rate < 0 else 1
+                    wanted = [current + ahead * i for i in range(self.prefetch + 1)]
+                    if sender is not None and not sender.done():
+                        sender.cancel()
+                    # Forget chunks far from playback, so a long session keeps `sent` small
+                    sent.intersection_update(range(current - _SENT_WINDOW_CHUNKS, current + _SENT_WINDOW_CHUNKS + 1))
+                    sender = asyncio.ensure_future(self._send_chunks(writer, wanted, bodies, sent))
+        finally:
+            if sender is not None:
+                sender.cancel()
+
+    def _parse_message(self, payload):
+        """(bodies or None, t_s or None, rate) from a WebSocket text message; ValueError if invalid."""
+        message = json.loads(payload)
+        if not isinstance(message, dict):
+            raise ValueError("Expected a JSON object")
+        bodies = None
+        if "bodies" in message:
+            if not isinstance(message["bodies"], list):
+                raise ValueError("bodies must be a list of body names")
+            bodies = self._bodies(message["bodies"])
+        t_s = float(message["t_s"]) if "t_s" in message else None
+        rate = float(message.get("rate", 1.0))
+        if t_s is not None and not np.isfinite(t_s):
+            raise ValueError(f"t_s must be finite, got {t_s}")
+        if not np.isfinite(rate):
+            raise ValueError(f"rate must be finite, got {rate}")
+        return bodies, t_s, rate
+
+    async def _send_chunks(self, writer, indices, bodies, sent):
+        self.cache.prefetch(indices)
+        for index in indices:
+            if index in sent:
+                continue
+            header, data = self.cache.select(*await self.cache.get(index), bodies)
+            writer.write(_websocket_frame(0x2, pack_ephemeris(dict(header, chunk=index), data)))
+            sent.add(index)
+            await writer.drain()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve Halferth ephemeris chunks to the web sim.")
+    parser.add_argument("--host", default="127.0.0.1", help="interface to listen on (default 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="port (default 8765)")
+    parser.add_argument("--chunk-days", type=float, default=7, help="Halferth days per chunk (default 7)")
+    parser.add_argument("--samples-per-day", type=int, default=20, help="samples per Halferth day (default 20)")
+    parser.add_argument("--cache-chunks", type=int, default=256, help="chunks kept in memory (default 256)")
+    parser.add_argument("--prefetch", type=int, default=4, help="chunks computed ahead of playback (default 4)")
+    args = parser.parse_args()
+
+    async def main():
+        server = EphemerisServer(ChunkCache(chunk_days=args.chunk_days, samples_per_day=args.samples_per_day,
+                                            max_chunks=args.cache_chunks), prefetch=args.prefetch)
+        host, port = await server.start(args.host, args.port)
+        print(f"Serving the Halferth ephemeris on http://{host}:{port} (WebSocket at /ws)")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,198 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from .constants import H_DAY_SECONDS, HALFERTH_RADIUS_PHYSICAL, planet_rotation_rate
+from .orbits import DAUGHTER_ORBIT, MOTHER_ORBIT, WORLD_SPACE_FIXED_NORTH_POLE, moon_offset, planet_position
+
+# =============================================================================
+# OBSERVER SKY
+# =============================================================================
+# An observer stands on Halferth's surface at (latitude, longitude) and turns
+# with the planet about WORLD_SPACE_FIXED_NORTH_POLE at planet_rotation_rate,
+# exactly like the textured sphere in the 3D view. Longitude 0 is the
+# direction the 3D view's planet.up points at t = 0 (world +z), and
+# longitudes grow eastwards, the direction the planet turns.
+#
+# Each body's planet-centred vector is split once per time into components
+# along that starting meridian, east of it and along the pole. The rest of
+# the sky (rotation, observer offset, alt/az) is plain broadcasting
+# arithmetic, so a (latitude, longitude, time) grid costs one orbit solve per
+# time, not one per grid point. Topocentric parallax is included: the moons
+# are only ~65-100 planet radii away.
+
+BODIES = ("sun", "mother", "daughter")
+
+RISE = 0
+SET = 1
+TRANSIT = 2
+SKY_EVENT_NAMES = ("rise", "set", "transit")
+
+_PRIME_MERIDIAN = np.array([0.0, 0.0, 1.0])
+_EAST_OF_PRIME_MERIDIAN = np.cross(WORLD_SPACE_FIXED_NORTH_POLE, _PRIME_MERIDIAN)
+_MOON_ORBITS = {"mother": MOTHER_ORBIT, "daughter": DAUGHTER_ORBIT}
+
+
+class SkyEvents(NamedTuple):
+    """
+    Rise/set/transit events as flat arrays, sorted by site then time. `site`
+    indexes the flattened (broadcast) latitude/longitude arrays and `kind`
+    is RISE, SET or TRANSIT (names in SKY_EVENT_NAMES).
+    """
+    site: np.ndarray
+    t_s: np.ndarray
+    kind: np.ndarray
+
+
+def body_vector(body, t):
+    """Planet-centred world vector from Halferth to `body` at time(s) t, shape (..., 3)."""
+    if body == "sun":
+        return -planet_position(t)
+    if body in _MOON_ORBITS:
+        return moon_offset(_MOON_ORBITS[body], t)
+    raise ValueError(f"Unknown body {body!r}, expected one of {BODIES}")
+
+
+def _vector_components(d):
+    """Components of world vectors along longitude 0 at t = 0, 90 E of it and the pole."""
+    return d @ _PRIME_MERIDIAN, d @ _EAST_OF_PRIME_MERIDIAN, d @ WORLD_SPACE_FIXED_NORTH_POLE
+
+
+def _body_components(body, t):
+    return _vector_components(body_vector(body, t))
+
+
+def _turn_with_planet(components, t):
+    """Re-expresses body components in the frame that has turned with the planet by time t."""
+    d1, d2, dn = components
+    turned = planet_rotation_rate * t
+    c = np.cos(turned)
+    s = np.sin(turned)
+    return c * d1 + s * d2, c * d2 - s * d1, dn
+
+
+def _topocentric(components, lat, lon, radius):
+    """Returns the (up, east, north) components of the observer-to-body vector."""
+    d1, d2, dn = components
+    c = np.cos(lon)
+    s = np.sin(lon)
+    outward = c * d1 + s * d2
+    up = np.cos(lat) * outward + np.sin(lat) * dn - radius
+    east = c * d2 - s * d1
+    north = np.cos(lat) * dn - np.sin(lat) * outward
+    return up, east, north
+
+
+def altitude_azimuth(body, lat_deg, lon_deg, t, radius=HALFERTH_RADIUS_PHYSICAL):
+    """
+    Altitude and azimuth (degrees, azimuth clockwise from north) of `body`
+    for observers at lat_deg/lon_deg at time(s) t. All three broadcast
+    against each other; the body's orbit is only solved at the times in t.
+    """
+    return vector_altitude_azimuth(body_vector(body, t), lat_deg, lon_deg, t, radius)
+
+
+def vector_altitude_azimuth(d, lat_deg, lon_deg, t, radius=HALFERTH_RADIUS_PHYSICAL):
+    """
+    Like altitude_azimuth, for any planet-centred world vectors d of shape
+    (..., 3) at time(s) t, such as moons on trial orbits.
+    """
+    t = np.asarray(t, dtype=float)
+    up, east, north = _topocentric(_turn_with_planet(_vector_components(d), t), np.radians(lat_deg),
+                                   np.radians(lon_deg), radius)
+    altitude = np.degrees(np.arctan2(up, np.hypot(east, north)))
+    azimuth = np.degrees(np.arctan2(east, north)) % 360
+    return altitude, azimuth
+
+
+def sky_grid(body, lat_deg, lon_deg, t, radius=HALFERTH_RADIUS_PHYSICAL):
+    """Altitude and azimuth of `body` over the outer product of 1-D lat, lon and t, shape (lat, lon, t)."""
+    lat = np.asarray(lat_deg, dtype=float)[:, None, None]
+    lon = np.asarray(lon_deg, dtype=float)[None, :, None]
+    t = np.asarray(t, dtype=float)[None, None, :]
+    return altitude_azimuth(body, lat, lon, t, radius)
+
+
+def _bisect(f, lo, hi, iterations):
+    f_lo = f(lo)
+    for _ in range(iterations):
+        mid = 0.5 * (lo + hi)
+        f_mid = f(mid)
+        same = np.signbit(f_mid) == np.signbit(f_lo)
+        lo = np.where(same, mid, lo)
+        f_lo = np.where(same, f_mid, f_lo)
+        hi = np.where(same, hi, mid)
+    return 0.5 * (lo + hi)
+
+
+def rise_set_transit(body, lat_deg, lon_deg, t_start, t_end, step_s=H_DAY_SECONDS / 48,
+                     horizon_deg=0.0, radius=HALFERTH_RADIUS_PHYSICAL, tolerance_s=1.0,
+                     chunk_samples=1 << 22):
+    """
+    Finds every rise, set and (upper) transit of `body` in [t_start, t_end)
+    for the observers at lat_deg/lon_deg, which broadcast against each
+    other. A rise or set is the altitude crossing `horizon_deg`; a transit
+    is the body crossing the meridian from east to west. Altitude is
+    sampled every `step_s` seconds for all sites at once, in chunks of about
+    `chunk_samples` site-samples, and every crossing is refined together by
+    bisection, so a rise and set closer together than one step are missed.
+    """
+    lat, lon = np.broadcast_arrays(np.radians(lat_deg), np.radians(lon_deg))
+    lat = lat.ravel()
+    lon = lon.ravel()
+    n = int(np.ceil((t_end - t_start) / step_s))
+    t = t_start + np.arange(n + 1) * step_s
+    t[-1] = min(t[-1], t_end)
+    components = _body_components(body, t)
+    turned = _turn_with_planet(components, t)
+    sin_horizon = np.sin(np.radians(horizon_deg))
+    iterations = max(int(np.ceil(np.log2(step_s / tolerance_s))), 1)
+
+    def above_horizon(up, east, north):
+        # Same sign as altitude - horizon_deg, without the arctan
+        return up - sin_horizon * np.sqrt(up * up + east * east + north * north)
+
+    sites, times, kinds = [], [], []
+    sites_per_chunk = max(chunk_samples // len(t), 1)
+    for first in range(0, len(lat), sites_per_chunk):
+        chunk_lat = lat[first:first + sites_per_chunk, None]
+        chunk_lon = lon[first:first + sites_per_chunk, None]
+        up, east, north = _topocentric(turned, chunk_lat, chunk_lon, radius)
+        below = np.signbit(above_horizon(up, east, north))
+        west = np.signbit(east)
+        crossings = (
+            (RISE, below[:, :-1] & ~below[:, 1:], above_horizon),
+            (SET, ~below[:, :-1] & below[:, 1:], above_horizon),
+            (TRANSIT, ~west[:, :-1] & west[:, 1:], lambda up, east, north: east),
+        )
+        for kind, mask, value in crossings:
+            site, sample = np.nonzero(mask)
+            if not len(site):
+                continue
+            site_lat = chunk_lat[site, 0]
+            site_lon = chunk_lon[site, 0]
+            t_lo = t[sample]
+            t_step = t[sample + 1] - t_lo
+            start = [d[sample] for d in components]
+            delta = [d[sample + 1] - d[sample] for d in components]
+
+            def f(fraction):
+                # The body barely moves against the stars within one step,
+                # so interpolate its vector instead of re-solving the orbit
+                # for every bisection point; the planet's turn stays exact
+                interpolated = [d0 + fraction * dd for d0, dd in zip(start, delta)]
+                turned_at = _turn_with_planet(interpolated, t_lo + fraction * t_step)
+                return value(*_topocentric(turned_at, site_lat, site_lon, radius))
+
+            fraction = _bisect(f, np.zeros(len(site)), np.ones(len(site)), iterations)
+            sites.append(first + site)
+            times.append(t_lo + fraction * t_step)
+            kinds.append(np.full(len(site), kind, dtype=np.int8))
+
+    if not sites:
+        return SkyEvents(np.empty(0, dtype=np.intp), np.empty(0), np.empty(0, dtype=np.int8))
+    site = np.concatenate(sites)
+    t_s = np.concatenate(times)
+    kind = np.concatenate(kinds)
+    order = np.lexsort((t_s, site))
+    return SkyEvents(site[order], t_s[order], kind[order])
@@ -0,0 +1,245 @@
+"""
+Parameter sweeps over the moon orbits, scored in parallel.
+
+    python -m halferth.sweep sweeps/eccentricity --e-mother 0.1:0.5:41 --e-daughter 0.1:0.5:41
+    python -m halferth.sweep sweeps/periods --P-daughter-days 30:40:101 --phi-daughter=-3.14:3.14:24
+
+Each parameter takes start:stop:count (evenly spaced, inclusive) or a
+comma-separated list; parameters left out keep the values in
+halferth.constants. Every combination is evaluated.
+
+Results are written as one .npy column per parameter and metric in the
+output directory, plus sweep.json describing the run; open them with
+load_sweep().
+"""
+
+import argparse
+import json
+import multiprocessing
+import time
+from pathlib import Path
+
+import numpy as np
+
+from .constants import (
+    H_DAY_SECONDS,
+    P_daughter_days,
+    P_mother_days,
+    a_daughter_physical,
+    a_mother_physical,
+    e_daughter,
+    e_mother,
+    moon_start_phi,
+)
+from .kepler import get_initial_M_from_phi, get_position_from_eccentric_anomaly, solve_kepler
+from .orbits import moon_plane_to_world
+from .sky import vector_altitude_azimuth
+
+# =============================================================================
+# PARAMETERS AND METRICS
+# =============================================================================
+
+SWEEP_DEFAULTS = {
+    "a_mother": a_mother_physical,
+    "e_mother": e_mother,
+    "P_mother_days": P_mother_days,
+    "phi_mother": moon_start_phi,
+    "a_daughter": a_daughter_physical,
+    "e_daughter": e_daughter,
+    "P_daughter_days": P_daughter_days,
+    "phi_daughter": moon_start_phi,
+}
+SWEEP_PARAMETERS = tuple(SWEEP_DEFAULTS)
+
+METRICS = (
+    "convergence_days",         # both moons back at their start phases; NaN if not within max_cycles
+    "min_separation_m",         # closest Mother-Daughter approach over the horizon
+    "mother_visible_fraction",  # share of the horizon Mother is above the observer's horizon
+    "mother_mean_visible_h",    # mean length of one visible stretch, Earth hours
+    "daughter_visible_fraction",
+    "daughter_mean_visible_h",
+)
+
+# The inhabited lands are circumpolar in the far south: a cap of about
+# 5.5 million km^2 (some 12 degrees of arc) around the pole under the
+# Twisting City
+DEFAULT_OBSERVER = (-80.0, 0.0)
+
+
+def sweep_grid(**ranges):
+    """
+    Every combination of the given parameter values, as {parameter: flat
+    array}. Parameters not given keep their SWEEP_DEFAULTS value.
+    """
+    unknown = set(ranges) - set(SWEEP_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+    axes = [np.atleast_1d(np.asarray(ranges.get(name, SWEEP_DEFAULTS[name]), dtype=float))
+            for name in SWEEP_PARAMETERS]
+    grids = np.meshgrid(*axes, indexing="ij")
+    return {name: grid.ravel() for name, grid in zip(SWEEP_PARAMETERS, grids)}
+
+
+def convergence_days(P_mother, P_daughter, tolerance=1e-3, max_cycles=1000):
+    """
+    The first whole number of Mother orbits after which Daughter is also
+    within `tolerance` radians of a whole orbit, in days; NaN if none within
+    max_cycles. Broadcasts over the period arrays.
+    """
+    P_mother = np.asarray(P_mother, dtype=float)
+    P_daughter = np.asarray(P_daughter, dtype=float)
+    cycles = np.arange(1, max_cycles + 1)
+    turns = cycles * (P_mother / P_daughter)[..., None]
+    offset = 2 * np.pi * np.abs(turns - np.round(turns))
+    converged = offset <= tolerance
+    first = np.argmax(converged, axis=-1)
+    return np.where(np.any(converged, axis=-1), (first + 1) * P_mother, np.nan)
+
+
+def _moon_vectors(a, e, P_days, phi, t):
+    """Planet-centred world offsets, shape (configs, times, 3), of moons on trial orbits."""
+    M = get_initial_M_from_phi(phi, e)[:, None] + 2 * np.pi * t / (P_days[:, None] * H_DAY_SECONDS)
+    e = e[:, None]
+    E = solve_kepler(M, e)
+    return moon_plane_to_world(*get_position_from_eccentric_anomaly(E, a[:, None], e))
+
+
+def _visibility(vectors, t, observer):
+    """Visible fraction and mean visible stretch (hours) for each config."""
+    altitude, _ = vector_altitude_azimuth(vectors, observer[0], observer[1], t)
+    up = altitude > 0
+    fraction = up.mean(axis=-1)
+    # Stretches start at every rise, plus one if the moon starts out visible
+    stretches = np.count_nonzero(up[:, 1:] & ~up[:, :-1], axis=-1) + up[:, 0]
+    visible_h = fraction * (t[-1] - t[0] + (t[1] - t[0])) / 3600
+    return fraction, np.where(stretches > 0, visible_h / np.maximum(stretches, 1), 0.0)
+
+
+def evaluate_configurations(params, horizon_days=70.0, step_days=1 / 24, observer=DEFAULT_OBSERVER,
+                            convergence_tolerance=1e-3, max_cycles=1000):
+    """
+    Scores configurations given as {parameter: array} (see sweep_grid).
+    Separation and visibility are sampled every step_days over horizon_days
+    for all configurations at once. Returns {metric: array}.
+    """
+    p = {name: np.asarray(params[name], dtype=float) for name in SWEEP_PARAMETERS}
+    t = np.arange(0.0, horizon_days, step_days) * H_DAY_SECONDS
+    mother = _moon_vectors(p["a_mother"], p["e_mother"], p["P_mother_days"], p["phi_mother"], t)
+    daughter = _moon_vectors(p["a_daughter"], p["e_daughter"], p["P_daughter_days"], p["phi_daughter"], t)
+    separation = np.sqrt(np.sum((mother - daughter) ** 2, axis=-1)).min(axis=-1)
+    mother_fraction, mother_mean_h = _visibility(mother, t, observer)
+    daughter_fraction, daughter_mean_h = _visibility(daughter, t, observer)
+    return {
+        "convergence_days": convergence_days(p["P_mother_days"], p["P_daughter_days"],
+                                             convergence_tolerance, max_cycles),
+        "min_separation_m": separation,
+        "mother_visible_fraction": mother_fraction,
+        "mother_mean_visible_h": mother_mean_h,
+        "daughter_visible_fraction": daughter_fraction,
+        "daughter_mean_visible_h": daughter_mean_h,
+    }
+
+
+# =============================================================================
+# PARALLEL RUNNER
+# =============================================================================
+# The parent writes the parameter columns into .npy files and pre-sizes the
+# metric columns next to them. Workers memory-map the same files, so a chunk
+# is just a row range: each worker reads its parameters straight from the
+# shared pages and writes its metrics back in place, and nothing but chunk
+# numbers travels through the pool. Finished rows are on disk as soon as
+# their chunk completes, so a long sweep can be inspected while it runs.
+
+_worker = None
+
+
+def _init_sweep_worker(directory, options):
+    global _worker
+    directory = Path(directory)
+    _worker = {
+        "options": options,
+        "params": {name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in SWEEP_PARAMETERS},
+        "metrics": {name: np.load(directory / f"{name}.npy", mmap_mode="r+") for name in METRICS},
+    }
+
+
+def _evaluate_chunk(bounds):
+    start, stop = bounds
+    params = {name: column[start:stop] for name, column in _worker["params"].items()}
+    for name, values in evaluate_configurations(params, **_worker["options"]).items():
+        column = _worker["metrics"][name]
+        column[start:stop] = values
+        column.flush()
+    return stop - start
+
+
+def run_sweep(directory, params, chunk_size=256, processes=None, progress=True, **options):
+    """
+    Scores every configuration in `params` ({parameter: array}, see
+    sweep_grid) over a process pool, streaming the results into .npy
+    columns in `directory`. `options` go to evaluate_configurations.
+    Returns load_sweep(directory).
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    columns = {name: np.asarray(params[name], dtype=float) for name in SWEEP_PARAMETERS}
+    count = len(next(iter(columns.values())))
+    for name, values in columns.items():
+        np.save(directory / f"{name}.npy", values)
+    for name in METRICS:
+        np.lib.format.open_memmap(directory / f"{name}.npy", mode="w+", dtype=float, shape=(count,))[:] = np.nan
+
+    description = {"count": count, "chunk_size": chunk_size, "parameters": list(SWEEP_PARAMETERS),
+                   "metrics": list(METRICS), "options": {k: list(v) if isinstance(v, tuple) else v
+                                                         for k, v in options.items()}}
+    (directory / "sweep.json").write_text(json.dumps(description, indent=2) + "\n")
+
+    chunks = [(start, min(start + chunk_size, count)) for start in range(0, count, chunk_size)]
+    done = 0
+    started = time.perf_counter()
+    with multiprocessing.Pool(processes, initializer=_init_sweep_worker,
+                              initargs=(str(directory), options)) as pool:
+        for rows in pool.imap_unordered(_evaluate_chunk, chunks):
+            done += rows
+            if progress:
+                elapsed = time.perf_counter() - started
+                print(f"\r{done}/{count} configurations, {elapsed:.0f} s", end="", flush=True)
+    if progress:
+        print()
+    return load_sweep(directory)
+
+
+def load_sweep(directory):
+    """Memory-maps every column of a sweep as {name: array}."""
+    directory = Path(directory)
+    description = json.loads((directory / "sweep.json").read_text())
+    return {name: np.load(directory / f"{name}.npy", mmap_mode="r")
+            for name in description["parameters"] + description["metrics"]}
+
+
+def _parse_values(text):
+    if ":" in text:
+        start, stop, count = text.split(":")
+        return np.linspace(float(start), float(stop), int(count))
+    return np.array([float(value) for value in text.split(",")])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep the moon orbit parameters and score each configuration.")
+    parser.add_argument("directory", help="output directory for the result columns")
+    for name in SWEEP_PARAMETERS:
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name, type=_parse_values,
+                            help=f"start:stop:count or a,b,c (default {SWEEP_DEFAULTS[name]:g})")
+    parser.add_argument("--horizon-days", type=float, default=70.0, help="sampled span in Halferth days (default 70)")
+    parser.add_argument("--step-days", type=float, default=1 / 24, help="sample step in Halferth days (default 1/24)")
+    parser.add_argument("--observer", type=float, nargs=2, default=DEFAULT_OBSERVER, metavar=("LAT", "LON"),
+                        help="observer latitude and longitude in degrees (default -80 0)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="configurations per work item (default 256)")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    ranges = {name: getattr(args, name) for name in SWEEP_PARAMETERS if getattr(args, name) is not None}
+    grid = sweep_grid(**ranges)
+    results = run_sweep(args.directory, grid, chunk_size=args.chunk_size, processes=args.processes,
+                        horizon_days=args.horizon_days, step_days=args.step_days, observer=tuple(args.observer))
+    print(f"Wrote {len(results['convergence_days'])} configurations to {args.directory}")
@@ -0,0 +1,75 @@
+import math
+
+# =============================================================================
+# DIFF-BASED SCENE UPDATES
+# =============================================================================
+# Every attribute assignment on a vpython object becomes a message to the
+# browser. SceneSync sits between the simulation and those objects: the
+# loop stages the values it wants with set(), and flush() (once per frame,
+# just before rate()) assigns only the ones that differ from what was last
+# sent. Vectors that moved less than `tolerance` scene units, e.g. half a
+# pixel, are held back; since they are compared against the last value
+# actually sent, slow motion still goes out once it adds up to a visible
+# step.
+
+
+def _snapshot(value):
+    """An immutable copy of a value for comparison; vpython vectors are mutable."""
+    if hasattr(value, "x") and hasattr(value, "y") and hasattr(value, "z"):
+        return (value.x, value.y, value.z)
+    return value
+
+
+def _unchanged(new, old, tolerance):
+    if isinstance(new, tuple) and isinstance(old, tuple):
+        return math.dist(new, old) <= tolerance
+    if isinstance(new, float) and isinstance(old, float):
+        return abs(new - old) <= tolerance
+    return new == old
+
+
+class SceneSync:
+    """Caches the last value sent per (object, attribute) and pushes only changes."""
+
+    def __init__(self, tolerance=0.0):
+        self.tolerance = tolerance
+        self._sent = {}
+        self._staged = {}
+        self.pushed = 0
+        self.skipped = 0
+
+    def set(self, obj, attr, value, tolerance=None):
+        """
+        Stages obj.attr = value for the next flush(). A later set() of the
+        same attribute in the same frame replaces the staged value.
+        `tolerance` overrides the default for this attribute; pass 0 for
+        attributes that must always follow exactly.
+        """
+        self._staged[(id(obj), attr)] = (obj, attr, value, tolerance)
+
+    def flush(self):
+        """Assigns every staged value that changed; returns how many were sent."""
+        sent = 0
+        for key, (obj, attr, value, tolerance) in self._staged.items():
+            snapshot = _snapshot(value)
+            if key in self._sent and _unchanged(snapshot, self._sent[key],
+                                                self.tolerance if tolerance is None else tolerance):
+                self.skipped += 1
+                continue
+            setattr(obj, attr, value)
+            self._sent[key] = snapshot
+            sent += 1
+        self._staged.clear()
+        self.pushed += sent
+        return sent
+
+    def forget(self, obj=None):
+        """
+        Drops the cached values of `obj` (or of everything), so the next
+        flush() sends them again; needed after assigning an attribute
+        directly, outside the sync.
+        """
+        if obj is None:
+            self._sent.clear()
+        else:
+            self._sent = {key: value for key, value in self._sent.items() if key[0] != id(obj)}
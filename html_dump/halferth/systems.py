@@ -0,0 +1,157 @@
+"""
+Moon systems loaded from JSON or TOML definitions.
+
+A definition lists any number of moons by their orbital elements, and
+optionally rings of particles generated from a few parameters:
+
+    {
+      "name": "Halferth",
+      "moons": [
+        {"name": "Mother", "a_m": 6.56e8, "e": 0.35, "period_days": 70,
+         "start_phi": -1.5708, "display_radius": 0.5, "color": [0, 1, 1]}
+      ],
+      "rings": [
+        {"name": "Inner ring", "count": 500, "a_m": [1.2e7, 1.8e7],
+         "display_radius": 0.02, "color": [0.8, 0.8, 0.7]}
+      ]
+    }
+
+`period_days` may be left out, in which case it follows from Kepler's
+third law about a planet of `planet_mass_kg` (default: Halferth's).
+`display_radius` is a fraction of the planet's display radius, and so is
+`trail_radius`, the thickness of the moon's trail (default 0.075 of
+`display_radius`); `color` is RGB in 0..1. See html_dump/systems for complete examples.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from .constants import G, H_DAY_SECONDS, HALFERTH_MASS
+from .kepler import get_initial_M_from_phi, get_position_from_eccentric_anomaly, solve_kepler
+from .orbits import moon_plane_to_world
+
+try:
+    import tomllib
+except ModuleNotFoundError: # Python < 3.11
+    tomllib = None
+
+SYSTEMS_DIR = Path(__file__).resolve().parent.parent / "systems"
+DEFAULT_SYSTEM_PATH = SYSTEMS_DIR / "halferth.json"
+
+_MOON_DEFAULTS = {"e": 0.0, "start_phi": 0.0, "display_radius": 0.1, "color": (1.0, 1.0, 1.0), "trail": True}
+TRAIL_RADIUS_FRACTION = 0.075 # Default trail thickness, as a fraction of display_radius
+_RING_DEFAULTS = {"e": 0.0, "display_radius": 0.02, "color": (0.8, 0.8, 0.8), "trail": False, "seed": 0}
+
+
+# =============================================================================
+# STRUCT-OF-ARRAYS SYSTEM
+# =============================================================================
+# Every per-body field is one contiguous array indexed by body, so a frame
+# is a single pass over the whole system: one mean-anomaly update, one
+# vectorized Kepler solve and one rotation into the world frame, whether
+# the system has two moons or two thousand ring particles.
+
+
+class MoonSystem:
+    """
+    Bodies orbiting the planet, stored one field per array. `particle` marks
+    bodies that come from rings, which renderers may draw more cheaply than
+    moons.
+    """
+
+    def __init__(self, name, names, a, e, period_s, start_phi, display_radius, color, trail, particle,
+                 planet_mass_kg=HALFERTH_MASS, trail_radius=None):
+        self.name = name
+        self.names = tuple(names)
+        self.a = np.ascontiguousarray(a, dtype=float)
+        self.e = np.ascontiguousarray(e, dtype=float)
+        self.period_s = np.ascontiguousarray(period_s, dtype=float)
+        self.start_phi = np.ascontiguousarray(start_phi, dtype=float)
+        self.display_radius = np.ascontiguousarray(display_radius, dtype=float)
+        self.color = np.ascontiguousarray(color, dtype=float).reshape(-1, 3)
+        self.trail = np.ascontiguousarray(trail, dtype=bool)
+        if trail_radius is None:
+            trail_radius = self.display_radius * TRAIL_RADIUS_FRACTION
+        self.trail_radius = np.ascontiguousarray(trail_radius, dtype=float)
+        self.particle = np.ascontiguousarray(particle, dtype=bool)
+        self.planet_mass_kg = planet_mass_kg
+        self.n = 2 * np.pi / self.period_s
+        self.M_initial = np.asarray(get_initial_M_from_phi(self.start_phi, self.e), dtype=float)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __repr__(self):
+        return f"MoonSystem({self.name!r}, {len(self)} bodies, {int(self.particle.sum())} ring particles)"
+
+    @classmethod
+    def from_dict(cls, data):
+        """Builds a system from a parsed definition (see the module docstring)."""
+        gm = G * data.get("planet_mass_kg", HALFERTH_MASS)
+        columns = {field: [] for field in ("names", "a", "e", "period_s", "start_phi",
+                                           "display_radius", "trail_radius", "color", "trail", "particle")}
+
+        def add(names, a, e, period_days, start_phi, display_radius, color, trail, particle, trail_radius=None):
+            a = np.atleast_1d(np.asarray(a, dtype=float))
+            if period_days is None:
+                period_s = 2 * np.pi * np.sqrt(a ** 3 / gm)
+            else:
+                period_s = np.broadcast_to(np.asarray(period_days, dtype=float) * H_DAY_SECONDS, a.shape)
+            columns["names"].extend(names)
+            columns["a"].append(a)
+            if trail_radius is None:
+                trail_radius = np.asarray(display_radius, dtype=float) * TRAIL_RADIUS_FRACTION
+            columns["period_s"].append(period_s)
+            for field, value in (("e", e), ("start_phi", start_phi), ("display_radius", display_radius),
+                                 ("trail_radius", trail_radius), ("trail", trail), ("particle", particle)):
+                columns[field].append(np.broadcast_to(value, a.shape))
+            columns["color"].append(np.broadcast_to(np.asarray(color, dtype=float), a.shape + (3,)))
+
+        for moon in data.get("moons", ()):
+            moon = {**_MOON_DEFAULTS, **moon}
+            add([moon["name"]], moon["a_m"], moon["e"], moon.get("period_days"), moon["start_phi"],
+                moon["display_radius"], moon["color"], moon["trail"], False, moon.get("trail_radius"))
+
+        for ring in data.get("rings", ()):
+            ring = {**_RING_DEFAULTS, **ring}
+            count = int(ring["count"])
+            rng = np.random.default_rng(ring["seed"])
+            a_min, a_max = ring["a_m"]
+            add([f"{ring['name']} {i}" for i in range(count)], rng.uniform(a_min, a_max, count), ring["e"],
+                ring.get("period_days"), rng.uniform(-np.pi, np.pi, count), ring["display_radius"],
+                ring["color"], ring["trail"], True)
+
+        if not columns["names"]:
+            raise ValueError(f"System {data.get('name')!r} defines no moons or rings")
+        arrays = {field: np.concatenate(values) for field, values in columns.items() if field != "names"}
+        return cls(data.get("name", "unnamed"), columns["names"], **arrays,
+                   planet_mass_kg=data.get("planet_mass_kg", HALFERTH_MASS))
+
+    def mean_anomaly(self, t):
+        """Mean anomalies, shape t.shape + (bodies,), with t reduced by each body's period."""
+        t = np.asarray(t, dtype=float)[..., None]
+        return self.M_initial + self.n * np.mod(t, self.period_s)
+
+    def positions(self, t):
+        """Orbital-plane (x, y) of every body at time(s) t, each of shape t.shape + (bodies,)."""
+        E = solve_kepler(self.mean_anomaly(t), self.e)
+        return get_position_from_eccentric_anomaly(E, self.a, self.e)
+
+    def world_offsets(self, t):
+        """Planet-centred world positions at time(s) t, shape t.shape + (bodies, 3)."""
+        return moon_plane_to_world(*self.positions(t))
+
+
+def load_system(path=DEFAULT_SYSTEM_PATH):
+    """Reads a MoonSystem from a .json or .toml definition."""
+    path = Path(path)
+    if path.suffix.lower() == ".toml":
+        if tomllib is None:
+            raise ImportError("Reading TOML system definitions needs Python 3.11 or newer (tomllib)")
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    else:
+        data = json.loads(path.read_text())
+    return MoonSystem.from_dict(data)
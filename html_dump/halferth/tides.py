@@ -0,0 +1,218 @@
+"""
+Equilibrium tide heights over the whole of Halferth's surface:
+
+    python -m halferth.tides tides/week0.npy --start-day 0 --days 7 --step-hours 1
+
+writes tides/week0.npy, a float32 array of shape (steps, latitudes,
+longitudes) in metres that np.load(..., mmap_mode="r") opens without
+reading it, and tides/week0.json, its header with the grid, the times and
+the extremes of every step. Animations read frames straight from the
+array; extreme-tide dates come from the header without touching it.
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from .constants import DAUGHTER_MASS, H_DAY_SECONDS, HALFERTH_MASS, HALFERTH_RADIUS_PHYSICAL, MOTHER_MASS, SUN_MASS
+from .sky import BODIES, _body_components, _turn_with_planet
+
+# =============================================================================
+# EQUILIBRIUM TIDE
+# =============================================================================
+# A static ocean on a rigid Halferth settles on the equipotential of the
+# tidal field. A body of mass m at distance d raises it by
+#     (m / M) R^4 / d^3 * (3 cos^2 psi - 1) / 2
+# at a surface point psi away from the sub-body point. With n the surface
+# normal and u the unit vector to the body, cos psi = n.u, so the sum over
+# the sun and both moons is a quadratic form n^T Q n with
+#     Q = sum_b K_b (3/2 u_b u_b^T - 1/2 I),   K_b = (m_b / M) R^4 / d_b^3.
+# The bodies are placed in the frame that turns with the planet
+# (planet_rotation_rate about WORLD_SPACE_FIXED_NORTH_POLE, longitudes as in
+# halferth.sky), where n = (cos lat cos lon, cos lat sin lon, sin lat).
+# Expanding n^T Q n splits it into six products of a function of latitude
+# and a function of longitude, so a whole lat/lon grid at one time is a
+# (latitudes x 6) by (6 x longitudes) matrix product: one orbit solve per
+# body per time, then BLAS, whatever the grid size.
+
+_MASS_RATIO = {"sun": SUN_MASS / HALFERTH_MASS, "mother": MOTHER_MASS / HALFERTH_MASS,
+               "daughter": DAUGHTER_MASS / HALFERTH_MASS}
+
+FIELD_DTYPE = np.float32
+
+
+def grid_axes(n_lat, n_lon):
+    """Cell-centre latitudes (south to north) and longitudes (east from 0), in degrees."""
+    lat_deg = -90 + (np.arange(n_lat) + 0.5) * 180 / n_lat
+    lon_deg = (np.arange(n_lon) + 0.5) * 360 / n_lon
+    return lat_deg, lon_deg
+
+
+def tide_coefficients(t, radius=HALFERTH_RADIUS_PHYSICAL):
+    """
+    The quadratic form Q at time(s) t as its six distinct entries
+    (Q11, Q12, Q22, Q13, Q23, Q33), shape t.shape + (6,), in metres.
+    """
+    t = np.asarray(t, dtype=float)
+    Q = np.zeros(t.shape + (3, 3))
+    for body in BODIES:
+        d = np.stack(_turn_with_planet(_body_components(body, t), t), axis=-1)
+        distance = np.linalg.norm(d, axis=-1)
+        strength = _MASS_RATIO[body] * radius ** 4 / distance ** 3
+        u = d / distance[..., None]
+        Q += strength[..., None, None] * (1.5 * u[..., :, None] * u[..., None, :] - 0.5 * np.eye(3))
+    return np.stack([Q[..., 0, 0], Q[..., 0, 1], Q[..., 1, 1], Q[..., 0, 2], Q[..., 1, 2], Q[..., 2, 2]], axis=-1)
+
+
+def _grid_bases(lat_deg, lon_deg, dtype=FIELD_DTYPE):
+    """Latitude (n_lat, 6) and longitude (6, n_lon) factors matching tide_coefficients."""
+    lat = np.radians(np.asarray(lat_deg, dtype=float))
+    lon = np.radians(np.asarray(lon_deg, dtype=float))
+    cl, sl = np.cos(lat), np.sin(lat)
+    c, s = np.cos(lon), np.sin(lon)
+    lat_basis = np.stack([cl * cl, cl * cl, cl * cl, cl * sl, cl * sl, sl * sl], axis=-1)
+    lon_basis = np.stack([c * c, 2 * c * s, s * s, 2 * c, 2 * s, np.ones_like(c)])
+    return lat_basis.astype(dtype), lon_basis.astype(dtype)
+
+
+def tide_heights(t, lat_deg, lon_deg, radius=HALFERTH_RADIUS_PHYSICAL, out=None):
+    """
+    Tide heights (m) over the outer product of 1-D times, latitudes and
+    longitudes, shape (t, lat, lon). `out`, if given, is filled instead of
+    allocating (any array of that shape, e.g. a slice of a memmap).
+    """
+    t = np.atleast_1d(np.asarray(t, dtype=float))
+    dtype = out.dtype if out is not None else np.float64
+    lat_basis, lon_basis = _grid_bases(lat_deg, lon_deg, dtype)
+    weighted = tide_coefficients(t, radius).astype(dtype)[:, :, None] * lon_basis
+    return np.matmul(lat_basis, weighted, out=out)
+
+
+# =============================================================================
+# MEMORY-MAPPED FIELDS
+# =============================================================================
+# A field is written a chunk of steps at a time straight into an .npy
+# memmap, so memory use is set by `max_chunk_bytes` and not by the length of
+# the run. Each chunk's extremes go into the JSON header as it is written.
+
+
+class TideExtremes(NamedTuple):
+    """Steps of a tide field with the most extreme tides, most extreme first."""
+    step: np.ndarray
+    t_s: np.ndarray
+    height_m: np.ndarray
+    lat_deg: np.ndarray
+    lon_deg: np.ndarray
+
+
+def _header_path(path):
+    return Path(path).with_suffix(".json")
+
+
+def write_tide_field(path, start_s, n_steps, step_s, n_lat=720, n_lon=1440, max_chunk_bytes=1 << 28,
+                     radius=HALFERTH_RADIUS_PHYSICAL):
+    """
+    Writes tide heights at start_s + i * step_s (i < n_steps) over an
+    n_lat x n_lon grid (default 0.25 degrees, about a million cells) to
+    `path` as a float32 .npy memmap, and its header next to it as .json.
+    Returns the header.
+    """
+    path = Path(path)
+    lat_deg, lon_deg = grid_axes(n_lat, n_lon)
+    step_bytes = n_lat * n_lon * np.dtype(FIELD_DTYPE).itemsize
+    steps_per_chunk = max(int(max_chunk_bytes // step_bytes), 1)
+
+    field = np.lib.format.open_memmap(path, mode="w+", dtype=FIELD_DTYPE, shape=(n_steps, n_lat, n_lon))
+    high = np.empty(n_steps)
+    low = np.empty(n_steps)
+    high_cell = np.empty(n_steps, dtype=np.int64)
+    low_cell = np.empty(n_steps, dtype=np.int64)
+    for first in range(0, n_steps, steps_per_chunk):
+        last = min(first + steps_per_chunk, n_steps)
+        t = start_s + np.arange(first, last) * step_s
+        chunk = field[first:last]
+        tide_heights(t, lat_deg, lon_deg, radius, out=chunk)
+        flat = chunk.reshape(last - first, -1)
+        high_cell[first:last] = flat.argmax(axis=1)
+        low_cell[first:last] = flat.argmin(axis=1)
+        high[first:last] = np.take_along_axis(flat, high_cell[first:last, None], axis=1)[:, 0]
+        low[first:last] = np.take_along_axis(flat, low_cell[first:last, None], axis=1)[:, 0]
+    field.flush()
+    del field
+
+    header = {
+        "start_s": float(start_s),
+        "step_s": float(step_s),
+        "n_steps": int(n_steps),
+        "n_lat": int(n_lat),
+        "n_lon": int(n_lon),
+        "h_day_seconds": H_DAY_SECONDS,
+        "units": "m",
+        "high_m": high.tolist(),
+        "low_m": low.tolist(),
+        "high_cell": high_cell.tolist(),
+        "low_cell": low_cell.tolist(),
+    }
+    _header_path(path).write_text(json.dumps(header))
+    return header
+
+
+def open_tide_field(path):
+    """Opens a field written by write_tide_field. Returns (header, read-only memmap)."""
+    header = json.loads(_header_path(path).read_text())
+    return header, np.load(path, mmap_mode="r")
+
+
+def tide_field_times(header):
+    """Times (s) of the steps of a tide field."""
+    return header["start_s"] + np.arange(header["n_steps"]) * header["step_s"]
+
+
+def extreme_tides(header, count=10, kind="high"):
+    """
+    The `count` steps with the highest ("high") or lowest ("low") tide
+    anywhere, or the largest high-minus-low ("range"), from the header
+    alone. For "range", lat/lon are those of the highest point.
+    """
+    high = np.asarray(header["high_m"])
+    low = np.asarray(header["low_m"])
+    if kind == "high":
+        score, height, cell = high, high, header["high_cell"]
+    elif kind == "low":
+        score, height, cell = -low, low, header["low_cell"]
+    elif kind == "range":
+        score, height, cell = high - low, high - low, header["high_cell"]
+    else:
+        raise ValueError(f"Unknown kind {kind!r}, expected 'high', 'low' or 'range'")
+    step = np.argsort(-score, kind="stable")[:count]
+    lat_deg, lon_deg = grid_axes(header["n_lat"], header["n_lon"])
+    lat_index, lon_index = np.divmod(np.asarray(cell)[step], header["n_lon"])
+    return TideExtremes(step, tide_field_times(header)[step], height[step], lat_deg[lat_index], lon_deg[lon_index])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a memory-mapped field of equilibrium tide heights.")
+    parser.add_argument("path", help="output .npy file (its header is written next to it as .json)")
+    parser.add_argument("--start-day", type=float, default=0.0, help="start, in Halferth days from t=0 (default 0)")
+    parser.add_argument("--days", type=float, default=7.0, help="length in Halferth days (default 7)")
+    parser.add_argument("--step-hours", type=float, default=1.0, help="time step in hours (default 1)")
+    parser.add_argument("--lat-cells", type=int, default=720, help="latitude cells (default 720)")
+    parser.add_argument("--lon-cells", type=int, default=1440, help="longitude cells (default 1440)")
+    parser.add_argument("--chunk-mb", type=float, default=256, help="memory per chunk of steps in MB (default 256)")
+    parser.add_argument("--extremes", type=int, default=5, help="extreme tides to list (default 5)")
+    args = parser.parse_args()
+
+    step_s = args.step_hours * 3600.0
+    n_steps = max(int(round(args.days * H_DAY_SECONDS / step_s)), 1)
+    path = Path(args.path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    size_gb = n_steps * args.lat_cells * args.lon_cells * np.dtype(FIELD_DTYPE).itemsize / 1e9
+    print(f"Writing {n_steps} steps of {args.lat_cells} x {args.lon_cells} cells ({size_gb:.2f} GB) to {path}")
+    header = write_tide_field(path, args.start_day * H_DAY_SECONDS, n_steps, step_s, args.lat_cells,
+                              args.lon_cells, int(args.chunk_mb * 2 ** 20))
+    extremes = extreme_tides(header, args.extremes, "range")
+    for t_s, height, lat, lon in zip(extremes.t_s, extremes.height_m, extremes.lat_deg, extremes.lon_deg):
+        print(f"Day {t_s / H_DAY_SECONDS:9.3f}: range {height:.3f} m, high at {lat:+.2f}, {lon:.2f}")
@@ -0,0 +1,136 @@
+import math
+from collections import deque
+
+import numpy as np
+
+# =============================================================================
+# BOUNDED, DECIMATED TRAILS
+# =============================================================================
+# A trail keeps a fixed window of simulated history in a ring buffer instead
+# of growing forever. Points are thinned by curvature as they arrive: while
+# the path runs straight the newest point just slides the trail's tip
+# forward, and a vertex is only committed once the path has turned by more
+# than `min_turn_degrees` (or `max_gap_s` has passed). Straight stretches
+# end up with few vertices and bends keep their detail.
+
+
+class TrailBuffer:
+    """Fixed-capacity ring buffer of (time, position) trail vertices."""
+
+    def __init__(self, history_s, capacity, min_turn_degrees=1.0, max_gap_s=math.inf):
+        self.history_s = history_s
+        self.capacity = max(int(capacity), 3)
+        self.min_turn_cos = math.cos(math.radians(min_turn_degrees))
+        self.max_gap_s = max_gap_s
+        self._t = np.empty(self.capacity)
+        self._pos = np.empty((self.capacity, 3))
+        self._head = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def _slot(self, i):
+        """Ring slot of the i-th vertex, oldest first; negative i counts from the tip."""
+        return (self._head + i % self.count) % self.capacity
+
+    def clear(self):
+        self._head = 0
+        self.count = 0
+
+    def push(self, t, pos):
+        """
+        Adds the newest point. Returns (committed, dropped): `committed` is
+        True when the point became a new tip vertex and False when it
+        replaced the previous tip; `dropped` is the number of vertices
+        removed from the old end.
+        """
+        x, y, z = pos
+        committed = True
+        if self.count >= 2:
+            k = self._slot(-2)
+            c = self._slot(-1)
+            kx, ky, kz = self._pos[k]
+            cx, cy, cz = self._pos[c]
+            ux, uy, uz = cx - kx, cy - ky, cz - kz
+            vx, vy, vz = x - cx, y - cy, z - cz
+            dot = ux * vx + uy * vy + uz * vz
+            norms = math.sqrt((ux * ux + uy * uy + uz * uz) * (vx * vx + vy * vy + vz * vz))
+            straight = norms == 0 or dot >= self.min_turn_cos * norms
+            if straight and t - self._t[k] < self.max_gap_s:
+                committed = False
+
+        dropped = 0
+        if committed:
+            if self.count == self.capacity:
+                self._head = (self._head + 1) % self.capacity
+                self.count -= 1
+                dropped += 1
+            slot = (self._head + self.count) % self.capacity
+            self.count += 1
+        else:
+            slot = self._slot(-1)
+        self._t[slot] = t
+        self._pos[slot] = x, y, z
+
+        # Keep at least two vertices so the trail never collapses to its tip
+        while self.count > 2 and self._t[self._head] < t - self.history_s:
+            self._head = (self._head + 1) % self.capacity
+            self.count -= 1
+            dropped += 1
+        return committed, dropped
+
+    def points(self):
+        """Returns (times, positions) of all vertices, oldest first."""
+        order = (self._head + np.arange(self.count)) % self.capacity
+        return self._t[order], self._pos[order]
+
+
+class CurveTrail:
+    """
+    Mirrors a TrailBuffer onto a vpython curve with incremental edits: the
+    tip is moved with modify(), new vertices are appended, and expired ones
+    are shifted off the front, so the curve never holds more than the
+    buffer's capacity.
+    """
+
+    def __init__(self, curve, history_days, dt_s, day_seconds, min_turn_degrees=1.0, max_gap_days=1.0):
+        history_s = history_days * day_seconds
+        # Worst case (every frame turns) is one vertex per frame
+        capacity = math.ceil(history_s / dt_s) + 2
+        self.curve = curve
+        self.buffer = TrailBuffer(history_s, capacity, min_turn_degrees, max_gap_days * day_seconds)
+
+    def append(self, t, pos):
+        committed, dropped = self.buffer.push(t, (pos.x, pos.y, pos.z))
+        for _ in range(dropped):
+            self.curve.shift()
+        if committed:
+            self.curve.append(pos=pos)
+        else:
+            self.curve.modify(self.curve.npoints - 1, pos=pos)
+
+    def rebuild(self, times, positions):
+        """
+        Replaces the trail with the points (times, positions), oldest first,
+        e.g. the window leading up to a seek. The points are thinned exactly
+        as append() would thin them, but the curve is rewritten in one
+        call instead of one edit per point.
+        """
+        self.buffer.clear()
+        kept = deque()
+        for t, pos in zip(times, positions):
+            committed, dropped = self.buffer.push(t, (pos.x, pos.y, pos.z))
+            for _ in range(dropped):
+                kept.popleft()
+            if committed:
+                kept.append(pos)
+            else:
+                kept[-1] = pos
+        self.curve.clear()
+        if kept:
+            self.curve.append(list(kept))
+
+    def clear(self):
+        self.buffer.clear()
+        self.curve.clear()
@@ -1,113 +1,46 @@
 from vpython import *
-import math 
 
-# =======================================================================
-# 1. HELPER FUNCTIONS
-# =======================================================================
-def solve_kepler(M, e, tolerance=1e-6):
-    E = float(M); M = float(M); e = float(e)
-    for _ in range(100):
-        f_val = E - e * math.sin(E) - M
-        f_prime_val = 1 - e * math.cos(E)
-        if abs(f_prime_val) < 1e-10: break
-        delta_E = f_val / f_prime_val
-        E = E - delta_E
-        if abs(delta_E) < tolerance: break
-    return E
-
-def get_initial_M_from_phi(phi, e):
-    tan_E_half = math.sqrt((1 - e) / (1 + e)) * math.tan(phi / 2)
-    E = 2 * math.atan(tan_E_half)
-    M = E - e * math.sin(E)
-    return M
+from halferth.constants import (
+    H_DAY_SECONDS,
+    H_YEAR_DAYS,
+    H_YEAR_SECONDS,
+    TRAIL_HISTORY_DAYS,
+    TRAIL_MIN_TURN_DEGREES,
+)
+from halferth.clock import SimulationClock, simulation_time
+from halferth.ephemeris import ChebyshevEphemeris
+from halferth.frame import SystemFrame
+from halferth.profiling import FrameProfiler
+from halferth.scheduler import FrameScheduler
+from halferth.scene3d import create_scene_objects
+from halferth.sync import SceneSync
+from halferth.trails import CurveTrail
 
 # =======================================================================
-# 2. CONSTANTS 
+# 1. SCENE AND STATIC OBJECT SETUP
 # =======================================================================
-ECC_HALFERTH_SOLAR = 0.0167
-HALFERTH_AXIAL_TILT = 12.5
-
-H_DAY_SECONDS = 21 * 3600
-H_YEAR_DAYS = 420
-H_YEAR_SECONDS = H_YEAR_DAYS * H_DAY_SECONDS
-planet_rotation_rate = 2 * math.pi / H_DAY_SECONDS
-
-a_mother_physical = 6.56e5 * 1000
-e_mother = 0.35
-P_mother_days = 70
-
-a_daughter_physical = 4.13e5 * 1000
-e_daughter = 0.3
-P_daughter_days = 35
-
-SOLAR_ORBIT_DISPLAY_RADIUS = 25.0
-SUN_DISPLAY_RADIUS = SOLAR_ORBIT_DISPLAY_RADIUS / 7
-PLANET_DISPLAY_RADIUS = SUN_DISPLAY_RADIUS / 3.0 
-
-MOTHER_ORBIT_DISPLAY_AVG_RADIUS = PLANET_DISPLAY_RADIUS * 7 
-DAUGHTER_ORBIT_DISPLAY_AVG_RADIUS = MOTHER_ORBIT_DISPLAY_AVG_RADIUS * (a_daughter_physical / a_mother_physical)
-MOTHER_DISPLAY_RADIUS = PLANET_DISPLAY_RADIUS * 0.5 
-DAUGHTER_DISPLAY_RADIUS = PLANET_DISPLAY_RADIUS * 0.3 
-
-GUIDE_LINE_RADIUS = SOLAR_ORBIT_DISPLAY_RADIUS / 600 
-TRAIL_DISPLAY_RADIUS = GUIDE_LINE_RADIUS 
-TRAIL_OPACITY = 0.3
-
-ORBIT_PATH_THICKNESS = GUIDE_LINE_RADIUS 
-
-POST_DISPLAY_RADIUS = GUIDE_LINE_RADIUS 
-POST_DISPLAY_LENGTH = PLANET_DISPLAY_RADIUS * 1.5 
-EQUATOR_DISPLAY_THICKNESS = PLANET_DISPLAY_RADIUS * 0.1
-
-# Removed trail retain point constants for this test
-
-# =======================================================================
-# 3. SCENE AND STATIC OBJECT SETUP
-# =======================================================================
-scene.background = color.black
-scene.width = 800 
-scene.height = 600 
-scene.title = f"Halferth System Orbital Dynamics\nDay: 0.0 / {H_YEAR_DAYS}\n" 
-
-sun = sphere(pos=vector(0,0,0), radius=SUN_DISPLAY_RADIUS, color=color.yellow, emissive=True)
-local_light(pos=vector(0,0,0), color=color.white)
-
-orbit_path_display = ring(pos=vector(0,0,0), axis=vector(0,1,0), radius=SOLAR_ORBIT_DISPLAY_RADIUS, color=color.gray(0.5), thickness=ORBIT_PATH_THICKNESS)
-axis_len = SOLAR_ORBIT_DISPLAY_RADIUS * 1.0
-solstice_line = cylinder(pos=vector(-axis_len,0,0), axis=vector(2*axis_len,0,0), radius=GUIDE_LINE_RADIUS, color=color.red)
-equinox_line = cylinder(pos=vector(0,0,-axis_len), axis=vector(0,0,2*axis_len), radius=GUIDE_LINE_RADIUS, color=color.green)
-angle1_rad = math.radians(150); pos1 = vector(-axis_len*math.cos(angle1_rad),0,-axis_len*math.sin(angle1_rad)); axis_vec1 = vector(2*axis_len*math.cos(angle1_rad),0,2*axis_len*math.sin(angle1_rad))
-season_line_1 = cylinder(pos=pos1, axis=axis_vec1, radius=GUIDE_LINE_RADIUS, color=color.green)
-angle2_rad = math.radians(30); pos2 = vector(-axis_len*math.cos(angle2_rad),0,-axis_len*math.sin(angle2_rad)); axis_vec2 = vector(2*axis_len*math.cos(angle2_rad),0,2*axis_len*math.sin(angle2_rad))
-season_line_2 = cylinder(pos=pos2, axis=axis_vec2, radius=GUIDE_LINE_RADIUS, color=color.green)
-
-planet = sphere(pos=vector(0,0,0), radius=PLANET_DISPLAY_RADIUS, texture={'file': 'http://i.imgur.com/OsdMZof.png'})
-equator = ring(radius=PLANET_DISPLAY_RADIUS*1.2, thickness=EQUATOR_DISPLAY_THICKNESS, color=color.green)
-post = cylinder(radius=POST_DISPLAY_RADIUS, color=color.red) 
-
-mother = sphere(radius=MOTHER_DISPLAY_RADIUS, color=color.cyan) # No make_trail
-daughter = sphere(radius=DAUGHTER_DISPLAY_RADIUS, color=color.blue) # No make_trail
-
-mother_trail_curve = curve(color=color.cyan, radius=TRAIL_DISPLAY_RADIUS, opacity=TRAIL_OPACITY, visible=False)
-daughter_trail_curve = curve(color=color.blue, radius=TRAIL_DISPLAY_RADIUS, opacity=TRAIL_OPACITY, visible=False) # Ensure daughter trail uses blue
-
-
-tilt_rad = math.radians(HALFERTH_AXIAL_TILT); angle_of_tilt_definition = -tilt_rad; axis_to_tilt_around_world = vector(0,0,1) 
-local_north_pole_vector = vector(0,1,0)
-WORLD_SPACE_FIXED_NORTH_POLE = rotate(local_north_pole_vector, angle=angle_of_tilt_definition, axis=axis_to_tilt_around_world)
-planet.axis = WORLD_SPACE_FIXED_NORTH_POLE
-planet.up = vector(0,0,1) 
-if mag(cross(WORLD_SPACE_FIXED_NORTH_POLE, planet.up)) < 1e-6:
-    planet.up = rotate(vector(1,0,0), angle=angle_of_tilt_definition, axis=axis_to_tilt_around_world)
-
-scene.center = vector(0,0,0); scene.autoscale = True; scene.autoscale = False 
+# The guide lines and trail curves are only built once they are first shown;
+# set this to False to skip building the guides until "Show Guides" is clicked
+SHOW_GUIDES_AT_START = True
+scene_objects = create_scene_objects(show_guides=SHOW_GUIDES_AT_START)
 print("Main simulation script initialized in CMD.")
 
 # =======================================================================
-# 4. UI CONTROLS 
+# 2. UI CONTROLS 
 # =======================================================================
+# Physics steps and drawn frames per second are set separately: the
+# simulation advances PHYSICS_RATE steps of DT per second of playback
+# whatever RENDER_RATE is. While paused the loop sleeps until a control is
+# used, checking in at most IDLE_RATE times a second.
+PHYSICS_RATE = 100
+RENDER_RATE = 100
+IDLE_RATE = 4
+scheduler = FrameScheduler(PHYSICS_RATE, RENDER_RATE, IDLE_RATE, sleep=lambda seconds: rate(1 / seconds))
+
 animation_is_paused = False 
 trails_are_visible = False 
+guides_are_visible = SHOW_GUIDES_AT_START
+pending_seek_s = None # Set by the date controls, applied by the loop
 
 def toggle_pause_animation():
     global animation_is_paused 
@@ -116,104 +49,158 @@ def toggle_pause_animation():
         pause_button.text = "Play"
     else:
         pause_button.text = "Pause"
+    scheduler.wake()
+
+def toggle_guide_visibility():
+    global guides_are_visible
+    guides_are_visible = not guides_are_visible
+    scene_objects.set_guides_visible(guides_are_visible)
+    show_hide_guides_button.text = "Hide Guides" if guides_are_visible else "Show Guides"
+    scheduler.wake()
 
 def toggle_trail_visibility():
-    global trails_are_visible
+    global trails_are_visible, mother_trail, daughter_trail
     trails_are_visible = not trails_are_visible
     print(f"Trail toggle button clicked. Setting trails_are_visible to: {trails_are_visible}")
 
-    # Always clear trails when changing visibility state to ensure a fresh start if they become visible
-    mother_trail_curve.clear()
-    daughter_trail_curve.clear()
+    # The trail curves are built the first time they are shown
+    if mother_trail is None:
+        mother_trail = CurveTrail(scene_objects.mother_trail_curve, TRAIL_HISTORY_DAYS, DT, H_DAY_SECONDS, TRAIL_MIN_TURN_DEGREES)
+        daughter_trail = CurveTrail(scene_objects.daughter_trail_curve, TRAIL_HISTORY_DAYS, DT, H_DAY_SECONDS, TRAIL_MIN_TURN_DEGREES)
+
+    # Hidden trails are cleared; shown trails are filled in with the window
+    # leading up to the current time by a (no-op) seek to it
+    mother_trail.clear()
+    daughter_trail.clear()
     
-    mother_trail_curve.visible = trails_are_visible
-    daughter_trail_curve.visible = trails_are_visible # Match daughter's sphere color
+    mother_trail.curve.visible = trails_are_visible
+    daughter_trail.curve.visible = trails_are_visible # Match daughter's sphere color
     
     if trails_are_visible:
+        seek_to(clock.time_s)
         show_hide_trails_button.text = "Hide Trails"
-        print("Trail curves set to visible (will start fresh).")
+        print("Trail curves set to visible (rebuilt for the last window).")
     else:
         show_hide_trails_button.text = "Show Trails"
         print("Trail curves set to invisible and cleared.")
 
+def seek_to(t_s):
+    global pending_seek_s
+    pending_seek_s = t_s
+    scheduler.wake()
+
+def target_time_s():
+    """The time being shown, or about to be if a seek is pending."""
+    return pending_seek_s if pending_seek_s is not None else clock.time_s
+
+# The year box changes only the year, the slider only the day within the
+# year being shown; the loop keeps both showing the current date
+def seek_to_year(widget):
+    t_s = target_time_s()
+    year = int(t_s // H_YEAR_SECONDS)
+    if widget.number is not None:
+        year = max(int(widget.number), 0)
+        seek_to(simulation_time(year) + t_s % H_YEAR_SECONDS)
+    # Show the year actually used (a clamped or unreadable entry is replaced
+    # now, even while paused) and make the sync resend it from then on: its
+    # cache still holds what it sent before the user typed
+    widget.text = str(year)
+    scene_sync.forget(widget)
+
+def seek_to_day(widget):
+    seek_to(simulation_time(int(target_time_s() // H_YEAR_SECONDS), widget.value))
+
 
 scene.append_to_caption('\n') 
 pause_button = button(bind=toggle_pause_animation, text="Pause")
 scene.append_to_caption(' &nbsp; &nbsp; ') 
 show_hide_trails_button = button(bind=toggle_trail_visibility, text="Show Trails")
+scene.append_to_caption(' &nbsp; &nbsp; ') 
+show_hide_guides_button = button(bind=toggle_guide_visibility, text="Hide Guides" if guides_are_visible else "Show Guides")
+
+# Jump to any date: type a year and press Enter, or drag the day slider;
+# the scene redraws at the new time immediately, paused or not
+scene.append_to_caption('\n\nYear ')
+year_input = winput(bind=seek_to_year, type="numeric", width=60, text="0")
+scene.append_to_caption(' &nbsp; Day ')
+day_slider = slider(bind=seek_to_day, min=0, max=H_YEAR_DAYS, step=0.1, value=0, length=420)
+
+# Per-frame phase timings: rolling p50/p99 in the caption, and a button that
+# saves the recorded frames as CSV and Chrome trace (chrome://tracing)
+PROFILE_FRAMES = False
+PROFILE_CAPTION_EVERY = 50 # frames
+profiler = FrameProfiler(("rate", "title", "ephemeris", "planet", "moons", "trails", "push"),
+                         enabled=PROFILE_FRAMES, record=PROFILE_FRAMES)
+
+def save_profile():
+    profiler.write_csv("halferth_frame_profile.csv")
+    profiler.write_chrome_trace("halferth_frame_profile.json")
+    print(f"Saved {profiler.saved_frame_count} of {profiler.frame_count} frames to halferth_frame_profile.csv/.json")
+
+if PROFILE_FRAMES:
+    scene.append_to_caption(' &nbsp; &nbsp; ')
+    button(bind=save_profile, text="Save Profile")
+    scene.append_to_caption('\n')
+    profile_text = wtext(text=profiler.summary())
 
 # =======================================================================
-# 5. ANIMATION LOOP
+# 3. ANIMATION LOOP
 # =======================================================================
-n_solar = 2 * math.pi / H_YEAR_SECONDS 
-solar_start_phi = 3 * math.pi / 2 
-M_initial_solar = get_initial_M_from_phi(solar_start_phi, ECC_HALFERTH_SOLAR)
-
-n_mother = 2 * math.pi / (P_mother_days * H_DAY_SECONDS)
-n_daughter = 2 * math.pi / (P_daughter_days * H_DAY_SECONDS)
-moon_start_phi = -math.pi / 2
-M_initial_mother = get_initial_M_from_phi(moon_start_phi, e_mother)
-M_initial_daughter = get_initial_M_from_phi(moon_start_phi, e_daughter)
-
-sim_time_s = 0.0
-FRAME_RATE = 100
+# Positions come from a Chebyshev fit of each orbit, so a frame costs a few
+# multiply-adds per body instead of a Newton solve plus trig.
+# Checking the fit against the exact orbits costs more than building it, so
+# it is off unless the fit is being tuned.
+CHECK_EPHEMERIS_FIT = False
+ephemeris = ChebyshevEphemeris()
+if CHECK_EPHEMERIS_FIT:
+    for body, (max_error, relative_error) in ephemeris.fit_error().items():
+        print(f"Ephemeris fit for {body}: max error {max_error:.3g} m ({relative_error:.2g} of a)")
+
 ANIMATION_DURATION_SECONDS = 60 
-DT = H_YEAR_SECONDS / (FRAME_RATE * ANIMATION_DURATION_SECONDS)
+DT = H_YEAR_SECONDS / (PHYSICS_RATE * ANIMATION_DURATION_SECONDS)
+
+# Time is derived from a frame count rather than summed frame by frame, and
+# every position below is a function of absolute time, so a seek costs no
+# more than a frame. The clock never wraps: it also timestamps the trails.
+clock = SimulationClock(DT)
+
+mother_trail = daughter_trail = None # Built by the first "Show Trails"
+
+# Per-frame attribute changes go through scene_sync, which sends only values
+# that changed, holding back moves smaller than half a pixel. The frame
+# update itself lives in halferth.frame, where the benchmarks run it too.
+SUBPIXEL_TOLERANCE_PIXELS = 0.5
+scene_sync = SceneSync()
+system_frame = SystemFrame(scene_objects, ephemeris, scene_sync, vector, profiler)
 
 while True:
-    rate(FRAME_RATE) 
+    profiler.start_frame()
+    steps = scheduler.next_frame(playing=not animation_is_paused)
+    profiler.mark("rate")
     
-    if not animation_is_paused:
-        sim_time_s += DT
-        if sim_time_s >= H_YEAR_SECONDS:
-            sim_time_s -= H_YEAR_SECONDS
-
-        current_day = sim_time_s / H_DAY_SECONDS
-        scene.title = f"Halferth System Orbital Dynamics\nDay: {current_day:.1f} / {H_YEAR_DAYS}\n"
-
-        M_solar = M_initial_solar + n_solar * sim_time_s
-        E_solar = solve_kepler(M_solar, ECC_HALFERTH_SOLAR)
-        r_solar_physical_ratio = (1 - ECC_HALFERTH_SOLAR * math.cos(E_solar)) 
-        r_solar_display = SOLAR_ORBIT_DISPLAY_RADIUS * r_solar_physical_ratio
-        phi_solar = 2*math.atan2(math.sqrt(1+ECC_HALFERTH_SOLAR)*math.sin(E_solar/2), math.sqrt(1-ECC_HALFERTH_SOLAR)*math.cos(E_solar/2))
-        
-        halferth_display_pos = vector(
-            -r_solar_display * math.cos(phi_solar), 
-            0, 
-            r_solar_display * math.sin(phi_solar)
-        )
-        planet.pos = halferth_display_pos
-        
-        planet.axis = WORLD_SPACE_FIXED_NORTH_POLE
-        planet.rotate(angle=planet_rotation_rate*DT, axis=WORLD_SPACE_FIXED_NORTH_POLE) 
-        
-        equator.pos = planet.pos
-        equator.axis = planet.axis 
-        
-        current_south_pole_direction_world = norm(-planet.axis) 
-        post.axis = current_south_pole_direction_world * POST_DISPLAY_LENGTH
-        post.pos = planet.pos + current_south_pole_direction_world * PLANET_DISPLAY_RADIUS
-        
-        M_m = M_initial_mother + n_mother * sim_time_s
-        E_m = solve_kepler(M_m, e_mother)
-        r_m_physical = a_mother_physical * (1 - e_mother * math.cos(E_m))
-        radius_ratio_m = r_m_physical / a_mother_physical
-        r_m_diorama = MOTHER_ORBIT_DISPLAY_AVG_RADIUS * radius_ratio_m
-        phi_m = 2*math.atan2(math.sqrt(1+e_mother)*math.sin(E_m/2), math.sqrt(1-e_mother)*math.cos(E_m/2))
-        local_pos_m_diorama = vector(0, r_m_diorama * math.cos(phi_m), r_m_diorama * math.sin(phi_m))
-
-        M_d = M_initial_daughter + n_daughter * sim_time_s
-        E_d = solve_kepler(M_d, e_daughter)
-        r_d_physical = a_daughter_physical * (1 - e_daughter * math.cos(E_d))
-        radius_ratio_d = r_d_physical / a_daughter_physical
-        r_d_diorama = DAUGHTER_ORBIT_DISPLAY_AVG_RADIUS * radius_ratio_d
-        phi_d = 2*math.atan2(math.sqrt(1+e_daughter)*math.sin(E_d/2), math.sqrt(1-e_daughter)*math.cos(E_d/2))
-        local_pos_d_diorama = vector(0, r_d_diorama * math.cos(phi_d), r_d_diorama * math.sin(phi_d))
-
-        mother.pos = halferth_display_pos + rotate(local_pos_m_diorama, angle=angle_of_tilt_definition, axis=axis_to_tilt_around_world)
-        daughter.pos = halferth_display_pos + rotate(local_pos_d_diorama, angle=angle_of_tilt_definition, axis=axis_to_tilt_around_world)
-
-        if trails_are_visible:
-            mother_trail_curve.append(pos=mother.pos)
-            daughter_trail_curve.append(pos=daughter.pos)
-            # No retain logic for this test, let them grow
\ No newline at end of file
+    seeking = pending_seek_s is not None
+    if seeking or steps:
+        if seeking:
+            sim_time_s = clock.seek(pending_seek_s)
+            pending_seek_s = None
+            if trails_are_visible:
+                times, mother_points, daughter_points = system_frame.trail_window(sim_time_s, DT)
+                mother_trail.rebuild(times, mother_points)
+                daughter_trail.rebuild(times, daughter_points)
+        else:
+            sim_time_s = clock.tick(steps)
+        scene_sync.tolerance = SUBPIXEL_TOLERANCE_PIXELS * 2 * scene.range / scene.height
+
+        current_day = clock.day_of_year
+        scene_sync.set(scene, "title", f"Halferth System Orbital Dynamics\nYear {clock.year}, Day: {current_day:.1f} / {H_YEAR_DAYS}\n")
+        scene_sync.set(day_slider, "value", current_day, tolerance=0.5)
+        scene_sync.set(year_input, "text", str(clock.year))
+        profiler.mark("title")
+
+        trails = (mother_trail, daughter_trail) if trails_are_visible and not seeking else None
+        system_frame.update(sim_time_s, trails)
+
+        # Only drawn frames are profiled; idle waits would swamp the "rate" phase
+        profiler.end_frame()
+        if PROFILE_FRAMES and profiler.frame_count % PROFILE_CAPTION_EVERY == 0:
+            profile_text.text = profiler.summary()
@@ -0,0 +1,32 @@
+"""
+Checks of the regression rule of halferth.benchmarks.
+"""
+
+import sys
+from pathlib import Path
+
+HTML_DUMP = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(HTML_DUMP))
+
+import halferth.benchmarks as benchmarks  # noqa: E402
+from halferth.benchmarks import NOISE_CAP, compare, measure  # noqa: E402
+
+
+def test_noise_allowance_comes_from_the_baseline_and_is_capped():
+    baseline = {"quiet": 1.0, "noisy": 1.0, "wild": 1.0}
+    noise = {"quiet": 0.01, "noisy": 0.2, "wild": 10.0}
+    allowed = {name: a for name, _, _, _, a in compare({"quiet": 1.3, "noisy": 1.3, "wild": 1.3}, baseline, 0.25, noise)}
+    assert allowed == {"quiet": 0.25, "noisy": 0.4, "wild": NOISE_CAP * 0.25}
+
+
+def test_one_slow_repeat_does_not_set_the_noise(monkeypatch):
+    now = [0.0]
+    durations = iter([1.0, 1.01, 1.0, 1.02, 5.0])
+
+    def run():
+        now[0] += next(durations)
+
+    monkeypatch.setattr(benchmarks.time, "perf_counter", lambda: now[0])
+    timing = measure(run, 1, repeat=5)
+    assert timing.seconds == 1.0
+    assert timing.noise < 0.05
@@ -0,0 +1,110 @@
+"""
+Checks halferth.calendar against the converter in date.html. The page's
+script is run as-is under node when it is installed; a line-by-line Python
+port of it is checked over a wider range either way.
+"""
+
+import json
+import math
+import os
+import re
+import shutil
+import subprocess
+import sys
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+HTML_DUMP = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(HTML_DUMP))
+
+from halferth.calendar import (  # noqa: E402
+    DAY_NOTES,
+    earth_to_halferth,
+    halferth_to_earth,
+    period_names,
+)
+
+# Drives convertToHalferth() through a minimal stand-in for the page's DOM
+NODE_HARNESS = """
+const elements = {};
+const document = {
+  getElementById(id) {
+    return elements[id] ??= { value: '', textContent: '', style: {} };
+  },
+};
+%s
+const results = [];
+for (const day of %s) {
+  document.getElementById('earthDate').value = day;
+  convertToHalferth();
+  results.push(['hDayOfYear', 'hSeason', 'hCivicMonth', 'hDayInCivicMonth', 'hNotes']
+    .map((id) => document.getElementById(id).textContent));
+}
+console.log(JSON.stringify(results));
+"""
+
+
+def page_day_of_year(earth_date):
+    """date.html's convertToHalferth, transliterated, for a datetime.date."""
+    input_ms = datetime(earth_date.year, earth_date.month, earth_date.day, tzinfo=timezone.utc).timestamp() * 1000
+    ref_year = earth_date.year
+    start_ms = datetime(ref_year, 3, 20, tzinfo=timezone.utc).timestamp() * 1000
+    if input_ms < start_ms:
+        ref_year -= 1
+        start_ms = datetime(ref_year, 3, 20, tzinfo=timezone.utc).timestamp() * 1000
+    earth_days_since_start = (input_ms - start_ms) / (24 * 60 * 60 * 1000)
+    day_of_year_float = earth_days_since_start * 24 / 21 + (1 + 1e-9)
+    return ref_year, math.floor(day_of_year_float - 1) % 420 + 1
+
+
+def earth_days(first, count):
+    return [first + timedelta(days=i) for i in range(count)]
+
+
+def test_matches_page_algorithm():
+    days = earth_days(date(1899, 1, 1), 365 * 250)
+    converted = earth_to_halferth(np.array(days, dtype="datetime64[D]"))
+    expected = np.array([page_day_of_year(d) for d in days])
+    np.testing.assert_array_equal(converted.year, expected[:, 0])
+    np.testing.assert_array_equal(converted.day_of_year, expected[:, 1])
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+def test_matches_date_html():
+    script = re.search(r"<script>(.*?)</script>", (HTML_DUMP / "date.html").read_text(encoding="utf-8"), re.S).group(1)
+    days = [d.isoformat() for d in earth_days(date(2023, 1, 1), 3 * 366)]
+    output = subprocess.run(["node", "-e", NODE_HARNESS % (script, json.dumps(days))],
+                            capture_output=True, text=True, check=True, env={**os.environ, "TZ": "UTC"}).stdout
+    page = json.loads(output)
+
+    converted = earth_to_halferth(np.array(days, dtype="datetime64[D]"))
+    seasons, civic = period_names(converted.period)
+    for i, (day_of_year, season, civic_month, day_in_period, notes) in enumerate(page):
+        assert day_of_year == f"Halferthian Day of Year: {converted.day_of_year[i]}"
+        assert season == f"Season: {seasons[i]}"
+        assert civic_month == f"Civic Half-Season: {civic[i]}"
+        assert day_in_period == f"Day in Civic Half-Season: {converted.day[i]}"
+        note = DAY_NOTES.get(int(converted.day_of_year[i]))
+        assert notes == (f"Note: {note}" if note else "")
+
+
+def test_day_boundaries_and_hours():
+    start = np.datetime64("2024-03-20T00:00:00.000")
+    one_ms = np.timedelta64(1, "ms")
+    h_day = np.timedelta64(21, "h")
+    stamps = np.array([start - one_ms, start, start + h_day - one_ms, start + h_day, start + 35 * h_day + np.timedelta64(90, "m")])
+    converted = earth_to_halferth(stamps)
+    np.testing.assert_array_equal(converted.year, [2023, 2024, 2024, 2024, 2024])
+    np.testing.assert_array_equal(converted.day_of_year, [419, 1, 1, 2, 36])
+    np.testing.assert_array_equal(converted.period, [12, 1, 1, 1, 2])
+    np.testing.assert_allclose(converted.hour[1:], [0, 21 - 1 / 3.6e6, 0, 1.5])
+
+
+def test_round_trip():
+    rng = np.random.default_rng(0)
+    stamps = np.datetime64("1900-01-01", "ms") + rng.integers(0, 300 * 365 * 86400 * 1000, 100_000).astype("timedelta64[ms]")
+    converted = earth_to_halferth(stamps)
+    np.testing.assert_array_equal(halferth_to_earth(*converted), stamps)
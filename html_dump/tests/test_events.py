@@ -0,0 +1,29 @@
+"""
+Regression checks for halferth.events root finding.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+HTML_DUMP = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(HTML_DUMP))
+
+from halferth.constants import H_DAY_SECONDS  # noqa: E402
+from halferth.events import CONJUNCTION, find_events, find_roots  # noqa: E402
+
+
+def test_root_on_a_sample_is_found_once():
+    # Roots at every multiple of 10 land exactly on the samples
+    roots = find_roots(lambda t: np.sin(np.pi * t / 10), 1.0, 100.0, 1.0, chunk_samples=7)
+    np.testing.assert_allclose(roots, [10, 20, 30, 40, 50, 60, 70, 80, 90], atol=1e-3)
+
+    roots = find_roots(lambda t: t - 5.0, 0.0, 10.0, 0.5)
+    np.testing.assert_array_equal(roots, [5.0])
+
+
+def test_conjunctions_at_whole_periods_are_not_doubled():
+    events = find_events(0, 2 * 420 * H_DAY_SECONDS, kinds=(CONJUNCTION,))
+    times = np.array([e.t_s for e in events])
+    assert np.all(np.diff(times) > H_DAY_SECONDS)
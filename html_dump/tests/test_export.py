@@ -0,0 +1,50 @@
+"""
+Round trip of halferth.export: a written ephemeris, read back and
+interpolated the way sim_dev/ephemeris.js does, follows the orbits.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+HTML_DUMP = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(HTML_DUMP))
+
+from halferth.constants import H_DAY_SECONDS, H_YEAR_SECONDS  # noqa: E402
+from halferth.export import export_ephemeris, load_ephemeris  # noqa: E402
+from halferth.orbits import SYSTEM_ORBITS  # noqa: E402
+
+
+def interpolate(header, positions, t_s):
+    """Linear interpolation with wrap-around for periodic files, as in ephemeris.js."""
+    n = header["n_samples"]
+    s = np.mod((t_s - header["start_s"]) / header["step_s"], n)
+    i0 = np.floor(s).astype(int)
+    f = (s - i0)[:, None, None]
+    return positions[i0] + (positions[(i0 + 1) % n] - positions[i0]) * f
+
+
+def test_exported_year_round_trips_and_interpolates(tmp_path):
+    path = tmp_path / "halferth.bin"
+    written = export_ephemeris(path)
+    header, positions = load_ephemeris(path)
+    assert header == written
+    assert header["periodic"]
+    assert positions.shape == (20 * 420, len(SYSTEM_ORBITS), 2)
+
+    t_s = np.random.default_rng(4).uniform(-H_YEAR_SECONDS, 3 * H_YEAR_SECONDS, 2000)
+    t_s = np.concatenate([t_s, np.arange(0, H_YEAR_SECONDS, header["step_s"])[::97]])
+    interpolated = interpolate(header, positions, t_s)
+    for column, orbit in enumerate(SYSTEM_ORBITS):
+        x, y = orbit.position(t_s)
+        # Worst for the Daughter near periapsis, about 2e-5 of its semi-major axis
+        np.testing.assert_allclose(interpolated[:, column, 0], x / orbit.a, atol=1e-4)
+        np.testing.assert_allclose(interpolated[:, column, 1], y / orbit.a, atol=1e-4)
+
+    on_samples = np.arange(0, 2 * 420, 7) * H_DAY_SECONDS
+    for column, orbit in enumerate(SYSTEM_ORBITS):
+        x, y = orbit.position(on_samples)
+        sampled = interpolate(header, positions, on_samples)[:, column]
+        np.testing.assert_allclose(sampled[:, 0], x / orbit.a, atol=1e-6)
+        np.testing.assert_allclose(sampled[:, 1], y / orbit.a, atol=1e-6)
@@ -0,0 +1,46 @@
+"""
+Convergence checks for halferth.kepler.solve_kepler.
+"""
+
+import sys
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+HTML_DUMP = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(HTML_DUMP))
+
+from halferth.kepler import solve_kepler  # noqa: E402
+
+MEAN_ANOMALIES = np.linspace(-np.pi, np.pi, 20001)
+
+
+@pytest.mark.parametrize("e", [0.0, 0.3, 0.9, 0.99, 0.999])
+def test_residual_over_a_whole_orbit(e):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        E = solve_kepler(MEAN_ANOMALIES, e, tolerance=1e-12)
+        scalar = np.array([solve_kepler(float(M), e, tolerance=1e-12) for M in MEAN_ANOMALIES[::50]])
+    assert np.abs(E - e * np.sin(E) - MEAN_ANOMALIES).max() < 1e-12
+    np.testing.assert_allclose(scalar, E[::50], rtol=0, atol=1e-12)
+
+
+def test_whole_turns_are_kept():
+    E = solve_kepler(MEAN_ANOMALIES + 6 * np.pi, 0.99, tolerance=1e-12)
+    np.testing.assert_allclose(E - 0.99 * np.sin(E), MEAN_ANOMALIES + 6 * np.pi, atol=1e-11)
+
+
+def test_warns_when_out_of_iterations():
+    with pytest.warns(RuntimeWarning):
+        solve_kepler(1e-3, 0.999, max_iterations=1)
+    with pytest.warns(RuntimeWarning):
+        solve_kepler(np.array([1e-3, 2e-3]), 0.999, max_iterations=1)
+
+
+def test_nan_passes_through_quietly():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        E = solve_kepler(np.array([np.nan, 1.0, np.nan]), 0.99)
+    assert np.isnan(E[0]) and np.isnan(E[2]) and np.isfinite(E[1])
@@ -0,0 +1,82 @@
+"""
+Checks that halferth.lunar phases run steadily round the cycle.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+HTML_DUMP = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(HTML_DUMP))
+
+from halferth.constants import H_DAY_SECONDS, H_YEAR_DAYS, H_YEAR_SECONDS, P_daughter_days, P_mother_days  # noqa: E402
+from halferth.constants import DAUGHTER_MASS, DAUGHTER_RADIUS_PHYSICAL, G, HALFERTH_RADIUS_PHYSICAL, MOTHER_MASS, MOTHER_RADIUS_PHYSICAL, SUN_MASS  # noqa: E402
+from halferth.lunar import MOONS, moon_conditions, table_value, tidal_accelerations, yearly_table  # noqa: E402
+from halferth.orbits import DAUGHTER_ORBIT, MOTHER_ORBIT, moon_offset, planet_position  # noqa: E402
+
+
+@pytest.mark.parametrize("moon", MOONS)
+def test_phase_increases_apart_from_the_wrap(moon):
+    t = np.arange(0, 2 * H_YEAR_SECONDS, 3600.0)
+    conditions = moon_conditions(moon, t)
+    step = np.diff(conditions.phase)
+    wraps = step < -0.5
+    assert np.all(step[~wraps] > 0)
+    # One wrap per synodic month, not extra jumps along the way. The sun's
+    # direction turns once a year either way round the moon's tilted
+    # plane, so a synodic month is at least this short:
+    period_days = {"mother": P_mother_days, "daughter": P_daughter_days}[moon]
+    shortest_synodic_s = H_DAY_SECONDS / (1 / period_days + 1 / H_YEAR_DAYS)
+    assert wraps.sum() <= np.ceil(t[-1] / shortest_synodic_s)
+    # Fullest near phase 0.5, darkest near the wrap
+    assert conditions.illuminated_fraction[np.argmin(np.abs(conditions.phase - 0.5))] > 0.9
+
+
+def test_table_phase_interpolates_like_direct_computation():
+    table = yearly_table(0, samples_per_day=4)
+    t = np.linspace(0, H_YEAR_SECONDS * 0.99, 997)
+    direct = moon_conditions("mother", t).phase
+    interpolated = table_value(table, "mother_phase", t)
+    difference = np.mod(interpolated - direct + 0.5, 1.0) - 0.5
+    assert np.abs(difference).max() < 1e-2
+
+
+def test_conditions_match_a_direct_computation():
+    orbits = {"mother": MOTHER_ORBIT, "daughter": DAUGHTER_ORBIT}
+    radii = {"mother": MOTHER_RADIUS_PHYSICAL, "daughter": DAUGHTER_RADIUS_PHYSICAL}
+    for t in np.linspace(0, H_YEAR_SECONDS, 13):
+        sun = -planet_position(t) # The sun sits at the origin
+        for moon in MOONS:
+            offset = moon_offset(orbits[moon], t)
+            to_sun, to_planet = sun - offset, -offset
+            cos_angle = to_sun @ to_planet / np.linalg.norm(to_sun) / np.linalg.norm(to_planet)
+            distance = np.linalg.norm(offset)
+            conditions = moon_conditions(moon, t)
+            np.testing.assert_allclose(conditions.phase_angle_deg, np.degrees(np.arccos(cos_angle)), atol=1e-6)
+            np.testing.assert_allclose(conditions.illuminated_fraction, (1 + cos_angle) / 2, atol=1e-9)
+            np.testing.assert_allclose(conditions.distance_m, distance, rtol=1e-12)
+            np.testing.assert_allclose(conditions.angular_diameter_deg,
+                                       np.degrees(2 * np.arctan(radii[moon] / np.sqrt(distance ** 2 - radii[moon] ** 2))),
+                                       rtol=1e-9)
+
+
+def test_combined_tide_is_the_strongest_pull_on_the_surface():
+    t = 123.4 * H_DAY_SECONDS
+    bodies = {"sun": (SUN_MASS, -planet_position(t)), "mother": (MOTHER_MASS, moon_offset(MOTHER_ORBIT, t)),
+              "daughter": (DAUGHTER_MASS, moon_offset(DAUGHTER_ORBIT, t))}
+    # Tidal acceleration at many surface points, summed over the bodies directly
+    points = np.random.default_rng(1).normal(size=(200000, 3))
+    points *= HALFERTH_RADIUS_PHYSICAL / np.linalg.norm(points, axis=1, keepdims=True)
+    total = np.zeros_like(points)
+    peaks = {}
+    for name, (mass, d) in bodies.items():
+        distance = np.linalg.norm(d)
+        pull = G * mass / distance ** 3 * (3 * np.outer(points @ d, d) / distance ** 2 - points)
+        total += pull
+        peaks[name] = np.linalg.norm(pull, axis=1).max()
+    tides = tidal_accelerations(t)
+    for name, peak in peaks.items():
+        np.testing.assert_allclose(getattr(tides, name), peak, rtol=1e-3)
+    np.testing.assert_allclose(tides.combined, np.linalg.norm(total, axis=1).max(), rtol=1e-3)
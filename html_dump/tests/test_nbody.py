@@ -0,0 +1,56 @@
+"""
+Checks halferth.nbody with test-particle moons.
+"""
+
+import sys
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+HTML_DUMP = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(HTML_DUMP))
+
+from halferth.constants import H_DAY_SECONDS  # noqa: E402
+from halferth.kepler import get_position_from_eccentric_anomaly, get_velocity_from_eccentric_anomaly, solve_kepler  # noqa: E402
+from halferth.nbody import HierarchicalWisdomHolman, kepler_drift, kepler_gm  # noqa: E402
+
+
+def run_with_moon_gm(moon_gm, days=70):
+    gm = dict(kepler_gm(), mother=moon_gm, daughter=moon_gm)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        return HierarchicalWisdomHolman(gm).run(days * H_DAY_SECONDS)
+
+
+def test_massless_moons_integrate_cleanly():
+    nearly, exactly = run_with_moon_gm(1e-3), run_with_moon_gm(0.0)
+    for run in (nearly, exactly):
+        assert np.all(np.isnan(run.disrupted_s))
+        assert np.all(np.isfinite(run.daughter)) and np.all(np.isfinite(run.mother))
+    # A kilogram-scale moon and a test particle move alike
+    np.testing.assert_allclose(nearly.daughter, exactly.daughter, rtol=0, atol=1.0)
+    np.testing.assert_allclose(nearly.mother, exactly.mother, rtol=0, atol=1.0)
+
+
+def test_massless_planet_is_rejected():
+    with pytest.raises(ValueError):
+        HierarchicalWisdomHolman(dict(kepler_gm(), halferth=0.0))
+
+
+@pytest.mark.parametrize("e", [0.3, 0.9, 0.99, 0.999])
+@pytest.mark.parametrize("M0", [0.0, -0.01, 0.5, 3.0])
+def test_drift_follows_the_ellipse_at_high_eccentricity(e, M0):
+    # Unit orbit (a = n = mu = 1); periapsis (M0 = 0) is the hard start
+    E0 = solve_kepler(M0, e, tolerance=1e-15)
+    r = np.array([*get_position_from_eccentric_anomaly(E0, 1.0, e), 0.0])
+    v = np.array([*get_velocity_from_eccentric_anomaly(E0, 1.0, e, 1.0), 0.0])
+    dt = np.array([1e-3, 0.05, 0.3, 1.0, 2.0])
+    r1, v1 = kepler_drift(np.broadcast_to(r, (5, 3)), np.broadcast_to(v, (5, 3)), 1.0, dt)
+    E1 = solve_kepler(M0 + dt, e, tolerance=1e-15)
+    x, y = get_position_from_eccentric_anomaly(E1, 1.0, e)
+    vx, vy = get_velocity_from_eccentric_anomaly(E1, 1.0, e, 1.0)
+    np.testing.assert_allclose(r1[:, 0], x, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(r1[:, 1], y, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(v1[:, :2], np.column_stack([vx, vy]), rtol=1e-7, atol=1e-9)
@@ -0,0 +1,67 @@
+"""
+Checks halferth.scheduler pacing with a recording sleep, no real waiting.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+HTML_DUMP = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(HTML_DUMP))
+
+from halferth.scheduler import FrameScheduler  # noqa: E402
+
+
+class RecordingSleep:
+    """Records the requested waits and calls wake() on the given check-in."""
+
+    def __init__(self, wake_after=None):
+        self.waits = []
+        self.wake_after = wake_after
+        self.scheduler = None
+
+    def __call__(self, seconds):
+        self.waits.append(seconds)
+        if len(self.waits) == self.wake_after:
+            self.scheduler.wake()
+
+
+def scheduler_with(sleep, **options):
+    scheduler = FrameScheduler(sleep=sleep, **options)
+    sleep.scheduler = scheduler
+    return scheduler
+
+
+def test_playing_hands_out_physics_steps_at_the_physics_rate():
+    sleep = RecordingSleep()
+    scheduler = scheduler_with(sleep, physics_hz=250, render_hz=100)
+    steps = [scheduler.next_frame(playing=True) for _ in range(100)]
+    assert sum(steps) == 250 # One second of frames
+    assert set(steps) == {2, 3}
+    assert sleep.waits == [pytest.approx(0.01)] * 100
+
+    capped = scheduler_with(RecordingSleep(), physics_hz=1000, render_hz=10, max_steps_per_frame=40)
+    assert capped.next_frame(playing=True) == 40
+
+
+def test_idle_waits_double_up_to_the_idle_rate_until_woken():
+    sleep = RecordingSleep(wake_after=8)
+    scheduler = scheduler_with(sleep, physics_hz=100, render_hz=64, idle_hz=4)
+    assert scheduler.next_frame(playing=False) == 0
+    assert sleep.waits == pytest.approx([1 / 64, 1 / 32, 1 / 16, 1 / 8, 1 / 4, 1 / 4, 1 / 4, 1 / 4])
+    assert scheduler.idle_waits == 8
+
+    # A wake() that came in before the frame ends the wait at once
+    scheduler.wake()
+    assert scheduler.next_frame(playing=False) == 0
+    assert len(sleep.waits) == 8
+
+
+def test_pausing_drops_the_fractional_step():
+    sleep = RecordingSleep(wake_after=2)
+    scheduler = scheduler_with(sleep, physics_hz=150, render_hz=100)
+    assert scheduler.next_frame(playing=True) == 1 # Half a step left over
+    scheduler.next_frame(playing=False)
+    assert scheduler.next_frame(playing=True) == 1
+    assert scheduler.next_frame(playing=True) == 2
@@ -0,0 +1,202 @@
+"""
+Runs halferth.server on a free localhost port and talks to it over raw
+sockets: HTTP windows, WebSocket chunk streaming, and the shared cache.
+"""
+
+import asyncio
+import base64
+import json
+import os
+import struct
+import sys
+from pathlib import Path
+
+import numpy as np
+
+HTML_DUMP = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(HTML_DUMP))
+
+from halferth.constants import H_DAY_SECONDS  # noqa: E402
+from halferth.export import unpack_ephemeris  # noqa: E402
+from halferth.orbits import MOTHER_ORBIT, SOLAR_ORBIT  # noqa: E402
+from halferth.server import ChunkCache, EphemerisServer  # noqa: E402
+
+
+def run_with_server(test, **cache_options):
+    async def main():
+        server = EphemerisServer(ChunkCache(**cache_options), prefetch=2)
+        host, port = await server.start("127.0.0.1", 0)
+        try:
+            await test(server, host, port)
+        finally:
+            await server.close()
+    asyncio.run(main())
+
+
+async def http_get(host, port, target):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+    status = int(head.split(" ")[1])
+    length = int(head.lower().split("content-length:")[1].split("\r\n")[0])
+    body = await reader.readexactly(length)
+    writer.close()
+    return status, body
+
+
+async def websocket_connect(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    key = base64.b64encode(os.urandom(16)).decode()
+    writer.write((f"GET /ws HTTP/1.1\r\nHost: {host}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                  f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode())
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 101")
+    return reader, writer
+
+
+def websocket_send(writer, message):
+    payload = json.dumps(message).encode()
+    mask = os.urandom(4)
+    masked = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    writer.write(struct.pack("!BB", 0x81, 0x80 | len(payload)) + mask + masked)
+
+
+async def websocket_receive(reader):
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length, = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        length, = struct.unpack("!Q", await reader.readexactly(8))
+    return first & 0x0F, await reader.readexactly(length)
+
+
+def test_positions_window_matches_orbits():
+    async def test(server, host, port):
+        status, body = await http_get(host, port, "/bodies")
+        assert status == 200
+        assert [b["name"] for b in json.loads(body)["bodies"]] == ["solar", "mother", "daughter"]
+
+        start_s, end_s = 3.3 * H_DAY_SECONDS, 12.1 * H_DAY_SECONDS
+        status, body = await http_get(host, port, f"/positions?start_s={start_s}&end_s={end_s}&bodies=mother,solar")
+        assert status == 200
+        header, positions = unpack_ephemeris(body)
+        assert [b["name"] for b in header["bodies"]] == ["mother", "solar"]
+        t = header["start_s"] + np.arange(header["n_samples"]) * header["step_s"]
+        assert t[0] >= start_s and t[-1] < end_s and t[0] - header["step_s"] < start_s
+        for column, orbit in enumerate((MOTHER_ORBIT, SOLAR_ORBIT)):
+            x, y = orbit.position(t)
+            np.testing.assert_allclose(positions[:, column, 0], x / orbit.a, atol=1e-6)
+            np.testing.assert_allclose(positions[:, column, 1], y / orbit.a, atol=1e-6)
+
+        assert (await http_get(host, port, "/positions?start_s=0&end_s=1&bodies=moon"))[0] == 400
+        assert (await http_get(host, port, "/nowhere"))[0] == 404
+
+    run_with_server(test, chunk_days=2)
+
+
+def test_websocket_streams_chunks_ahead_of_playback():
+    async def test(server, host, port):
+        reader, writer = await websocket_connect(host, port)
+        websocket_send(writer, {"bodies": ["daughter"]})
+        websocket_send(writer, {"t_s": 5.5 * H_DAY_SECONDS, "rate": 1000.0})
+        chunks = []
+        for _ in range(3): # the current chunk plus prefetch=2
+            opcode, payload = await websocket_receive(reader)
+            assert opcode == 0x2
+            header, positions = unpack_ephemeris(payload)
+            assert [b["name"] for b in header["bodies"]] == ["daughter"]
+            assert positions.shape == (header["n_samples"], 1, 2)
+            chunks.append(header["chunk"])
+        assert chunks == [2, 3, 4]
+
+        # Moving on by one chunk only sends the one not yet sent
+        websocket_send(writer, {"t_s": 6.5 * H_DAY_SECONDS, "rate": 1000.0})
+        opcode, payload = await websocket_receive(reader)
+        assert unpack_ephemeris(payload)[0]["chunk"] == 5
+
+        writer.write(struct.pack("!BB", 0x88, 0x80) + os.urandom(4))
+        opcode, _ = await websocket_receive(reader)
+        assert opcode == 0x8
+        writer.close()
+
+    run_with_server(test, chunk_days=2)
+
+
+def test_many_clients_share_one_computation():
+    async def test(server, host, port):
+        target = f"/positions?start_s={40 * H_DAY_SECONDS}&end_s={46 * H_DAY_SECONDS}"
+        results = await asyncio.gather(*(http_get(host, port, target) for _ in range(20)))
+        assert {status for status, _ in results} == {200}
+        assert len({body for _, body in results}) == 1
+        await asyncio.sleep(0)
+        # Three chunks for the window, two prefetched after it
+        assert server.cache.misses == 5
+
+    run_with_server(test, chunk_days=2)
+
+
+def test_cancelled_waiter_keeps_the_shared_computation():
+    async def main():
+        cache = ChunkCache(chunk_days=2)
+        waiter = asyncio.ensure_future(cache.get(7))
+        await asyncio.sleep(0)
+        waiter.cancel() # e.g. a WebSocket sender superseded by a new t_s
+        await asyncio.sleep(0)
+        assert waiter.cancelled()
+        cache.prefetch([7])
+        chunk = await cache.get(7)
+        assert cache.misses == 1
+        assert await cache.get(7) is chunk
+
+    asyncio.run(main())
+
+
+def test_malformed_requests_get_400():
+    async def test(server, host, port):
+        assert (await http_get(host, port, "/positions?start_s=-inf&end_s=1"))[0] == 400
+        assert (await http_get(host, port, "/positions?start_s=nan&end_s=1"))[0] == 400
+
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(b"GARBAGE\r\n\r\n")
+        await writer.drain()
+        head = await reader.readuntil(b"\r\n\r\n")
+        assert head.startswith(b"HTTP/1.1 400")
+        writer.close()
+
+    run_with_server(test, chunk_days=2)
+
+
+def test_websocket_answers_bad_messages_and_stays_open():
+    async def test(server, host, port):
+        reader, writer = await websocket_connect(host, port)
+        for message in ([1, 2], {"t_s": 0.0, "rate": "fast"}, {"t_s": "nan"}, {"bodies": "mother"}):
+            websocket_send(writer, message)
+            opcode, payload = await websocket_receive(reader)
+            assert opcode == 0x1
+            assert "error" in json.loads(payload)
+
+        # Still serving, backwards for a negative rate
+        websocket_send(writer, {"t_s": 5.5 * H_DAY_SECONDS, "rate": -1000.0})
+        chunks = [unpack_ephemeris((await websocket_receive(reader))[1])[0]["chunk"] for _ in range(3)]
+        assert chunks == [2, 1, 0]
+        writer.close()
+
+    run_with_server(test, chunk_days=2)
+
+
+def test_websocket_resends_chunks_once_playback_has_moved_far_away():
+    async def test(server, host, port):
+        reader, writer = await websocket_connect(host, port)
+        websocket_send(writer, {"t_s": 0.0, "rate": 1.0})
+        assert [unpack_ephemeris((await websocket_receive(reader))[1])[0]["chunk"] for _ in range(3)] == [0, 1, 2]
+        websocket_send(writer, {"t_s": 1000 * 2 * H_DAY_SECONDS, "rate": 1.0})
+        for _ in range(3):
+            await websocket_receive(reader)
+        websocket_send(writer, {"t_s": 0.0, "rate": 1.0})
+        assert [unpack_ephemeris((await websocket_receive(reader))[1])[0]["chunk"] for _ in range(3)] == [0, 1, 2]
+        writer.close()
+
+    run_with_server(test, chunk_days=2)
@@ -0,0 +1,55 @@
+"""
+Checks halferth.sweep: the memory-mapped columns written by the worker pool
+match a direct evaluation, and the default configuration scores as the
+orbits and sky modules say it should.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+HTML_DUMP = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(HTML_DUMP))
+
+from halferth.constants import H_DAY_SECONDS  # noqa: E402
+from halferth.orbits import DAUGHTER_ORBIT, MOTHER_ORBIT, moon_offset  # noqa: E402
+from halferth.sky import altitude_azimuth  # noqa: E402
+from halferth.sweep import (  # noqa: E402
+    DEFAULT_OBSERVER,
+    METRICS,
+    SWEEP_PARAMETERS,
+    evaluate_configurations,
+    load_sweep,
+    run_sweep,
+    sweep_grid,
+)
+
+OPTIONS = {"horizon_days": 14.0, "step_days": 1 / 8}
+
+
+def test_memmapped_columns_match_direct_evaluation(tmp_path):
+    grid = sweep_grid(e_mother=[0.35, 0.9, 0.95], e_daughter=[0.3, 0.99], P_daughter_days=[35, 36])
+    results = run_sweep(tmp_path, grid, chunk_size=5, processes=2, progress=False, **OPTIONS)
+    assert all(isinstance(results[name], np.memmap) for name in SWEEP_PARAMETERS + METRICS)
+
+    direct = evaluate_configurations(grid, **OPTIONS)
+    for name in SWEEP_PARAMETERS:
+        np.testing.assert_array_equal(results[name], grid[name])
+    for name in METRICS:
+        np.testing.assert_array_equal(results[name], direct[name])
+    assert not np.isnan(results["min_separation_m"]).any()
+    # The same files read back later
+    np.testing.assert_array_equal(load_sweep(tmp_path)["min_separation_m"], direct["min_separation_m"])
+
+
+def test_default_configuration_against_the_orbits():
+    scores = evaluate_configurations(sweep_grid(), **OPTIONS)
+    assert scores["convergence_days"][0] == 70
+
+    t = np.arange(0.0, OPTIONS["horizon_days"], OPTIONS["step_days"]) * H_DAY_SECONDS
+    separation = np.linalg.norm(moon_offset(MOTHER_ORBIT, t) - moon_offset(DAUGHTER_ORBIT, t), axis=-1).min()
+    np.testing.assert_allclose(scores["min_separation_m"][0], separation, rtol=1e-9)
+    for moon in ("mother", "daughter"):
+        altitude, _ = altitude_azimuth(moon, *DEFAULT_OBSERVER, t)
+        np.testing.assert_allclose(scores[f"{moon}_visible_fraction"][0], np.mean(altitude > 0))
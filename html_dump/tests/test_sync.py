@@ -0,0 +1,63 @@
+"""
+Checks that halferth.sync.SceneSync sends only what changed.
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+HTML_DUMP = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(HTML_DUMP))
+
+from halferth.sync import SceneSync  # noqa: E402
+
+
+class Recorder(SimpleNamespace):
+    """Stand-in for a vpython object that logs every assignment."""
+
+    def __setattr__(self, name, value):
+        self.__dict__.setdefault("log", []).append((name, value))
+        super().__setattr__(name, value)
+
+
+def test_only_changes_are_sent():
+    sync = SceneSync()
+    box = Recorder()
+    sync.set(box, "text", "0")
+    sync.set(box, "color", "red")
+    assert sync.flush() == 2
+    sync.set(box, "text", "0")
+    sync.set(box, "color", "blue")
+    sync.set(box, "color", "green") # Replaces the staged blue
+    assert sync.flush() == 1
+    assert box.log == [("text", "0"), ("color", "red"), ("color", "green")]
+    assert (sync.pushed, sync.skipped) == (3, 1)
+
+
+def test_small_moves_add_up_against_the_last_value_sent():
+    sync = SceneSync(tolerance=0.1)
+    ball = Recorder()
+    sent = []
+    for step in range(10):
+        sync.set(ball, "pos", SimpleNamespace(x=0.04 * step, y=0.0, z=0.0))
+        if sync.flush():
+            sent.append(round(ball.pos.x, 2))
+    # Each send is the first position more than 0.1 from the previous send
+    assert sent == [0.0, 0.12, 0.24, 0.36]
+
+    sync.set(ball, "pos", SimpleNamespace(x=0.37, y=0.0, z=0.0), tolerance=0)
+    assert sync.flush() == 1
+
+
+def test_forget_resends_after_a_direct_write():
+    sync = SceneSync()
+    box = Recorder()
+    sync.set(box, "text", "3")
+    sync.flush()
+    box.text = "-5" # e.g. typed by the user
+    sync.set(box, "text", "3")
+    assert sync.flush() == 0
+    sync.forget(box)
+    sync.set(box, "text", "3")
+    assert sync.flush() == 1
+    assert box.text == "3"
@@ -0,0 +1,65 @@
+"""
+Checks halferth.tides: the rank-6 matrix product against a direct sum over
+the bodies, and the memory-mapped field with its header.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+HTML_DUMP = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(HTML_DUMP))
+
+from halferth.constants import H_DAY_SECONDS, HALFERTH_RADIUS_PHYSICAL  # noqa: E402
+from halferth.sky import BODIES, _body_components, _turn_with_planet  # noqa: E402
+from halferth.tides import _MASS_RATIO, extreme_tides, grid_axes, open_tide_field, tide_heights, write_tide_field  # noqa: E402
+
+
+def direct_heights(t, lat_deg, lon_deg):
+    """Sum over bodies of (m / M) R^4 / d^3 (3 cos^2 psi - 1) / 2, one body and point at a time."""
+    lat, lon = np.meshgrid(np.radians(lat_deg), np.radians(lon_deg), indexing="ij")
+    normal = np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+    heights = np.zeros(lat.shape)
+    for body in BODIES:
+        d = np.array(_turn_with_planet(_body_components(body, t), t), dtype=float)
+        distance = np.linalg.norm(d)
+        cos_psi = normal @ (d / distance)
+        heights += _MASS_RATIO[body] * HALFERTH_RADIUS_PHYSICAL ** 4 / distance ** 3 * (3 * cos_psi ** 2 - 1) / 2
+    return heights
+
+
+def test_matrix_product_matches_the_direct_sum():
+    lat_deg, lon_deg = grid_axes(19, 37)
+    times = np.array([0.0, 3.7, 150.25]) * H_DAY_SECONDS
+    heights = tide_heights(times, lat_deg, lon_deg)
+    assert heights.shape == (3, 19, 37)
+    for t, field in zip(times, heights):
+        direct = direct_heights(t, lat_deg, lon_deg)
+        np.testing.assert_allclose(field, direct, rtol=0, atol=1e-9 * np.abs(direct).max())
+
+    single = tide_heights(times, lat_deg, lon_deg, out=np.empty((3, 19, 37), dtype=np.float32))
+    np.testing.assert_allclose(single, heights, rtol=0, atol=1e-5 * np.abs(heights).max())
+
+
+def test_field_file_and_header_agree(tmp_path):
+    path = tmp_path / "field.npy"
+    step_s = 5 * 3600.0
+    # A small chunk size, so the field is written over several chunks
+    header = write_tide_field(path, 2 * H_DAY_SECONDS, 9, step_s, n_lat=12, n_lon=24, max_chunk_bytes=3000)
+    loaded, field = open_tide_field(path)
+    assert loaded == header
+    assert isinstance(field, np.memmap) and field.shape == (9, 12, 24)
+
+    lat_deg, lon_deg = grid_axes(12, 24)
+    t = 2 * H_DAY_SECONDS + np.arange(9) * step_s
+    expected = tide_heights(t, lat_deg, lon_deg)
+    np.testing.assert_allclose(field, expected, rtol=0, atol=1e-5 * np.abs(expected).max())
+    np.testing.assert_array_equal(header["high_m"], field.reshape(9, -1).max(axis=1))
+    np.testing.assert_array_equal(header["low_m"], field.reshape(9, -1).min(axis=1))
+
+    highest = extreme_tides(header, 1, "high")
+    step = int(np.argmax(field.reshape(9, -1).max(axis=1)))
+    lat_index, lon_index = np.unravel_index(np.argmax(field[step]), (12, 24))
+    assert highest.step[0] == step and highest.t_s[0] == t[step]
+    assert (highest.lat_deg[0], highest.lon_deg[0]) == (lat_deg[lat_index], lon_deg[lon_index])
@@ -7,14 +7,22 @@ function updateOffscreenCanvas(renderer, target, offscreenCanvas, imageData) {
   renderer.readRenderTargetPixels(target, 0, 0, imageData.width, imageData.height, imageData.data);
   ctx.putImageData(imageData, 0, 0);
 }
+const ephemerisSample = { x: 0, y: 0 };
+
+// Moon orbit-plane samples map into moonOrbitGroup with the major axis on Y and periapsis on -Y
+function placeMoonFromEphemeris(ephemeris, name, moon, moonConfig, day) {
+  ephemeris.sample(name, day, ephemerisSample);
+  const moonX = ephemerisSample.y * moonConfig.SEMI_MAJOR_AXIS;
+  const moonY = -ephemerisSample.x * moonConfig.SEMI_MAJOR_AXIS;
+  moon.position.set(moonX, moonY, 0);
+  return Math.atan2((moonY - moonConfig.FOCUS_OFFSET) / moonConfig.SEMI_MAJOR_AXIS, moonX / moonConfig.SEMI_MINOR_AXIS);
+}
+
 function updatePlanetAndMoons(state, simObjects, config, delta) {
   const orbitSpeed = (2 * Math.PI) / config.ANIMATION_ORBIT_PERIOD_SECONDS;
   if (delta > 0) {
     state.orbitAngle += orbitSpeed * delta;
   }
-  const x = config.ORBIT_RADIUS * Math.cos(state.orbitAngle);
-  const z = config.ORBIT_RADIUS * Math.sin(state.orbitAngle);
-  simObjects.planetGroup.position.set(x, 0, z);
   const spinSpeed = orbitSpeed * config.HALFERTH_YEAR_DAYS;
   const spinStep = spinSpeed * delta;
   simObjects.spinningGroup.rotation.y -= spinStep;
@@ -25,21 +33,34 @@ function updatePlanetAndMoons(state, simObjects, config, delta) {
     state.totalSpin %= (Math.PI * 2);
   }
   const spinFraction = state.fullSpins + state.totalSpin / (2 * Math.PI);
-  const angleOffset = -Math.PI;
-  const motherAngle = (spinFraction / config.MOTHER.ORBIT_DAYS) * 2 * Math.PI + angleOffset;
-  const motherX = config.MOTHER.SEMI_MINOR_AXIS * Math.cos(motherAngle);
-  const motherY = config.MOTHER.SEMI_MAJOR_AXIS * Math.sin(motherAngle) + config.MOTHER.FOCUS_OFFSET;
-  simObjects.mother.position.set(motherX, motherY, 0);
-  const daughterAngle = (spinFraction / config.DAUGHTER.ORBIT_DAYS) * 2 * Math.PI + angleOffset;
-  const daughterX = config.DAUGHTER.SEMI_MINOR_AXIS * Math.cos(daughterAngle);
-  const daughterY = config.DAUGHTER.SEMI_MAJOR_AXIS * Math.sin(daughterAngle) + config.DAUGHTER.FOCUS_OFFSET;
-  simObjects.daughter.position.set(daughterX, daughterY, 0);
+
+  if (state.ephemeris) {
+    // Positions are interpolated from the Python-generated ephemeris (see html_dump/halferth/export.py).
+    // The solar orbit-plane start point maps to +X so the seasonal spokes keep their meaning.
+    state.ephemeris.sample('solar', spinFraction, ephemerisSample);
+    simObjects.planetGroup.position.set(-ephemerisSample.y * config.ORBIT_RADIUS, 0, ephemerisSample.x * config.ORBIT_RADIUS);
+    state.motherOrbitalAngle = placeMoonFromEphemeris(state.ephemeris, 'mother', simObjects.mother, config.MOTHER, spinFraction);
+    state.daughterOrbitalAngle = placeMoonFromEphemeris(state.ephemeris, 'daughter', simObjects.daughter, config.DAUGHTER, spinFraction);
+  } else {
+    const x = config.ORBIT_RADIUS * Math.cos(state.orbitAngle);
+    const z = config.ORBIT_RADIUS * Math.sin(state.orbitAngle);
+    simObjects.planetGroup.position.set(x, 0, z);
+    const angleOffset = -Math.PI;
+    const motherAngle = (spinFraction / config.MOTHER.ORBIT_DAYS) * 2 * Math.PI + angleOffset;
+    const motherX = config.MOTHER.SEMI_MINOR_AXIS * Math.cos(motherAngle);
+    const motherY = config.MOTHER.SEMI_MAJOR_AXIS * Math.sin(motherAngle) + config.MOTHER.FOCUS_OFFSET;
+    simObjects.mother.position.set(motherX, motherY, 0);
+    const daughterAngle = (spinFraction / config.DAUGHTER.ORBIT_DAYS) * 2 * Math.PI + angleOffset;
+    const daughterX = config.DAUGHTER.SEMI_MINOR_AXIS * Math.cos(daughterAngle);
+    const daughterY = config.DAUGHTER.SEMI_MAJOR_AXIS * Math.sin(daughterAngle) + config.DAUGHTER.FOCUS_OFFSET;
+    simObjects.daughter.position.set(daughterX, daughterY, 0);
+    state.motherOrbitalAngle = motherAngle;
+    state.daughterOrbitalAngle = daughterAngle;
+  }
   const motherAngleToCenter = Math.atan2(simObjects.mother.position.y, simObjects.mother.position.x);
   const daughterAngleToCenter = Math.atan2(simObjects.daughter.position.y, simObjects.daughter.position.x);
   simObjects.mother.rotation.z = motherAngleToCenter + Math.PI;
   simObjects.daughter.rotation.z = daughterAngleToCenter + Math.PI;
-  state.motherOrbitalAngle = motherAngle;
-  state.daughterOrbitalAngle = daughterAngle;
 }
 
 function updateLabelPositions(state, simObjects, camera, container) {
@@ -6,6 +6,7 @@ export const CONFIG = {
   HALFERTH_DAY_HOURS: 21,
   ANIMATION_ORBIT_PERIOD_SECONDS: 62.8,
   MAX_TRAIL_POINTS: 9000,
+  EPHEMERIS_URL: 'ephemeris/halferth.bin',
 
   MOTHER: {
     ORBIT_DAYS: 70,
@@ -0,0 +1,58 @@
+// ephemeris.js
+// Reader for the binary ephemeris written by html_dump/halferth/export.py.
+// Positions are orbital-plane (x / a, y / a) samples; the sim only interpolates them.
+
+const EPHEMERIS_MAGIC = 'HEPH';
+export const EPHEMERIS_FORMAT_VERSION = 1;
+
+export async function loadEphemeris(url) {
+  const response = await fetch(url);
+  if (!response.ok) {
+    throw new Error(`Failed to load ephemeris ${url}: ${response.status}`);
+  }
+  return parseEphemeris(await response.arrayBuffer());
+}
+
+export function parseEphemeris(buffer) {
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+  if (magic !== EPHEMERIS_MAGIC) {
+    throw new Error('Not a Halferth ephemeris file');
+  }
+  const version = view.getUint32(4, true);
+  if (version !== EPHEMERIS_FORMAT_VERSION) {
+    throw new Error(`Ephemeris format version ${version}, expected ${EPHEMERIS_FORMAT_VERSION}`);
+  }
+  const dataOffset = view.getUint32(8, true);
+  const headerLength = view.getUint32(12, true);
+  const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 16, headerLength)));
+
+  const bodyCount = header.bodies.length;
+  const sampleCount = header.n_samples;
+  const stride = bodyCount * 2;
+  const data = new Float32Array(buffer, dataOffset, sampleCount * stride);
+  const bodyIndex = Object.fromEntries(header.bodies.map((body, i) => [body.name, i]));
+  const daysPerStep = header.step_s / header.h_day_seconds;
+  const startDay = header.start_s / header.h_day_seconds;
+
+  // Linear interpolation at a (fractional) Halferth day; wraps when the file spans whole periods
+  function sample(name, day, out = { x: 0, y: 0 }) {
+    const offset = bodyIndex[name] * 2;
+    let s = (day - startDay) / daysPerStep;
+    if (header.periodic) {
+      s = ((s % sampleCount) + sampleCount) % sampleCount;
+    } else {
+      s = Math.min(Math.max(s, 0), sampleCount - 1);
+    }
+    const i0 = Math.floor(s);
+    const i1 = header.periodic ? (i0 + 1) % sampleCount : Math.min(i0 + 1, sampleCount - 1);
+    const f = s - i0;
+    const a = i0 * stride + offset;
+    const b = i1 * stride + offset;
+    out.x = data[a] + (data[b] - data[a]) * f;
+    out.y = data[a + 1] + (data[b + 1] - data[a + 1]) * f;
+    return out;
+  }
+
+  return { header, data, bodyIndex, sample };
+}
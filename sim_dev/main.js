@@ -6,6 +6,7 @@ import { createRenderer, createCamera, setupControls } from './setupThree.js';
 import { createUI } from './ui.js';
 import { createSceneObjects } from './objects.js';
 import { startAnimation } from './animation.js';
+import { loadEphemeris } from './ephemeris.js';
 
 // === Basic Setup ===
 const canvas = document.getElementById("halferthCanvas");
@@ -36,6 +37,7 @@ const simulationState = {
   animationSpeedMultiplier: 1,
   motherImageData: new ImageData(1024, 1024),
   daughterImageData: new ImageData(1024, 1024),
+  ephemeris: null,
  };
 
 // === UI Callbacks ===
@@ -91,6 +93,15 @@ const simObjects = createSceneObjects(scene, CONFIG, labelContainer);
 simObjects.motherTrailLine.geometry.setAttribute('position', new THREE.BufferAttribute(simulationState.motherTrailPositions, 3));
 simObjects.daughterTrailLine.geometry.setAttribute('position', new THREE.BufferAttribute(simulationState.daughterTrailPositions, 3));
 
+// === Ephemeris ===
+// Until the file arrives (or if it is missing) the animation falls back to its built-in orbit formulas
+loadEphemeris(CONFIG.EPHEMERIS_URL)
+  .then((ephemeris) => {
+    simulationState.ephemeris = ephemeris;
+    simulationState.needsManualUpdate = true;
+  })
+  .catch((error) => console.warn('Ephemeris unavailable, computing orbits per frame:', error));
+
 // === Start Simulation ===
 startAnimation({
   renderer,